@@ -0,0 +1,136 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+from diagnostics import MAX_SAMPLES, percentiles
+
+# CONSTANTS
+# Bounds for the Retry-After handed to shed requests
+MIN_RETRY_AFTER_S = 1
+MAX_RETRY_AFTER_S = 30
+
+
+class AdmissionRejected(RuntimeError):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Permit:
+    """
+    One admitted request's slot; `release` is idempotent so a permit can be
+    handed to both a response body and its cleanup hook.
+    """
+
+    def __init__(self, gate: "AdmissionGate", started: float):
+        self.gate = gate
+        self.started = started
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.gate._release(self)
+
+
+class AdmissionGate:
+    """
+    In-flight limit for one endpoint. Up to `max_in_flight` requests run at
+    once; up to `max_queued` more wait in FIFO order, each for at most
+    `queue_timeout_s`. Anything beyond that is shed right away with an
+    AdmissionRejected carrying a Retry-After estimate, so admitted requests
+    are not slowed down by a backlog they could never clear.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queued: int, queue_timeout_s: float):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout_s = queue_timeout_s
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self.stats = {"accepted": 0, "queued": 0, "admitted_from_queue": 0, "shed_queue_full": 0,
+                      "shed_deadline": 0, "abandoned": 0, "completed": 0}
+        self.queue_wait_ms = deque(maxlen=MAX_SAMPLES)
+        self.service_ms = deque(maxlen=MAX_SAMPLES)
+
+    def retry_after(self) -> int:
+        # Time for the current backlog to drain at the recent median service time
+        service_s = percentiles(self.service_ms)["p50"] / 1000 or 1.0
+        backlog = len(self._waiters) + 1
+        estimate = math.ceil(service_s * backlog / self.max_in_flight)
+        return max(MIN_RETRY_AFTER_S, min(MAX_RETRY_AFTER_S, estimate))
+
+    def _reject(self, reason: str, message: str):
+        self.stats[reason] += 1
+        raise AdmissionRejected(f"{self.name}: {message}", self.retry_after())
+
+    async def acquire(self) -> Permit:
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.stats["accepted"] += 1
+            return Permit(self, time.monotonic())
+        if len(self._waiters) >= self.max_queued:
+            self._reject("shed_queue_full", f"{self.in_flight} in flight and {len(self._waiters)} waiting")
+
+        queued_at = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout_s)
+        except asyncio.CancelledError:
+            # The client went away while waiting; hand on a slot granted meanwhile
+            if waiter.done():
+                self._release(None)
+            else:
+                self._waiters.remove(waiter)
+                waiter.cancel()
+            self.stats["abandoned"] += 1
+            raise
+        if not waiter.done():
+            self._waiters.remove(waiter)
+            waiter.cancel()
+            self._reject("shed_deadline", f"waited {self.queue_timeout_s:g}s without a free slot")
+
+        # _release already counted this request into in_flight
+        now = time.monotonic()
+        self.queue_wait_ms.append((now - queued_at) * 1000)
+        self.stats["admitted_from_queue"] += 1
+        return Permit(self, now)
+
+    def _release(self, permit: Optional[Permit]):
+        if permit is not None:
+            self.service_ms.append((time.monotonic() - permit.started) * 1000)
+            self.stats["completed"] += 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the oldest waiter
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        permit = await self.acquire()
+        try:
+            yield permit
+        finally:
+            permit.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "queue_timeout_s": self.queue_timeout_s,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            **self.stats,
+            "shed": self.stats["shed_queue_full"] + self.stats["shed_deadline"],
+            "queue_wait_ms": percentiles(self.queue_wait_ms),
+            "service_ms": percentiles(self.service_ms),
+        }
@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple
+from models import (
+    CompanyCandidateRelevancyEvaluation,
+    JobApplicationResponses,
+    JobRelevancyEvaluation,
+    ModelReasons,
+)
+
+# Instructions shared by the agents below (also reused inside some prompts)
+CLIENT_AGENT_INSTRUCTIONS = "You are Alicia, a staffing agent that helps clients apply for job applications."
+SERVER_AGENT_INSTRUCTIONS = "You are Sammy, a human resources agent that works with clients and representatives to identify good fits for prospective hires."
+RATING_AGENT_INSTRUCTIONS = (
+    "You are a hiring committee member. "
+    "Read the candidate's responses and assign an integer rating from 1 (poor) to 10 (excellent) "
+    "based on their demonstrated skills, clarity, and fit for the role. "
+    "Respond with just the number."
+)
+SKILLS_AGENT_INSTRUCTIONS = (
+    "You are a hiring analyst. "
+    "From the following candidate responses, extract the list of distinct skills "
+    "(both technical and soft) that the candidate demonstrates or mentions. "
+    "Respond with a JSON array of skill strings."
+)
+PROS_SUMMARY_INSTRUCTIONS = "You are an analyst that reads hiring feedback and extracts the top strengths observed by companies."
+CONS_SUMMARY_INSTRUCTIONS = "You are an analyst that reads hiring feedback and extracts the top areas for improvement noticed by companies."
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    name: str
+    instructions: str
+    tools: Tuple[str, ...] = ()
+    output_type: Any = None
+
+
+# Every agent the backend runs, keyed by role. Agents are stateless, so one
+# instance per key is built on first use and reused for every job.
+AGENT_SPECS = {
+    "client-review": AgentSpec("client-agent", CLIENT_AGENT_INSTRUCTIONS, ("get_resume",), JobRelevancyEvaluation),
+    "client-pitch": AgentSpec("client-agent", CLIENT_AGENT_INSTRUCTIONS, ("get_resume",)),
+    "client-application": AgentSpec("client-agent", CLIENT_AGENT_INSTRUCTIONS, ("get_resume",), JobApplicationResponses),
+    "server-feedback": AgentSpec("server-agent", SERVER_AGENT_INSTRUCTIONS, (), CompanyCandidateRelevancyEvaluation),
+    "rating": AgentSpec("rating-agent", RATING_AGENT_INSTRUCTIONS, (), int),
+    "skills": AgentSpec("skills-extractor", SKILLS_AGENT_INSTRUCTIONS, (), List[str]),
+    "summary-pros": AgentSpec("summary-agent", PROS_SUMMARY_INSTRUCTIONS, (), ModelReasons),
+    "summary-cons": AgentSpec("summary-agent", CONS_SUMMARY_INSTRUCTIONS, (), ModelReasons),
+    "demo": AgentSpec("test", "You are a staffing agent that helps clients apply for job applications.", ("get_resume",)),
+}
+
+CLIENT_AGENTS = ("client-review", "client-pitch", "client-application", "summary-pros", "summary-cons")
+SERVER_AGENTS = ("server-feedback", "rating", "skills")
+
+
+def _build_tool(name: str):
+    from agent_tools import get_resume_tool
+
+    factories = {"get_resume": get_resume_tool}
+    return factories[name]()
+
+
+@lru_cache(maxsize=None)
+def get_output_schema(key: str):
+    """
+    Precomputed output schema for an agent, handed to the SDK so the Runner
+    doesn't rebuild it on every run.
+    """
+    spec = AGENT_SPECS[key]
+    if spec.output_type is None:
+        return None
+
+    from agents.agent_output import AgentOutputSchema
+
+    return AgentOutputSchema(spec.output_type)
+
+
+@lru_cache(maxsize=None)
+def get_agent(key: str):
+    """
+    Return the shared `Agent` for `key`, building it (and its schemas) on first use.
+    """
+    from agents import Agent
+
+    spec = AGENT_SPECS[key]
+    return Agent(
+        name=spec.name,
+        instructions=spec.instructions,
+        tools=[_build_tool(tool) for tool in spec.tools],
+        output_type=get_output_schema(key),
+    )
+
+
+def warm_agents(keys: Optional[Iterable[str]] = None):
+    """
+    Import the agents SDK and build the given agents ahead of the first request.
+    """
+    for key in keys or AGENT_SPECS:
+        get_agent(key)
@@ -1,30 +1,40 @@
 import json 
-import os
-from pydantic import BaseModel
-from agents import RunContextWrapper, FunctionTool
-from utils import fix_schema_for_openai
+from functools import lru_cache
 from typing import Any
-from agents import Agent, Runner, trace
+from pydantic import BaseModel
+from utils import strict_json_schema
+
+RESUME_PATH = "test_data/resume/resume-ansh.json"
 
 # Pydantic model for GetResumeTool's arguments
 class GetResumeTool(BaseModel):
     pass
 
-async def get_resume(ctx: RunContextWrapper[Any], args: str):
-    with open("test_data/resume/resume-ansh.json", 'r') as f:
+async def get_resume(ctx: Any, args: str):
+    # The run context names the candidate being served; without one, fall back to the default resume
+    candidate = getattr(ctx, "context", None)
+    if getattr(candidate, "resume", None) is not None:
+        return candidate.resume
+    with open(getattr(candidate, "resume_path", RESUME_PATH), 'r') as f:
         resume = json.load(f)
     return resume
 
-# (2.3) Build and modify the JSON schema
-resume_tool_schema = GetResumeTool.model_json_schema()
-resume_tool_schema = fix_schema_for_openai(resume_tool_schema)
+@lru_cache(maxsize=None)
+def get_resume_tool():
+    # The agents SDK is imported lazily so importing this module stays cheap
+    from agents import FunctionTool
+
+    return FunctionTool(
+        name="get_resume",
+        description=(
+            "Retrieve the resume of the client (the candidate this run is for)."
+        ),
+        params_json_schema=strict_json_schema(GetResumeTool),
+        on_invoke_tool=get_resume,
+    )
 
-# (2.4) Instantiate the FunctionTool for starting a container
-ResumeRetrievalTool = FunctionTool(
-    name="get_resume",
-    description=(
-        "Retrieve the resume of the client."
-    ),
-    params_json_schema=resume_tool_schema,
-    on_invoke_tool=get_resume,
-)
+def __getattr__(name: str):
+    # Keep `from agent_tools import ResumeRetrievalTool` working without building the tool at import time
+    if name == "ResumeRetrievalTool":
+        return get_resume_tool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
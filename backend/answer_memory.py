@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+from models import JobApplicationQuestion, JobApplicationQuestions, JobApplicationResponse, JobApplicationResponses
+
+# CONSTANTS
+ANSWER_MEMORY_PATH = os.path.join("client_data", "answer_memory.json")
+ANSWER_MEMORY_MAX_ENTRIES = int(os.getenv("ANSWER_MEMORY_MAX_ENTRIES", "5000"))
+# Questions about this particular company or role are always sent to the model
+COMPANY_SPECIFIC_PATTERNS = [
+    re.compile(pattern) for pattern in (
+        r"\bwhy\b.*\b(us|our|here|join|joining|this (company|role|position|team|job|opportunity))\b",
+        r"\bwhy\b.*\bwork (at|for|with)\b",
+        r"\b(this|our) (company|role|position|team|mission|product|products|opportunity)\b",
+        r"\binterest(ed|s)? you about\b",
+        r"\bwhat (excites|attracts) you\b",
+    )
+]
+
+
+def normalize_question(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def is_company_specific(question: JobApplicationQuestion) -> bool:
+    normalized = normalize_question(question.question)
+    return any(pattern.search(normalized) for pattern in COMPANY_SPECIFIC_PATTERNS)
+
+
+def resume_version(resume: Dict[str, Any]) -> str:
+    return hashlib.blake2b(json.dumps(resume, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def memory_key(question: JobApplicationQuestion, version: str) -> str:
+    return f"{version}|{question.type.strip().lower()}|{normalize_question(question.question)}"
+
+
+class AnswerMemory:
+    """
+    Application answers the model already wrote, keyed by normalized question
+    text, question type and resume version, so common questions (work
+    authorization, years of experience, ...) are answered once per resume
+    instead of once per job. Company-specific questions are never reused,
+    and editing the resume changes its version, which retires every old answer.
+    """
+
+    def __init__(self, path: str = ANSWER_MEMORY_PATH, max_entries: int = ANSWER_MEMORY_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"hits": 0, "misses": 0, "company_specific": 0, "stored": 0}
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Serializes whole saves, so an older snapshot never replaces a newer one
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps({"entries": self.entries})
+                self._dirty = False
+            directory = os.path.dirname(self.path) or "."
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".answer_memory-", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        f.write(data)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            except OSError as e:
+                # Keep the answers dirty so the next save retries them
+                with self._lock:
+                    self._dirty = True
+                print(f"Failed to save answer memory: {e}")
+
+    def split(self, application: JobApplicationQuestions, version: str) -> Tuple[Dict[int, JobApplicationResponse], JobApplicationQuestions]:
+        """
+        Answers already known for `application` (by question index), and the
+        questions that still need the model.
+        """
+        known, pending = {}, []
+        with self._lock:
+            for index, question in enumerate(application.questions):
+                entry = None
+                if is_company_specific(question):
+                    self.stats["company_specific"] += 1
+                else:
+                    entry = self.entries.get(memory_key(question, version))
+                if entry is None:
+                    self.stats["misses"] += 1
+                    pending.append(question)
+                    continue
+                self.stats["hits"] += 1
+                entry["uses"] += 1
+                entry["last_used"] = time.time()
+                self._dirty = True
+                # Answer with the question exactly as this application words it
+                known[index] = JobApplicationResponse(question=question.question, response=entry["response"])
+        return known, JobApplicationQuestions(questions=pending)
+
+    def merge(self, application: JobApplicationQuestions, known: Dict[int, JobApplicationResponse],
+              filled: Optional[JobApplicationResponses], version: str) -> JobApplicationResponses:
+        """
+        Put the known answers and the model's answers back in the application's
+        question order, and remember the model's answers to reusable questions.
+        """
+        pending = [(index, question) for index, question in enumerate(application.questions) if index not in known]
+        answers = list(filled.responses) if filled is not None else []
+        by_question = {}
+        for answer in answers:
+            by_question.setdefault(normalize_question(answer.question), answer)
+        # Fall back to position when the model reworded the questions but answered all of them
+        positional = len(answers) == len(pending)
+
+        known, used = dict(known), set()
+        for slot, (index, question) in enumerate(pending):
+            answer = by_question.get(normalize_question(question.question))
+            if answer is None and positional:
+                answer = answers[slot]
+            if answer is not None:
+                used.add(id(answer))
+                known[index] = JobApplicationResponse(question=question.question, response=answer.response)
+                self._remember(question, answer.response, version)
+        responses = [known[index] for index in range(len(application.questions)) if index in known]
+        # Keep anything else the model answered rather than dropping it
+        responses += [answer for answer in answers if id(answer) not in used]
+        return JobApplicationResponses(responses=responses)
+
+    def _remember(self, question: JobApplicationQuestion, response: str, version: str):
+        if not response.strip() or is_company_specific(question):
+            return
+        now = time.time()
+        with self._lock:
+            self.entries[memory_key(question, version)] = {
+                "question": question.question,
+                "response": response,
+                "uses": 0,
+                "created": now,
+                "last_used": now,
+            }
+            self.stats["stored"] += 1
+            self._dirty = True
+            if len(self.entries) > self.max_entries:
+                # Drop the least recently used answers
+                for key, _ in sorted(self.entries.items(), key=lambda item: item[1]["last_used"])[:len(self.entries) - self.max_entries]:
+                    del self.entries[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self.entries), "resume_versions": len({key.split("|", 1)[0] for key in self.entries}), **self.stats}
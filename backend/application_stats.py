@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from shared_state import WriteTransaction, connect
+
+# CONSTANTS
+# Response-length histogram buckets (characters): label and inclusive upper bound
+LENGTH_BUCKETS = (("0", 0), ("1-49", 49), ("50-99", 99), ("100-249", 249), ("250-499", 499),
+                  ("500-999", 999), ("1000+", None))
+SECONDS_PER_DAY = 86400
+INGEST_BATCH = 500
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS app_seen (job_id TEXT NOT NULL, app_id TEXT NOT NULL, PRIMARY KEY (job_id, app_id));
+CREATE TABLE IF NOT EXISTS app_daily (
+    job_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    applications INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    PRIMARY KEY (job_id, day)
+);
+CREATE TABLE IF NOT EXISTS app_questions (
+    job_id TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answered INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    length_sum INTEGER NOT NULL,
+    {", ".join(f"b{i} INTEGER NOT NULL" for i in range(len(LENGTH_BUCKETS)))},
+    PRIMARY KEY (job_id, question)
+);
+"""
+
+
+def length_bucket(length: int) -> int:
+    for i, (_, upper) in enumerate(LENGTH_BUCKETS):
+        if upper is None or length <= upper:
+            return i
+    return len(LENGTH_BUCKETS) - 1
+
+
+def _day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class ApplicationStats:
+    """
+    Per-job application counters kept in SQLite next to the shared state, so
+    every worker reads and updates the same numbers: submissions per day
+    (and how many answered every question), and per question the answered
+    count, total response length and a response-length histogram.
+
+    `/jobs/apply` records each application as it is saved; `sync()` backfills
+    applications already on disk (each application is counted once, by id).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ready = threading.Event()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    # Updates
+    def _add(self, conn, job_id: str, app_id: str, responses: List[Dict[str, str]], timestamp: float) -> bool:
+        if conn.execute("INSERT OR IGNORE INTO app_seen VALUES (?, ?)", (job_id, app_id)).rowcount == 0:
+            return False
+        answered = [bool((item.get("response") or "").strip()) for item in responses]
+        complete = int(bool(answered) and all(answered))
+        conn.execute(
+            "INSERT INTO app_daily VALUES (?, ?, 1, ?) ON CONFLICT(job_id, day) DO UPDATE SET "
+            "applications = applications + 1, complete = complete + excluded.complete",
+            (job_id, int(timestamp // SECONDS_PER_DAY), complete),
+        )
+        n_buckets = len(LENGTH_BUCKETS)
+        for item, is_answered in zip(responses, answered):
+            length = len((item.get("response") or "").strip())
+            buckets = [0] * n_buckets
+            buckets[length_bucket(length)] = 1
+            conn.execute(
+                f"INSERT INTO app_questions VALUES (?, ?, ?, 1, ?, {', '.join('?' * n_buckets)}) "
+                "ON CONFLICT(job_id, question) DO UPDATE SET answered = answered + excluded.answered, "
+                "total = total + 1, length_sum = length_sum + excluded.length_sum, "
+                + ", ".join(f"b{i} = b{i} + excluded.b{i}" for i in range(n_buckets)),
+                (job_id, item.get("question", ""), int(is_answered), length, *buckets),
+            )
+        return True
+
+    def record(self, job_id: str, app_id: str, responses: List[Dict[str, str]], timestamp: Optional[float] = None) -> bool:
+        with WriteTransaction(self._connect()) as conn:
+            return self._add(conn, job_id, app_id, responses, time.time() if timestamp is None else timestamp)
+
+    def sync(self, applications_folder: str) -> int:
+        """
+        Count applications on disk that were never recorded (using the file
+        mtime as the submission time) and return how many were added.
+        """
+        conn = self._connect()
+        seen = set(conn.execute("SELECT job_id, app_id FROM app_seen"))
+        pending = []
+        if os.path.isdir(applications_folder):
+            for job_dir in os.scandir(applications_folder):
+                if not job_dir.is_dir():
+                    continue
+                for entry in os.scandir(job_dir.path):
+                    name = entry.name
+                    if name.startswith("app-") and name.endswith(".json") and (job_dir.name, name[4:-5]) not in seen:
+                        pending.append((job_dir.name, name[4:-5], entry.path))
+
+        added = 0
+        for start in range(0, len(pending), INGEST_BATCH):
+            batch = []
+            for job_id, app_id, path in pending[start:start + INGEST_BATCH]:
+                try:
+                    with open(path) as f:
+                        responses = json.load(f).get("responses", [])
+                    batch.append((job_id, app_id, responses, os.stat(path).st_mtime))
+                except (OSError, ValueError):
+                    continue
+            with WriteTransaction(conn):
+                added += sum(self._add(conn, *args) for args in batch)
+        self.ready.set()
+        return added
+
+    # Queries
+    @staticmethod
+    def _question_rows(rows: Iterable[tuple]) -> List[Dict[str, Any]]:
+        questions = []
+        for question, answered, total, length_sum, *buckets in rows:
+            questions.append({
+                "question": question,
+                "responses": total,
+                "answered": answered,
+                "completion_rate": round(answered / total, 4) if total else 0.0,
+                "mean_length": round(length_sum / answered, 1) if answered else 0.0,
+                "length_histogram": {label: count for (label, _), count in zip(LENGTH_BUCKETS, buckets)},
+            })
+        return questions
+
+    @staticmethod
+    def _totals(daily: List[tuple]) -> Dict[str, Any]:
+        applications = sum(row[1] for row in daily)
+        complete = sum(row[2] for row in daily)
+        return {
+            "applications": applications,
+            "complete_applications": complete,
+            "completion_rate": round(complete / applications, 4) if applications else 0.0,
+            "submissions_per_day": [{"date": _day(day * SECONDS_PER_DAY), "applications": n} for day, n, _ in daily],
+        }
+
+    def job_stats(self, job_id: str, since: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        first_day = int(since // SECONDS_PER_DAY) if since else 0
+        daily = conn.execute("SELECT day, applications, complete FROM app_daily WHERE job_id = ? AND day >= ? ORDER BY day",
+                             (job_id, first_day)).fetchall()
+        questions = conn.execute(
+            f"SELECT question, answered, total, length_sum, {', '.join(f'b{i}' for i in range(len(LENGTH_BUCKETS)))} "
+            "FROM app_questions WHERE job_id = ? ORDER BY total DESC, question", (job_id,)).fetchall()
+        if not daily and not questions:
+            return None
+        return {"job_id": job_id, **self._totals(daily), "questions": self._question_rows(questions)}
+
+    def catalog_stats(self, since: Optional[float] = None, top_jobs: int = 20, top_questions: int = 50) -> Dict[str, Any]:
+        conn = self._connect()
+        first_day = int(since // SECONDS_PER_DAY) if since else 0
+        daily = conn.execute("SELECT day, SUM(applications), SUM(complete) FROM app_daily WHERE day >= ? GROUP BY day ORDER BY day",
+                             (first_day,)).fetchall()
+        jobs = conn.execute(
+            "SELECT job_id, SUM(applications), SUM(complete) FROM app_daily WHERE day >= ? "
+            "GROUP BY job_id ORDER BY SUM(applications) DESC, job_id LIMIT ?", (first_day, top_jobs)).fetchall()
+        n_jobs = conn.execute("SELECT COUNT(DISTINCT job_id) FROM app_daily WHERE day >= ?", (first_day,)).fetchone()[0]
+        questions = conn.execute(
+            "SELECT question, SUM(answered), SUM(total), SUM(length_sum), "
+            f"{', '.join(f'SUM(b{i})' for i in range(len(LENGTH_BUCKETS)))} FROM app_questions "
+            "GROUP BY question ORDER BY SUM(total) DESC, question LIMIT ?", (top_questions,)).fetchall()
+        return {
+            **self._totals(daily),
+            "jobs_with_applications": n_jobs,
+            "top_jobs": [
+                {"job_id": job_id, "applications": n, "completion_rate": round(complete / n, 4) if n else 0.0}
+                for job_id, n, complete in jobs
+            ],
+            "questions": self._question_rows(questions),
+        }
@@ -0,0 +1,127 @@
+"""
+Query latency of the columnar record analytics (record_columns.py).
+
+Builds a RecordColumns cache of --records synthetic client records spread over
+--days days and --companies companies (plus --files real record files ingested
+through `refresh()`), then times the histogram, funnel and trends queries for
+a 30-day window and for the whole range. Reports the median of --runs runs.
+
+Usage (from backend/):
+    python benchmarks/analytics.py --records 2000000 --out analytics.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.throughput import git_commit  # noqa: E402
+from record_columns import RecordColumns  # noqa: E402
+
+
+def synthetic_columns(n: int, days: float, companies: int, jobs: int, seed: int):
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    internal = rng.uniform(0, 10, n).astype(np.float32)
+    company = np.where(internal >= 5, rng.uniform(0, 10, n), np.nan).astype(np.float32)
+    return {
+        "timestamp": now - rng.uniform(0, days * 86400, n),
+        "internal": internal,
+        "company": company,
+        "company_code": rng.integers(0, companies, n, dtype=np.int32),
+        "job_code": rng.integers(0, jobs, n, dtype=np.int32),
+    }, rng.integers(0, 2 ** 63, n, dtype=np.uint64)
+
+
+def write_records(data_dir: str, n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(data_dir, "candidate-0"), exist_ok=True)
+    now = time.time()
+    for i in range(n):
+        record = {"timestamp": str(now - rng.uniform(0, 86400)), "internal_review": {"score": float(rng.uniform(0, 10))},
+                  "company_feedback": {"score": float(rng.uniform(0, 10))}, "company_url": f"http://company-{i % 7}",
+                  "job_id": f"job-{i % 101}"}
+        with open(os.path.join(data_dir, "candidate-0", f"record-{i}.json"), "w") as f:
+            json.dump(record, f)
+
+
+def timed(fn, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=2_000_000)
+    parser.add_argument("--files", type=int, default=2000, help="Record files ingested through refresh()")
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="analytics-")
+    try:
+        data_dir = os.path.join(root, "client_data")
+        columns = RecordColumns(data_dir, os.path.join(data_dir, "analytics"))
+        columns.companies = [f"http://company-{i}" for i in range(args.companies)]
+        columns._company_codes = {company: code for code, company in enumerate(columns.companies)}
+
+        started = time.perf_counter()
+        columns.append(*synthetic_columns(args.records, args.days, args.companies, args.jobs, args.seed))
+        build_ms = (time.perf_counter() - started) * 1000
+
+        write_records(data_dir, args.files, args.seed)
+        started = time.perf_counter()
+        ingested = columns.refresh()
+        ingest_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        columns.refresh()
+        rescan_ms = (time.perf_counter() - started) * 1000
+
+        now = time.time()
+        windows = {"30d": (now - 30 * 86400, now), "all": (now - args.days * 86400, now)}
+        queries = {}
+        for label, (start, end) in windows.items():
+            queries[f"histogram {label}"] = timed(lambda: columns.histogram(start, end), args.runs)
+            queries[f"histogram {label} one company"] = timed(
+                lambda: columns.histogram(start, end, "company", company_url="http://company-3"), args.runs)
+            queries[f"funnel {label}"] = timed(lambda: columns.funnel(start, end), args.runs)
+            queries[f"trends {label} day"] = timed(lambda: columns.trends(start, end, "day"), args.runs)
+        snapshot = columns.snapshot()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "records": snapshot["records"],
+        "column_bytes": snapshot["bytes"],
+        "build_ms": round(build_ms, 1),
+        "ingest_files": ingested,
+        "ingest_ms": round(ingest_ms, 1),
+        "rescan_ms": round(rescan_ms, 1),
+        "query_ms": queries,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Bulk job import and export through a company server.
+
+Starts one company server (fake model backend) on an empty catalog, streams
+--jobs synthetic jobs into POST /jobs/bulk as NDJSON (generated on the fly,
+so the harness holds no catalog in memory either), streams them back out of
+GET /jobs/export, and for comparison creates --baseline-jobs more through one
+POST /jobs/create each. Reports jobs/second for each path and the server's
+peak RSS.
+
+Usage (from backend/):
+    python benchmarks/bulk_jobs.py --jobs 100000 --out bulk.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import make_job  # noqa: E402
+from benchmarks.throughput import Process, free_port, git_commit, wait_until_ready  # noqa: E402
+from http_responses import dumps  # noqa: E402
+
+
+def ndjson_jobs(n: int, seed: int, chunk_lines: int = 256):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        job = make_job(rng, i)
+        lines.append(dumps({"description": job["description"], "questions": job["questions"]}) + b"\n")
+        if len(lines) >= chunk_lines:
+            yield b"".join(lines)
+            lines = []
+    if lines:
+        yield b"".join(lines)
+
+
+def wait_for_indexes(url: str, timeout: float = 120.0):
+    # /jobs/bulk answers 503 until the job indexes have opened
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if requests.post(f"{url}/jobs/bulk", data=b"", timeout=5).status_code != 503:
+            return
+        time.sleep(0.2)
+    raise TimeoutError("Job indexes did not become ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--baseline-jobs", type=int, default=500, help="Jobs created one request at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bulk-jobs-")
+    os.makedirs(os.path.join(root, "test_data", "jobs"))
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR, "MODEL_BACKEND": "fake"}
+    server = Process("server", [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--port", str(port),
+                                "--log-level", "warning", "server:app"], root, env)
+    try:
+        wait_until_ready(f"{url}/diagnostics/shared", timeout=60)
+        wait_for_indexes(url)
+
+        started = time.perf_counter()
+        response = requests.post(f"{url}/jobs/bulk", data=ndjson_jobs(args.jobs, args.seed),
+                                 headers={"Content-Type": "application/x-ndjson"}, timeout=3600)
+        response.raise_for_status()
+        import_s = time.perf_counter() - started
+        imported = response.json()
+
+        started = time.perf_counter()
+        exported = exported_bytes = 0
+        with requests.get(f"{url}/jobs/export", stream=True, timeout=3600) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    exported += 1
+                    exported_bytes += len(line) + 1
+        export_s = time.perf_counter() - started
+
+        rng = random.Random(args.seed + 1)
+        started = time.perf_counter()
+        for i in range(args.baseline_jobs):
+            job = make_job(rng, args.jobs + i)
+            requests.post(f"{url}/jobs/create", json={"description": job["description"], "questions": job["questions"]},
+                          timeout=60).raise_for_status()
+        baseline_s = time.perf_counter() - started
+    finally:
+        server.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "import": {"seconds": round(import_s, 2), "jobs_per_second": round(args.jobs / import_s, 1),
+                   **{key: imported[key] for key in ("imported", "rejected", "batches")}},
+        "export": {"seconds": round(export_s, 2), "jobs": exported, "jobs_per_second": round(exported / export_s, 1),
+                   "megabytes": round(exported_bytes / 1e6, 1)},
+        "create_one_by_one": {"seconds": round(baseline_s, 2),
+                              "jobs_per_second": round(args.baseline_jobs / baseline_s, 1) if args.baseline_jobs else None},
+        "server_peak_rss_mb": server.peak_rss_mb,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
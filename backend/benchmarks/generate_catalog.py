@@ -0,0 +1,154 @@
+"""
+Generate a synthetic company/client data directory at production scale.
+
+Writes, under --out:
+    test_data/jobs/<job-id>/{description.txt, questions.json}   (JobApplicationQuestions + id)
+    applications/<job-id>/app-<uuid>.json                        (JobApplicationResponses)
+    client_data/record-<timestamp>.json                           (client_loop.log_data records)
+
+Jobs are generated in fixed-size chunks, each with its own derived seed, so the
+output is identical for a given --seed regardless of --workers.
+
+Usage (from backend/):
+    python benchmarks/generate_catalog.py --out /tmp/catalog --jobs 100000 --applications-per-job 3 --client-records 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import AREAS, SKILLS, make_job  # noqa: E402
+
+CHUNK_SIZE = 1000
+JOBS_FOLDER = os.path.join("test_data", "jobs")
+APPLICATIONS_FOLDER = "applications"
+CLIENT_DATA_DIR = "client_data"
+
+
+def _write_job(jobs_dir: str, job: dict):
+    job_dir = os.path.join(jobs_dir, job["id"])
+    os.makedirs(job_dir, exist_ok=True)
+    with open(os.path.join(job_dir, "description.txt"), "w") as f:
+        f.write(job["description"])
+    with open(os.path.join(job_dir, "questions.json"), "w") as f:
+        json.dump(job["questions"], f, indent=2)
+
+
+def _write_application(applications_dir: str, job: dict, rng: random.Random):
+    app_dir = os.path.join(applications_dir, job["id"])
+    os.makedirs(app_dir, exist_ok=True)
+    responses = [
+        {
+            "question": q["question"],
+            # Leave some answers blank so completion rates are realistic
+            "response": "" if rng.random() < 0.05 else " ".join(
+                rng.choice(SKILLS + AREAS) for _ in range(rng.randint(3, 60))
+            ),
+        }
+        for q in job["questions"]["questions"]
+    ]
+    app_id = uuid.UUID(int=rng.getrandbits(128))
+    with open(os.path.join(app_dir, f"app-{app_id}.json"), "w") as f:
+        json.dump({"responses": responses}, f)
+
+
+def _generate_chunk(root: str, seed: int, chunk: int, start: int, stop: int, apps_per_job: float) -> int:
+    rng = random.Random(f"{seed}:{chunk}")
+    jobs_dir = os.path.join(root, JOBS_FOLDER)
+    applications_dir = os.path.join(root, APPLICATIONS_FOLDER)
+    written = 0
+    for index in range(start, stop):
+        job = make_job(rng, index)
+        _write_job(jobs_dir, job)
+        # Round the mean stochastically so fractional rates like 0.5 apps/job work
+        n_apps = int(apps_per_job) + (1 if rng.random() < apps_per_job % 1 else 0)
+        for _ in range(n_apps):
+            _write_application(applications_dir, job, rng)
+        written += 1
+    return written
+
+
+def make_client_record(rng: random.Random, timestamp: float, job_id: str) -> dict:
+    """
+    A record shaped like `client_loop.log_data` output.
+    """
+    internal_score = round(rng.uniform(0, 10), 1)
+    company_feedback = {}
+    if internal_score >= 5:
+        company_feedback = {
+            "score": round(rng.uniform(0, 10), 1),
+            "candidate_pros": [f"Strong {rng.choice(SKILLS)} experience" for _ in range(rng.randint(1, 4))],
+            "candidate_cons": [f"Limited exposure to {rng.choice(AREAS)}" for _ in range(rng.randint(1, 3))],
+        }
+    return {
+        "timestamp": str(timestamp),
+        "datetime": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+        "description": f"Synthetic posting {job_id}",
+        "internal_review": {"score": internal_score, "justification": "Synthetic internal review."},
+        "company_feedback": company_feedback,
+    }
+
+
+def generate_client_records(root: str, n_records: int, seed: int, days: int = 90):
+    rng = random.Random(f"{seed}:client")
+    client_dir = os.path.join(root, CLIENT_DATA_DIR)
+    os.makedirs(client_dir, exist_ok=True)
+    now = time.time()
+    for i in range(n_records):
+        timestamp = now - rng.uniform(0, days * 86400)
+        record = make_client_record(rng, timestamp, f"job-{rng.randint(0, 10 ** 6)}")
+        # Suffix keeps filenames unique when timestamps collide
+        with open(os.path.join(client_dir, f"record-{timestamp:.6f}-{i}.json"), "w") as f:
+            json.dump(record, f, indent=2)
+
+
+def generate_catalog(root: str, n_jobs: int, apps_per_job: float = 0.0, n_client_records: int = 0,
+                     seed: int = 0, workers: int = 1, verbose: bool = False):
+    os.makedirs(os.path.join(root, JOBS_FOLDER), exist_ok=True)
+    os.makedirs(os.path.join(root, APPLICATIONS_FOLDER), exist_ok=True)
+    chunks = [
+        (root, seed, chunk, start, min(start + CHUNK_SIZE, n_jobs), apps_per_job)
+        for chunk, start in enumerate(range(0, n_jobs, CHUNK_SIZE))
+    ]
+
+    started, done = time.perf_counter(), 0
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for written in pool.map(_generate_chunk, *zip(*chunks)) if chunks else []:
+                done += written
+                if verbose:
+                    print(f"{done}/{n_jobs} jobs ({time.perf_counter() - started:.1f}s)")
+    else:
+        for args in chunks:
+            done += _generate_chunk(*args)
+            if verbose:
+                print(f"{done}/{n_jobs} jobs ({time.perf_counter() - started:.1f}s)")
+
+    if n_client_records:
+        generate_client_records(root, n_client_records, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="Directory to use as the server/client working directory")
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--applications-per-job", type=float, default=0.0)
+    parser.add_argument("--client-records", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    generate_catalog(args.out, args.jobs, args.applications_per_job, args.client_records, args.seed, args.workers, verbose=True)
+    print(f"Wrote {args.jobs} jobs to {args.out} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Payload size and serialization cost of the large list endpoints.
+
+Generates a synthetic catalog (see generate_catalog.py), then compares:
+  * encode: the previous path (FastAPI `List[dict]` response-model validation +
+    jsonable_encoder + json.dumps) against the FastJSONResponse path, on the same data
+  * end to end: GET /jobs/get and /jobs/ids through the server app, per
+    projection and Accept-Encoding, reporting wire bytes and median time
+
+Usage (from backend/):
+    python benchmarks/serialization.py --jobs 20000 --out serialization.json
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.generate_catalog import JOBS_FOLDER, generate_catalog  # noqa: E402
+
+
+def median_ms(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def encode_benchmarks(jobs: list, repeat: int) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from http_responses import FastJSONResponse, orjson
+
+    adapter = TypeAdapter(List[dict])
+
+    def previous():
+        # What FastAPI does for `response_model=List[dict]`: validate, encode, dump
+        validated = adapter.validate_python(jobs)
+        return JSONResponse(jsonable_encoder(validated)).body
+
+    def current():
+        return FastJSONResponse(jobs).body
+
+    return {
+        "orjson": orjson is not None,
+        "previous_ms": median_ms(previous, repeat),
+        "current_ms": median_ms(current, repeat),
+        "previous_bytes": len(previous()),
+        "current_bytes": len(current()),
+    }
+
+
+def endpoint_benchmarks(repeat: int) -> list:
+    from fastapi.testclient import TestClient
+
+    # The server app checks its model backend at startup; these endpoints never call it
+    os.environ.setdefault("MODEL_BACKEND", "fake")
+    import server
+
+    cases = [
+        ("/jobs/get", None),
+        ("/jobs/get", "id"),
+        ("/jobs/get", "id,questions"),
+        ("/jobs/ids", None),
+    ]
+    encodings = ["identity", "gzip", "br"]
+    rows = []
+    with TestClient(server.app) as client:
+        # Let the startup index builds finish so they don't compete for CPU
+        server.job_index.ready.wait()
+        server.job_text_index.ready.wait()
+        for path, fields in cases:
+            params = {"fields": fields} if fields else {}
+            for encoding in encodings:
+                headers = {"Accept-Encoding": encoding}
+                response = client.get(path, params=params, headers=headers)
+                response.raise_for_status()
+                rows.append({
+                    "endpoint": path + (f"?fields={fields}" if fields else ""),
+                    "accept_encoding": encoding,
+                    "content_encoding": response.headers.get("content-encoding", "identity"),
+                    "wire_bytes": int(response.headers.get("content-length", len(response.content))),
+                    "median_ms": median_ms(lambda: client.get(path, params=params, headers=headers), repeat),
+                })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="serialization-")
+    cwd = os.getcwd()
+    try:
+        generate_catalog(root, args.jobs, seed=args.seed, workers=args.workers)
+        os.chdir(root)
+        from job_utils import get_job_data
+
+        jobs = get_job_data(JOBS_FOLDER)
+        report = {
+            "jobs": args.jobs,
+            "encode": encode_benchmarks(jobs, args.repeat),
+            "endpoints": endpoint_benchmarks(args.repeat),
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    encode = report["encode"]
+    print(f"encode {args.jobs} jobs: previous {encode['previous_ms']} ms ({encode['previous_bytes']} B), "
+          f"current {encode['current_ms']} ms ({encode['current_bytes']} B), orjson={encode['orjson']}")
+    print(f"{'endpoint':<32}{'accept':>10}{'encoding':>10}{'bytes':>12}{'ms':>10}")
+    for row in report["endpoints"]:
+        print(f"{row['endpoint']:<32}{row['accept_encoding']:>10}{row['content_encoding']:>10}"
+              f"{row['wire_bytes']:>12}{row['median_ms']:>10.1f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Startup-time benchmark for the backend entry points.
+
+Imports each entry point in a fresh interpreter (without OPENAI_API_KEY set),
+reports the median import time plus the slowest modules from `-X importtime`,
+and fails if an entry point exceeds its budget or eagerly imports the agents SDK.
+
+Usage (from backend/):
+    python benchmarks/startup.py [--runs 5] [--budget-ms 1200] [--out startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ["server", "client", "main", "router"]
+DEFAULT_BUDGETS_MS = {"server": 1000, "client": 1000, "main": 500, "router": 800}
+
+# Modules that must only be imported once an agent actually runs
+LAZY_MODULES = ["agents", "openai", "dotenv"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"import_ms": elapsed, "eager": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr: str, top: int = 10):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(rows, key=lambda row: -row["cumulative_ms"])[:top]
+
+
+def measure(module: str, runs: int):
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    samples, eager, slowest = [], [], []
+    for i in range(runs):
+        cmd = [sys.executable]
+        if i == runs - 1:
+            cmd += ["-X", "importtime"]
+        cmd += ["-c", PROBE.format(module=module, lazy=LAZY_MODULES)]
+        proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        eager = result["eager"]
+        if i == runs - 1:
+            # importtime adds overhead, so only use this run for the breakdown
+            slowest = parse_importtime(proc.stderr)
+        else:
+            samples.append(result["import_ms"])
+
+    return {
+        "median_import_ms": round(statistics.median(samples), 1),
+        "min_import_ms": round(min(samples), 1),
+        "eager_heavy_imports": eager,
+        "slowest_modules": slowest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Override the per-entry-point budgets")
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results, failures = {}, []
+    for module in ENTRY_POINTS:
+        budget = args.budget_ms or DEFAULT_BUDGETS_MS[module]
+        result = measure(module, max(2, args.runs))
+        result["budget_ms"] = budget
+        results[module] = result
+
+        print(f"{module:<8} {result['median_import_ms']:>8.1f} ms (budget {budget} ms)")
+        if result["median_import_ms"] > budget:
+            failures.append(f"{module} took {result['median_import_ms']} ms, budget is {budget} ms")
+        if result["eager_heavy_imports"]:
+            failures.append(f"{module} imports {', '.join(result['eager_heavy_imports'])} at import time")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Microbenchmarks for the file-backed storage operations at increasing catalog sizes.
+
+For each size a fresh synthetic catalog is generated (see generate_catalog.py)
+and every operation is timed several times. The report includes the median time
+per call and a log-log growth exponent per operation (1.0 = linear in catalog size).
+
+Usage (from backend/):
+    python benchmarks/storage.py --sizes 1000,10000,100000 --out storage.json
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.generate_catalog import APPLICATIONS_FOLDER, JOBS_FOLDER, generate_catalog  # noqa: E402
+from job_utils import create_job, delete_job, get_job_data, job_exists, update_job  # noqa: E402
+from client import compute_totals  # noqa: E402
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def list_applications(job_id: str):
+    # Same access pattern as GET /jobs/{job_id}/ratings
+    return sorted((Path(APPLICATIONS_FOLDER) / job_id).glob("app-*.json"))
+
+
+def list_all_applications():
+    # Same access pattern as GET /skills/top (before its [:3] cut-off)
+    base = Path(APPLICATIONS_FOLDER)
+    return [p for job_dir in base.iterdir() if job_dir.is_dir() for p in job_dir.glob("app-*.json")]
+
+
+def bench_size(size: int, repeat: int, apps_per_job: float, client_records: int, workers: int) -> dict:
+    root = tempfile.mkdtemp(prefix=f"storage-{size}-")
+    cwd = os.getcwd()
+    try:
+        generate_catalog(root, size, apps_per_job, client_records, seed=size, workers=workers)
+        os.chdir(root)
+        jobs_dir = JOBS_FOLDER
+        job_ids = sorted(os.listdir(jobs_dir))
+        existing = job_ids[len(job_ids) // 2]
+        with open(os.path.join(jobs_dir, existing, "questions.json")) as f:
+            questions = json.load(f)
+        counter = iter(range(10 ** 9))
+
+        def create_one():
+            job_id = f"bench-{next(counter)}"
+            create_job("Benchmark posting", {**questions, "id": job_id}, job_folders=jobs_dir)
+            return job_id
+
+        created = []
+        results = {
+            "get_job_data": timed(lambda: get_job_data(jobs_dir), max(1, repeat // 2)),
+            "job_exists (hit)": timed(lambda: job_exists(existing, jobs_dir), repeat),
+            "job_exists (miss)": timed(lambda: job_exists("no-such-job", jobs_dir), repeat),
+            "create_job": timed(lambda: created.append(create_one()), repeat),
+            "update_job": timed(lambda: update_job(existing, new_description="Updated", job_folders=jobs_dir), repeat),
+            "delete_job": timed(lambda: delete_job(created.pop(), jobs_dir), repeat),
+            "list_applications (one job)": timed(lambda: list_applications(existing), repeat),
+            "list_applications (all jobs)": timed(list_all_applications, max(1, repeat // 2)),
+            "get_totals": timed(lambda: compute_totals(0, time.time()), max(1, repeat // 2)),
+        }
+        return {op: round(ms, 3) for op, ms in results.items()}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def growth_exponent(sizes, timings) -> float:
+    # Least-squares slope of log(time) against log(size)
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-6)) for t in timings]
+    mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+    denom = sum((x - mean_x) ** 2 for x in xs)
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denom, 2) if denom else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated catalog sizes (jobs)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--applications-per-job", type=float, default=2.0)
+    parser.add_argument("--client-records-ratio", type=float, default=1.0, help="Client records per job")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    by_size = {}
+    for size in sizes:
+        print(f"Benchmarking {size} jobs...")
+        by_size[size] = bench_size(size, args.repeat, args.applications_per_job,
+                                   int(size * args.client_records_ratio), args.workers)
+
+    operations = list(by_size[sizes[0]])
+    report = {
+        "sizes": sizes,
+        "median_ms": {op: {str(size): by_size[size][op] for size in sizes} for op in operations},
+        "growth_exponent": {
+            op: growth_exponent(sizes, [by_size[size][op] for size in sizes]) if len(sizes) > 1 else None
+            for op in operations
+        },
+    }
+
+    header = f"{'operation':<30}" + "".join(f"{size:>12}" for size in sizes) + f"{'exponent':>10}"
+    print(header)
+    for op in operations:
+        row = "".join(f"{by_size[size][op]:>12.2f}" for size in sizes)
+        print(f"{op:<30}{row}{report['growth_exponent'][op] or 0:>10.2f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Synthetic job postings and resumes for benchmarks and load tests.
+
+Everything is generated from a seeded `random.Random`, so the same seed
+always produces the same catalog.
+"""
+import random
+
+COMPANIES = ["Zyphra", "Northwind", "Acme Robotics", "Helios Compute", "Bluefin Labs", "Quanta Systems"]
+ROLES = [
+    "Research Scientist", "Machine Learning Engineer", "Site Reliability Engineer", "Backend Engineer",
+    "Infrastructure Engineer", "Data Engineer", "Compiler Engineer", "Hardware Architect",
+]
+AREAS = [
+    "distributed training", "inference optimization", "GPU kernels", "Rust services", "observability",
+    "data pipelines", "compiler toolchains", "memory subsystems", "reinforcement learning", "Kubernetes",
+]
+SKILLS = [
+    "Python", "PyTorch", "CUDA", "Rust", "Go", "C++", "Terraform", "Ansible", "Docker", "Slurm",
+    "SQL", "Spark", "Verilog", "Chipyard", "JAX", "Triton", "gRPC", "Kafka", "Ray", "vLLM",
+]
+PERKS = [
+    "Comprehensive medical, dental, vision, and FSA plans", "Competitive compensation and 401(k)",
+    "Relocation and immigration support on a case-by-case basis", "On-site meals prepared by a dedicated culinary team",
+]
+COMMON_QUESTIONS = ["name", "email", "Are you authorized to work in the United States?", "How many years of experience do you have?"]
+ROLE_QUESTIONS = [
+    "Which one project most demonstrates the skills needed for this role and why?",
+    "What is one 'crazy idea' you have that you want to test out at scale?",
+    "If you have any open-source work, what commit or project are you most proud of?",
+    "Why do you want to work at {company}?",
+    "Describe a time you debugged a difficult {area} problem.",
+]
+
+
+def make_description(rng: random.Random, company: str, role: str, paragraphs: int = 6) -> str:
+    areas = rng.sample(AREAS, 3)
+    lines = [
+        f"{company} is hiring a {role}.",
+        "The Role:",
+        f"As a {role}, you will work on {areas[0]}, {areas[1]} and {areas[2]}.",
+        "",
+        "Requirements:",
+    ]
+    for _ in range(paragraphs):
+        skill, area = rng.choice(SKILLS), rng.choice(AREAS)
+        lines.append(f"Experience with {skill} for {area}, and the ability to ship {rng.choice(AREAS)} work quickly.")
+        lines.append("")
+    lines.append("Benefits and Perks:")
+    lines.extend(rng.sample(PERKS, 2))
+    return "\n".join(lines) + "\n"
+
+
+def make_questions(rng: random.Random, job_id: str, company: str, n_questions: int = 6) -> dict:
+    """
+    A questions.json payload shaped like `JobApplicationQuestions` (plus the job id).
+    """
+    n_role = max(0, n_questions - len(COMMON_QUESTIONS))
+    texts = COMMON_QUESTIONS[:n_questions] + [
+        rng.choice(ROLE_QUESTIONS).format(company=company, area=rng.choice(AREAS)) for _ in range(n_role)
+    ]
+    return {
+        "id": job_id,
+        "questions": [
+            {"expected_response": "string_content", "type": "short_answer", "question": text}
+            for text in texts
+        ],
+    }
+
+
+def make_job(rng: random.Random, index: int, company: str = None) -> dict:
+    company = company or rng.choice(COMPANIES)
+    role = rng.choice(ROLES)
+    job_id = f"{role.lower().replace(' ', '-')}-{index}"
+    return {
+        "id": job_id,
+        "description": make_description(rng, company, role, paragraphs=rng.randint(4, 12)),
+        "questions": make_questions(rng, job_id, company, n_questions=rng.randint(4, 8)),
+    }
+
+
+def make_resume(rng: random.Random, index: int) -> dict:
+    return {
+        "name": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "education": {"school": "State University", "degree": "BS Computer Science", "gpa": round(rng.uniform(3.0, 4.0), 2)},
+        "skills": rng.sample(SKILLS, 6),
+        "experiences": [
+            {
+                "company": rng.choice(COMPANIES),
+                "location": "Remote",
+                "role": rng.choice(ROLES),
+                "date": f"20{rng.randint(18, 24)}",
+                "description": f"Worked on {rng.choice(AREAS)} using {rng.choice(SKILLS)} and {rng.choice(SKILLS)}.",
+            }
+            for _ in range(rng.randint(2, 4))
+        ],
+        "projects": [
+            {"title": f"{rng.choice(AREAS).title()} Project", "description": f"Built a {rng.choice(AREAS)} prototype in {rng.choice(SKILLS)}."}
+            for _ in range(rng.randint(1, 3))
+        ],
+    }
@@ -0,0 +1,275 @@
+"""
+End-to-end throughput benchmark for router, company servers and client pipelines.
+
+Starts a local router, N company servers seeded with M synthetic jobs each and
+K client pipelines (one per synthetic candidate, or with --shared-client a
+single pipeline serving all K), all against the fake model backend, then
+drives one full client cycle. Reports jobs/second (internal reviews the
+clients actually completed, next to the nominal companies x jobs x
+candidates pair count), per-endpoint
+p50/p95/p99 latency (measured server-side) and peak RSS per process as JSON.
+
+Usage (from backend/):
+    python benchmarks/throughput.py --companies 2 --jobs 50 --candidates 2 --out results.json
+    python benchmarks/throughput.py --companies 2 --jobs 50 --candidates 8 --shared-client
+    python benchmarks/throughput.py ... --compare previous.json
+    python benchmarks/throughput.py ... --record runs/      # keep every agent run
+    python benchmarks/throughput.py ... --replay runs/      # answer them from the log, at disk speed
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import make_job, make_resume, COMPANIES  # noqa: E402
+from diagnostics import percentiles  # noqa: E402
+from job_utils import create_job  # noqa: E402
+
+CLIENT_PIPELINE = (
+    "import asyncio, json, client_loop\n"
+    "from model_backend import load_settings, run_log_snapshot\n"
+    "load_settings()\n"
+    "asyncio.run(client_loop.async_client_loop())\n"
+    "json.dump(run_log_snapshot(), open('runs.json', 'w'))\n"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+class Process:
+    """
+    A child process whose peak RSS is collected from wait4() when it exits.
+    """
+
+    def __init__(self, name: str, cmd, cwd: str, env: dict):
+        self.name = name
+        self.log_path = os.path.join(cwd, f"{name}.log")
+        self.log = open(self.log_path, "w")
+        self.popen = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        self.peak_rss_mb = None
+        self.returncode = None
+
+    def wait(self):
+        _, status, usage = os.wait4(self.popen.pid, 0)
+        self.popen.returncode = self.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        self.peak_rss_mb = round(usage.ru_maxrss / scale, 1)
+        self.log.close()
+        return self.returncode
+
+    def stop(self):
+        if self.returncode is None:
+            self.popen.terminate()
+            self.wait()
+
+
+def wait_until_ready(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+def seed_company(workdir: str, company: str, n_jobs: int, rng: random.Random):
+    jobs_dir = os.path.join(workdir, "test_data", "jobs")
+    for i in range(n_jobs):
+        job = make_job(rng, i, company=company)
+        create_job(job["description"], job["questions"], job_folders=jobs_dir)
+
+
+def seed_client(workdir: str, indices, router_url: str, rng: random.Random) -> str:
+    """
+    Write one resume per candidate index and return the CANDIDATE_RESUMES value.
+    """
+    resume_dir = os.path.join(workdir, "test_data", "resume")
+    os.makedirs(resume_dir, exist_ok=True)
+    paths = []
+    for index in indices:
+        path = os.path.join(resume_dir, f"candidate-{index}.json")
+        with open(path, "w") as f:
+            json.dump(make_resume(rng, index), f, indent=2)
+        paths.append(path)
+    with open(os.path.join(workdir, "routers.json"), "w") as f:
+        json.dump({"routers": [router_url]}, f)
+    return ",".join(paths)
+
+
+def collect_latencies(urls):
+    merged = {}
+    for url in urls:
+        snapshot = requests.get(f"{url}/diagnostics/loop", params={"include_samples": "true"}, timeout=5).json()
+        for label, samples in snapshot.get("request_latency_samples_ms", {}).items():
+            if "/diagnostics/" in label:
+                continue  # the harness's own readiness probes
+            merged.setdefault(label, []).extend(samples)
+    return {label: {**percentiles(samples), "count": len(samples)} for label, samples in sorted(merged.items())}
+
+
+def count_files(root: str, prefix: str) -> int:
+    return sum(
+        1 for _, _, files in os.walk(root) for name in files
+        if name.startswith(prefix) and name.endswith(".json")
+    )
+
+
+def completed_reviews(workdir: str) -> int:
+    # Internal reviews a client pipeline finished, from the snapshot it wrote on exit
+    try:
+        with open(os.path.join(workdir, "runs.json")) as f:
+            return json.load(f).get("completed_runs", {}).get("client-review", 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    workroot = tempfile.mkdtemp(prefix="throughput-")
+    base_env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND_DIR,
+        "MODEL_BACKEND": "fake",
+        "FAKE_MODEL_LATENCY_MS": str(args.model_latency_ms),
+        "FAKE_MODEL_FAILURE_RATE": str(args.model_failure_rate),
+        "FAKE_MODEL_SEED": str(args.seed),
+        "LOOP_DIAGNOSTICS": "1",
+    }
+    if args.record:
+        base_env["RUN_LOG_DIR"] = os.path.abspath(args.record)
+    if args.replay:
+        base_env.update({"MODEL_BACKEND": "replay", "REPLAY_LOG": os.path.abspath(args.replay), "RUN_LOG": "0"})
+    uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+    processes = []
+
+    try:
+        # Company servers, each in its own working directory
+        company_urls = []
+        for i in range(args.companies):
+            workdir = os.path.join(workroot, f"company-{i}")
+            os.makedirs(workdir)
+            seed_company(workdir, COMPANIES[i % len(COMPANIES)], args.jobs, rng)
+            port = free_port()
+            processes.append(Process(f"company-{i}", uvicorn + ["--port", str(port), "server:app"], workdir, base_env))
+            company_urls.append(f"http://127.0.0.1:{port}")
+
+        router_port = free_port()
+        router_url = f"http://127.0.0.1:{router_port}"
+        router_env = {**base_env, "ROUTER_COMPANIES": ",".join(company_urls)}
+        processes.append(Process("router", uvicorn + ["--port", str(router_port), "router:app"], workroot, router_env))
+
+        for url in company_urls + [router_url]:
+            wait_until_ready(f"{url}/diagnostics/loop")
+
+        # One client pipeline per candidate (or one for all of them), all started together
+        groups = [range(args.candidates)] if args.shared_client else [[k] for k in range(args.candidates)]
+        started = time.perf_counter()
+        clients = []
+        for k, indices in enumerate(groups):
+            workdir = os.path.join(workroot, f"client-{k}")
+            os.makedirs(workdir)
+            resumes = seed_client(workdir, indices, router_url, rng)
+            client_env = {**base_env, "CANDIDATE_RESUMES": resumes}
+            clients.append(Process(f"client-{k}", [sys.executable, "-c", CLIENT_PIPELINE], workdir, client_env))
+        failed_clients = [client.name for client in clients if client.wait() != 0]
+        elapsed = time.perf_counter() - started
+
+        latencies = collect_latencies(company_urls + [router_url])
+        replay = [requests.get(f"{url}/diagnostics/runs", timeout=5).json().get("replay") for url in company_urls]
+    finally:
+        for process in processes:
+            process.stop()
+
+    jobs_evaluated = sum(completed_reviews(os.path.join(workroot, client.name)) for client in clients)
+    results = {
+        "commit": git_commit(),
+        "config": vars(args),
+        "elapsed_s": round(elapsed, 3),
+        "nominal_pairs": args.companies * args.jobs * args.candidates,
+        "jobs_evaluated": jobs_evaluated,
+        "jobs_per_second": round(jobs_evaluated / elapsed, 3) if elapsed else 0.0,
+        "applications_submitted": count_files(workroot, "app-"),
+        "company_feedback_logged": sum(
+            count_files(os.path.join(workroot, f"company-{i}", "server_data"), "record-") for i in range(args.companies)
+        ),
+        "client_records": sum(
+            count_files(os.path.join(workroot, client.name, "client_data"), "record-") for client in clients
+        ),
+        "failed_clients": failed_clients,
+        "replay": replay if args.replay else None,
+        "endpoint_latency_ms": latencies,
+        "peak_rss_mb": {process.name: process.peak_rss_mb for process in processes + clients},
+        "workdir": workroot,
+    }
+
+    if not args.keep:
+        shutil.rmtree(workroot, ignore_errors=True)
+        results["workdir"] = None
+    return results
+
+
+def compare(current: dict, previous: dict):
+    def delta(new, old):
+        return f"{new} (was {old}, {((new - old) / old * 100) if old else 0:+.1f}%)"
+
+    print(f"jobs/second: {delta(current['jobs_per_second'], previous['jobs_per_second'])}")
+    for label, stats in current["endpoint_latency_ms"].items():
+        old = previous.get("endpoint_latency_ms", {}).get(label)
+        if old:
+            print(f"{label} p95: {delta(stats['p95'], old['p95'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=2)
+    parser.add_argument("--jobs", type=int, default=20, help="Jobs per company")
+    parser.add_argument("--candidates", type=int, default=1)
+    parser.add_argument("--shared-client", action="store_true", help="Serve all candidates from one client pipeline")
+    parser.add_argument("--model-latency-ms", type=float, default=50)
+    parser.add_argument("--model-failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary working directory")
+    parser.add_argument("--record", default=None, help="Record every agent run to this directory")
+    parser.add_argument("--replay", default=None, help="Answer agent runs from logs recorded with --record")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Company-server throughput as the number of uvicorn worker processes grows.
+
+Generates a synthetic catalog (see generate_catalog.py), then for each
+--workers value starts `uvicorn server:app --workers N` on it (fake model
+backend) and drives a fixed mix of requests from --load-procs load-generator
+processes for --duration seconds:
+
+  * GET /jobs/get?fields=id,questions and GET /jobs/ids   (shared catalog)
+  * POST /jobs/feedback with a small pool of repeated payloads (shared feedback cache)
+  * POST /jobs/create followed by GET /jobs/ids            (cross-worker read-your-writes)
+
+Reports requests/second, per-endpoint p50/p95/p99, model calls made (cache
+misses) and how many created jobs were missing from the next catalog read.
+
+Usage (from backend/):
+    python benchmarks/workers.py --workers 1,2,4 --jobs 5000 --duration 20 --out workers.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.generate_catalog import generate_catalog  # noqa: E402
+from benchmarks.synthetic import make_resume  # noqa: E402
+from benchmarks.throughput import free_port, git_commit, wait_until_ready  # noqa: E402
+from diagnostics import percentiles  # noqa: E402
+
+# Share of requests per kind; the rest are catalog reads
+FEEDBACK_SHARE = 0.3
+CREATE_SHARE = 0.02
+FEEDBACK_PAYLOADS = 20
+
+
+async def _drive(url: str, duration: float, concurrency: int, seed: int) -> dict:
+    import httpx
+
+    rng = random.Random(seed)
+    payloads = [
+        {"description": f"Job {i}", "candidate_pitch": f"Pitch {i}", "candidate_resume": make_resume(random.Random(i), i)}
+        for i in range(FEEDBACK_PAYLOADS)
+    ]
+    latencies = {}
+    errors = 0
+    stale_reads = 0
+    deadline = time.perf_counter() + duration
+
+    async def timed(label, coro):
+        started = time.perf_counter()
+        response = await coro
+        latencies.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        return response
+
+    async def user(client):
+        nonlocal errors, stale_reads
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            try:
+                if roll < CREATE_SHARE:
+                    created = await timed("POST /jobs/create", client.post(
+                        "/jobs/create", json={"description": "benchmark job", "questions": {"questions": []}}))
+                    ids = await timed("GET /jobs/ids", client.get("/jobs/ids"))
+                    stale_reads += created.json()["job_id"] not in ids.json()
+                elif roll < CREATE_SHARE + FEEDBACK_SHARE:
+                    await timed("POST /jobs/feedback", client.post("/jobs/feedback", json=rng.choice(payloads)))
+                elif roll < 0.6:
+                    await timed("GET /jobs/get", client.get("/jobs/get", params={"fields": "id,questions"}))
+                else:
+                    await timed("GET /jobs/ids", client.get("/jobs/ids"))
+            except httpx.HTTPError:
+                errors += 1
+
+    # A fresh connection per request spreads the load over the workers' shared accept queue
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=url, timeout=60, limits=limits) as client:
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+    return {"latencies": latencies, "errors": errors, "stale_reads": stale_reads}
+
+
+def drive(url: str, duration: float, concurrency: int, seed: int) -> dict:
+    return asyncio.run(_drive(url, duration, concurrency, seed))
+
+
+def run_workers(root: str, n_workers: int, args) -> dict:
+    # Each run starts from an empty shared state, caches and indexes
+    shutil.rmtree(os.path.join(root, "server_data"), ignore_errors=True)
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "PYTHONPATH": BACKEND_DIR,
+        "MODEL_BACKEND": "fake",
+        "FAKE_MODEL_LATENCY_MS": str(args.model_latency_ms),
+        "FAKE_MODEL_SEED": str(args.seed),
+    }
+    cmd = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning", "--workers", str(n_workers), "server:app"]
+    log = open(os.path.join(root, f"server-{n_workers}.log"), "w")
+    server = subprocess.Popen(cmd, cwd=root, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_until_ready(f"{url}/jobs/ids", timeout=120)
+        # Wait for the initial catalog sync so every run measures the steady state
+        while not requests.get(f"{url}/diagnostics/shared", timeout=5).json()["catalog_ready"]:
+            time.sleep(0.2)
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.load_procs) as pool:
+            parts = list(pool.map(drive, [url] * args.load_procs, [args.duration] * args.load_procs,
+                                  [args.concurrency] * args.load_procs, range(args.load_procs)))
+        elapsed = time.perf_counter() - started
+        shared = requests.get(f"{url}/diagnostics/shared", timeout=5).json()
+    finally:
+        server.terminate()
+        server.wait()
+        log.close()
+
+    merged = {}
+    for part in parts:
+        for label, samples in part["latencies"].items():
+            merged.setdefault(label, []).extend(samples)
+    total = sum(len(samples) for samples in merged.values())
+    return {
+        "workers": n_workers,
+        "requests": total,
+        "requests_per_second": round(total / elapsed, 1),
+        "errors": sum(part["errors"] for part in parts),
+        "stale_reads_after_create": sum(part["stale_reads"] for part in parts),
+        "feedback_model_calls": shared["feedback_cached"],
+        "endpoints": {label: {**percentiles(samples), "count": len(samples)} for label, samples in sorted(merged.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent requests per load process")
+    parser.add_argument("--load-procs", type=int, default=2)
+    parser.add_argument("--model-latency-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="workers-")
+    try:
+        generate_catalog(root, args.jobs, seed=args.seed, workers=os.cpu_count() or 1)
+        runs = [run_workers(root, int(n), args) for n in args.workers.split(",")]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {"commit": git_commit(), "config": vars(args), "cpus": os.cpu_count(), "runs": runs}
+    print(f"{'workers':>8}{'req/s':>10}{'errors':>8}{'stale':>8}{'model calls':>13}")
+    for run in runs:
+        print(f"{run['workers']:>8}{run['requests_per_second']:>10}{run['errors']:>8}"
+              f"{run['stale_reads_after_create']:>8}{run['feedback_model_calls']:>13}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
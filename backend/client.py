@@ -1,14 +1,26 @@
 import datetime
-from typing import List
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from typing import Dict, List, Optional
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 import asyncio
-from client_loop import async_client_loop, get_top_pros_data, get_top_cons_data  # assumes client_loop.py is in the same directory
+from agent_registry import CLIENT_AGENTS
+from model_backend import StreamDelta, StreamFinal, load_settings, run_log_snapshot, stream_agent
+from llm_scheduler import INTERACTIVE, get_scheduler
+from client_loop import TURNS, answer_memory, get_top_pros_data, get_top_cons_data, pitch_prompt  # assumes client_loop.py is in the same directory
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
 from fastapi.middleware.cors import CORSMiddleware
 import os 
 import json 
+from diagnostics import install_loop_diagnostics, run_blocking
+from http_responses import install_compression
+from resume_store import ResumeConflictError, ResumeStore, etag_matches
+from utils import sse_event
+import prompt_budget
+from company_health import get_company_health
+from crawl_scheduler import CrawlScheduler
+from dashboard import DashboardSummaries, RecordScanner
+from record_columns import ANALYTICS_REFRESH_S, TREND_BUCKETS_S, RecordColumns
 
 app = FastAPI()
 
@@ -18,18 +30,73 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Resume-Version"],
 )
 
+# gzip/brotli for large responses
+install_compression(app)
 
-async def periodic_client_loop(interval_seconds: int = 43200):  # 12 hours
-    while True:
-        print("Running client loop...")
-        await asyncio.to_thread(async_client_loop)
-        await asyncio.sleep(interval_seconds)
+# Opt-in event-loop lag monitor (LOOP_DIAGNOSTICS=1)
+install_loop_diagnostics(app)
+
+
+# Crawls each company on its own adaptive interval (see crawl_scheduler.py)
+crawl_scheduler = CrawlScheduler()
+background_tasks = []
 
 @app.on_event("startup")
 async def start_background_task():
-    asyncio.create_task(periodic_client_loop())
+    # Fail fast on a missing OPENAI_API_KEY, then import the agents SDK and build
+    # the client agents in the background so the API starts serving immediately
+    backend = load_settings()
+    asyncio.create_task(run_blocking(backend.warm, CLIENT_AGENTS))
+    background_tasks.append(asyncio.create_task(crawl_scheduler.run()))
+
+@app.on_event("shutdown")
+async def stop_background_task():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await crawl_scheduler.stop()
+
+@app.get("/diagnostics/llm", response_model=dict)
+async def get_llm_scheduler_stats():
+    return get_scheduler().snapshot()
+
+@app.get("/diagnostics/prompts", response_model=dict)
+async def get_prompt_budget_stats():
+    return prompt_budget.snapshot()
+
+@app.get("/diagnostics/runs", response_model=dict)
+async def get_run_log_stats():
+    return run_log_snapshot()
+
+@app.get("/diagnostics/answers", response_model=dict)
+async def get_answer_memory_stats():
+    return answer_memory.snapshot()
+
+@app.get("/crawl/schedule", response_model=List[dict])
+async def get_crawl_schedule():
+    """
+    Every known company with its next crawl time, learned interval and change rate, soonest first.
+    """
+    return crawl_scheduler.snapshot()
+
+@app.post("/crawl/run")
+async def run_crawl_now(company_url: str):
+    """
+    Move a company's next crawl to now.
+    """
+    if not crawl_scheduler.run_now(company_url):
+        raise HTTPException(status_code=404, detail="Unknown company")
+    return {"status": "scheduled", "company_url": company_url}
+
+@app.get("/companies/health", response_model=dict)
+async def get_companies_health():
+    """
+    Per-company circuit state, error and slow-call rates and latency, as seen by the client loop.
+    """
+    return get_company_health().snapshot()
 
 # 1) shared request models
 
@@ -49,10 +116,28 @@ class ReasonPercent(BaseModel):
     reason: str
     percent: str
 
+class DashboardSummary(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    totals: TotalsResponse
+    pros: List[ReasonPercent]
+    cons: List[ReasonPercent]
+    records: int
+    # Summaries that failed this time (served empty and not cached)
+    errors: Dict[str, str] = {}
+
 # 2) three dummy routes
 CLIENT_DATA_DIR = "client_data"
 
 
+# Parses each client record once; every totals/dashboard request reuses the summaries
+record_scanner = RecordScanner(CLIENT_DATA_DIR)
+dashboard_summaries = DashboardSummaries(record_scanner)
+
+
+def compute_totals(start_time: float, end_time: float) -> TotalsResponse:
+    return TotalsResponse(**record_scanner.scan(start_time, end_time).totals)
+
 @app.post("/applications/totals/summary", response_model=TotalsResponse)
 async def get_totals(req: TimeFrame):
     # Convert datetime objects to float timestamps
@@ -66,53 +151,7 @@ async def get_totals(req: TimeFrame):
     else:
         end_time = float(req.end_time)
 
-    total_applications = 0
-    relevant_matches = 0
-    approved = 0
-
-    for filename in os.listdir(CLIENT_DATA_DIR):
-        if not filename.endswith(".json"):
-            continue
-
-        filepath = os.path.join(CLIENT_DATA_DIR, filename)
-        try:
-            with open(filepath, "r") as f:
-                data = json.load(f)
-        except Exception:
-            continue
-
-        timestamp_str = data.get("timestamp")
-        if timestamp_str is None:
-            continue
-
-        try:
-            timestamp = float(timestamp_str)
-        except ValueError:
-            continue
-
-        if not (start_time <= timestamp <= end_time):
-            continue
-
-        total_applications += 1
-
-        internal_review = data.get("internal_review", {})
-        internal_score = internal_review.get("score")
-        if isinstance(internal_score, (int, float)) and internal_score > 5.0:
-            relevant_matches += 1
-
-        company_feedback = data.get("company_feedback", {})
-        company_score = None
-        if isinstance(company_feedback, dict):
-            company_score = company_feedback.get("score")
-
-        if isinstance(company_score, (int, float)) and company_score > 5.0:
-            approved += 1
-
-    return TotalsResponse(
-        total_applications=total_applications,
-        relevant_matches=relevant_matches,
-        approved=approved
-    )
+    return await run_blocking(compute_totals, start_time, end_time)
 
 @app.post("/applications/totals/pros", response_model=List[ReasonPercent])
 async def get_top_pros(req: TopNRequest):
@@ -130,6 +169,132 @@ async def get_top_cons(req: TopNRequest):
     return await get_top_cons_data(start_ts, end_ts, req.n)
 
 
+@app.get("/dashboard/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    response: Response,
+    days: float = 30,
+    n: int = 5,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Totals, top pros and top cons for one window (the last `days` days unless
+    start_time/end_time are given) from a single pass over the records. The
+    ETag changes only when the records in the window do, so a dashboard
+    refresh with If-None-Match gets a 304 without any model calls.
+    """
+    end = end_time or datetime.now().astimezone()
+    start = start_time or end - timedelta(days=days)
+    scan = await run_blocking(record_scanner.scan, start.timestamp(), end.timestamp())
+    etag = scan.etag(n)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    summary = await dashboard_summaries.get(scan, n)
+    if not summary["errors"]:
+        response.headers.update(headers)
+    return {"start_time": start, "end_time": end, **summary}
+
+
+# ------------------- ANALYTICS -------------------
+
+# Columnar copy of the records for histograms, funnels and trends (see record_columns.py)
+record_columns = RecordColumns(CLIENT_DATA_DIR)
+
+@app.on_event("shutdown")
+async def flush_record_columns():
+    await run_blocking(record_columns.flush)
+
+async def analytics_window(days: float, start_time: Optional[datetime], end_time: Optional[datetime]):
+    await run_blocking(record_columns.refresh, ANALYTICS_REFRESH_S)
+    end = end_time or datetime.now().astimezone()
+    start = start_time or end - timedelta(days=days)
+    return start.timestamp(), end.timestamp()
+
+@app.get("/analytics/histogram", response_model=dict)
+async def get_score_histogram(
+    score: str = "internal",
+    bins: int = 10,
+    days: float = 30,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    company_url: Optional[str] = None,
+):
+    """
+    Histogram of internal-review or company-feedback scores (0-10) over the window.
+    """
+    if score not in ("internal", "company"):
+        raise HTTPException(status_code=400, detail="score must be 'internal' or 'company'")
+    if not 1 <= bins <= 100:
+        raise HTTPException(status_code=400, detail="bins must be between 1 and 100")
+    start, end = await analytics_window(days, start_time, end_time)
+    return record_columns.histogram(start, end, score, bins, company_url)
+
+@app.get("/analytics/funnel", response_model=dict)
+async def get_conversion_funnel(
+    days: float = 30,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    top: int = 50,
+):
+    """
+    Per-company conversion: evaluated -> relevant -> company feedback -> approved.
+    """
+    start, end = await analytics_window(days, start_time, end_time)
+    return record_columns.funnel(start, end, top)
+
+@app.get("/analytics/trends", response_model=List[dict])
+async def get_score_trends(
+    bucket: str = "day",
+    days: float = 30,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    company_url: Optional[str] = None,
+):
+    """
+    Records, mean scores and approvals per hour, day or week.
+    """
+    if bucket not in TREND_BUCKETS_S:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {sorted(TREND_BUCKETS_S)}")
+    start, end = await analytics_window(days, start_time, end_time)
+    try:
+        return record_columns.trends(start, end, bucket, company_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/diagnostics/analytics", response_model=dict)
+async def get_analytics_stats():
+    return record_columns.snapshot()
+
+
+class PitchRequest(BaseModel):
+    description: Optional[str] = None
+
+@app.post("/pitch/stream")
+async def stream_pitch(req: PitchRequest, request: Request):
+    """
+    Draft a candidate pitch, streamed as server-sent events: `started` right
+    away, `delta` events with text as the model writes it, then `result` or `error`.
+    """
+    async def events():
+        yield sse_event("started", {})
+        try:
+            async for event in stream_agent("client-pitch", pitch_prompt(req.description), max_turns=TURNS, priority=INTERACTIVE):
+                if isinstance(event, StreamDelta):
+                    if event.text:
+                        yield sse_event("delta", {"text": event.text})
+                elif isinstance(event, StreamFinal):
+                    yield sse_event("result", {"pitch": event.output})
+                if await request.is_disconnected():
+                    return
+        except Exception as e:
+            yield sse_event("error", {"error": f"{type(e).__name__}: {e}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 
 ROUTERS_CONFIG_PATH = "routers.json"  # change this if needed
 
@@ -161,111 +326,146 @@ class Project(BaseModel):
     title: str
     description: str
 
+resume_store = ResumeStore(RESUME_PATH)
+
 # Resume loading/saving helpers
-def load_resume():
-    print("Opening resume", RESUME_PATH)
+def _resume_headers():
+    return {"ETag": resume_store.etag, "X-Resume-Version": str(resume_store.version)}
+
+async def load_resume():
     try:
-        print(os.path.exists(RESUME_PATH))
-        with open(RESUME_PATH, "r") as f:
-            d = json.load(f)
-            print("GOT", d)
-            return d
+        return await resume_store.read()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load resume: {str(e)}")
 
-def save_resume(resume_data):
+async def update_resume(mutate, if_match: Optional[str], response: Response):
+    """
+    Apply `mutate` through the single resume writer, honouring If-Match.
+    """
     try:
-        with open(RESUME_PATH, "w") as f:
-            json.dump(resume_data, f, indent=2)
+        await resume_store.update(mutate, if_match)
+    except ResumeConflictError as e:
+        raise HTTPException(
+            status_code=412,
+            detail="Resume was modified by another request; reload and retry",
+            headers={"ETag": e.etag},
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save resume: {str(e)}")
+    response.headers.update(_resume_headers())
+
+@app.get("/resume/version")
+async def get_resume_version():
+    await load_resume()
+    return {"version": resume_store.version, "etag": resume_store.etag}
 
 
 # ------------------- EXPERIENCE ROUTES -------------------
 
 @app.post("/resume/experience")
-async def add_experience(exp: Experience):
-    resume = load_resume()
-    resume.setdefault("experiences", []).append(exp.dict())
-    save_resume(resume)
-    return {"message": "Experience added successfully"}
+async def add_experience(exp: Experience, response: Response, if_match: Optional[str] = Header(None)):
+    def mutate(resume):
+        resume.setdefault("experiences", []).append(exp.dict())
+
+    await update_resume(mutate, if_match, response)
+    return {"message": "Experience added successfully", "version": resume_store.version}
 
 @app.put("/resume/experience/{index}")
-async def update_experience(index: int, exp: Experience):
-    resume = load_resume()
-    try:
-        resume["experiences"][index] = exp.dict()
-    except IndexError:
-        raise HTTPException(status_code=404, detail="Experience index out of range")
-    save_resume(resume)
-    return {"message": "Experience updated successfully"}
+async def update_experience(index: int, exp: Experience, response: Response, if_match: Optional[str] = Header(None)):
+    def mutate(resume):
+        try:
+            resume["experiences"][index] = exp.dict()
+        except IndexError:
+            raise HTTPException(status_code=404, detail="Experience index out of range")
+
+    await update_resume(mutate, if_match, response)
+    return {"message": "Experience updated successfully", "version": resume_store.version}
 
 @app.delete("/resume/experience/{index}")
-async def delete_experience(index: int):
-    resume = load_resume()
-    try:
-        del resume["experiences"][index]
-    except IndexError:
-        raise HTTPException(status_code=404, detail="Experience index out of range")
-    save_resume(resume)
-    return {"message": "Experience deleted successfully"}
+async def delete_experience(index: int, response: Response, if_match: Optional[str] = Header(None)):
+    def mutate(resume):
+        try:
+            del resume["experiences"][index]
+        except IndexError:
+            raise HTTPException(status_code=404, detail="Experience index out of range")
+
+    await update_resume(mutate, if_match, response)
+    return {"message": "Experience deleted successfully", "version": resume_store.version}
 
 @app.get("/resume/experience", response_model=List[Experience])
-async def get_all_experiences():
-    resume = load_resume()
+async def get_all_experiences(response: Response, if_none_match: Optional[str] = Header(None)):
+    resume = await load_resume()
+    if etag_matches(if_none_match, resume_store.etag):
+        return Response(status_code=304, headers=_resume_headers())
+    response.headers.update(_resume_headers())
     return resume.get("experiences", [])
 
 @app.get("/resume/experience/{index}", response_model=Experience)
-async def get_experience(index: int):
-    resume = load_resume()
+async def get_experience(index: int, response: Response, if_none_match: Optional[str] = Header(None)):
+    resume = await load_resume()
     experiences = resume.get("experiences", [])
     try:
-        return experiences[index]
+        experience = experiences[index]
     except IndexError:
         raise HTTPException(status_code=404, detail="Experience index out of range")
+    if etag_matches(if_none_match, resume_store.etag):
+        return Response(status_code=304, headers=_resume_headers())
+    response.headers.update(_resume_headers())
+    return experience
 
 
 
 # ------------------- PROJECT ROUTES -------------------
 
 @app.post("/resume/project")
-async def add_project(project: Project):
-    resume = load_resume()
-    resume.setdefault("projects", []).append(project.dict())
-    save_resume(resume)
-    return {"message": "Project added successfully"}
+async def add_project(project: Project, response: Response, if_match: Optional[str] = Header(None)):
+    def mutate(resume):
+        resume.setdefault("projects", []).append(project.dict())
+
+    await update_resume(mutate, if_match, response)
+    return {"message": "Project added successfully", "version": resume_store.version}
 
 @app.put("/resume/project/{index}")
-async def update_project(index: int, project: Project):
-    resume = load_resume()
-    try:
-        resume["projects"][index] = project.dict()
-    except IndexError:
-        raise HTTPException(status_code=404, detail="Project index out of range")
-    save_resume(resume)
-    return {"message": "Project updated successfully"}
+async def update_project(index: int, project: Project, response: Response, if_match: Optional[str] = Header(None)):
+    def mutate(resume):
+        try:
+            resume["projects"][index] = project.dict()
+        except IndexError:
+            raise HTTPException(status_code=404, detail="Project index out of range")
+
+    await update_resume(mutate, if_match, response)
+    return {"message": "Project updated successfully", "version": resume_store.version}
 
 @app.delete("/resume/project/{index}")
-async def delete_project(index: int):
-    resume = load_resume()
-    try:
-        del resume["projects"][index]
-    except IndexError:
-        raise HTTPException(status_code=404, detail="Project index out of range")
-    save_resume(resume)
-    return {"message": "Project deleted successfully"}
+async def delete_project(index: int, response: Response, if_match: Optional[str] = Header(None)):
+    def mutate(resume):
+        try:
+            del resume["projects"][index]
+        except IndexError:
+            raise HTTPException(status_code=404, detail="Project index out of range")
+
+    await update_resume(mutate, if_match, response)
+    return {"message": "Project deleted successfully", "version": resume_store.version}
 
 @app.get("/resume/project", response_model=List[Project])
-async def get_all_projects():
-    resume = load_resume()
-    print("LOADED RESUME", resume)
+async def get_all_projects(response: Response, if_none_match: Optional[str] = Header(None)):
+    resume = await load_resume()
+    if etag_matches(if_none_match, resume_store.etag):
+        return Response(status_code=304, headers=_resume_headers())
+    response.headers.update(_resume_headers())
     return resume.get("projects", [])
 
 @app.get("/resume/project/{index}", response_model=Project)
-async def get_project(index: int):
-    resume = load_resume()
+async def get_project(index: int, response: Response, if_none_match: Optional[str] = Header(None)):
+    resume = await load_resume()
     projects = resume.get("projects", [])
     try:
-        return projects[index]
+        project = projects[index]
     except IndexError:
         raise HTTPException(status_code=404, detail="Project index out of range")
+    if etag_matches(if_none_match, resume_store.etag):
+        return Response(status_code=304, headers=_resume_headers())
+    response.headers.update(_resume_headers())
+    return project
@@ -1,31 +1,143 @@
 import os
 import json
 import asyncio
-from typing import List, Union
-from agents import Agent, Runner, trace
-from dotenv import load_dotenv
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Union
 from pydantic import BaseModel
-from agent_tools import ResumeRetrievalTool
+from agent_registry import AGENT_SPECS
+from model_backend import load_settings, run_agent, run_agent_sync
+from llm_scheduler import INTERACTIVE
 from job_utils import get_job_data
+from text_vectors import HashingVectorizer, flatten_text, top_k_per_column
+import prompt_budget
+from company_health import CircuitOpenError, get_company_health
+from answer_memory import AnswerMemory, resume_version
 import uuid
 import requests
 from models import *
 import time 
 
-# 1) Load .env to get OPENAI_API_KEY
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise EnvironmentError("Please set the OPENAI_API_KEY environment variable (e.g. in a .env file).")
-
 CLIENT_DATA_DIR = "client_data"
-
-def get_resume(filepath = "test_data/resume/resume-ansh.json"):
+DEFAULT_RESUME_PATH = "test_data/resume/resume-ansh.json"
+
+# Comma-separated resume files and/or directories of resumes (*.json) to serve
+CANDIDATE_RESUMES = os.getenv("CANDIDATE_RESUMES", DEFAULT_RESUME_PATH)
+# Only each candidate's best-matching jobs per company go through the LLM stages
+PRESCORE_TOP_K = int(os.getenv("PRESCORE_TOP_K", "25"))
+PRESCORE_MIN_SIMILARITY = float(os.getenv("PRESCORE_MIN_SIMILARITY", "0.0"))
+# "async" submits feedback requests as tickets and long-polls for the result
+FEEDBACK_MODE = os.getenv("FEEDBACK_MODE", "sync")
+FEEDBACK_TIMEOUT_S = float(os.getenv("FEEDBACK_TIMEOUT_S", "600"))
+FEEDBACK_POLL_WAIT_S = 25
+# Per-call deadlines for company servers (seconds)
+ROUTER_DEADLINE_S = float(os.getenv("ROUTER_DEADLINE_S", "10"))
+ROUTER_QUERY_ALL = os.getenv("ROUTER_QUERY_ALL", "0") == "1"
+JOBS_DEADLINE_S = float(os.getenv("JOBS_DEADLINE_S", "30"))
+FEEDBACK_DEADLINE_S = float(os.getenv("FEEDBACK_DEADLINE_S", "120"))
+APPLY_DEADLINE_S = float(os.getenv("APPLY_DEADLINE_S", "15"))
+
+VECTORIZER = HashingVectorizer()
+
+def get_resume(filepath = DEFAULT_RESUME_PATH):
     with open(filepath, 'r') as f:
         resume = json.load(f)
     return resume
 
+
+@dataclass
+class Candidate:
+    """
+    One candidate served by the client pipeline. It is also the run context
+    handed to the agents, so their `get_resume` tool returns this resume.
+    """
+    candidate_id: str
+    resume_path: str
+    resume: Dict[str, Any]
+
+    @property
+    def data_dir(self) -> str:
+        return os.path.join(CLIENT_DATA_DIR, self.candidate_id)
+
+
+def load_candidates(spec: str = CANDIDATE_RESUMES) -> List[Candidate]:
+    paths = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        if os.path.isdir(entry):
+            paths.extend(sorted(os.path.join(entry, name) for name in os.listdir(entry) if name.endswith(".json")))
+        else:
+            paths.append(entry)
+
+    candidates = {}
+    for path in paths:
+        candidate_id = os.path.splitext(os.path.basename(path))[0]
+        if candidate_id in candidates:
+            raise ValueError(f"Two candidate resumes share the id {candidate_id!r}")
+        candidates[candidate_id] = Candidate(candidate_id, path, get_resume(path))
+    return list(candidates.values())
+
+
+def list_client_records(data_dir: str = CLIENT_DATA_DIR, candidate_id: Optional[str] = None) -> List[str]:
+    """
+    Paths of the client's record-*.json logs: per-candidate ones under
+    <data_dir>/<candidate_id>/ plus older records written at the top level.
+    """
+    if candidate_id is not None:
+        roots = [os.path.join(data_dir, candidate_id)]
+    else:
+        roots = [data_dir]
+        if os.path.isdir(data_dir):
+            roots += [entry.path for entry in os.scandir(data_dir) if entry.is_dir()]
+
+    paths = []
+    for root in roots:
+        if not os.path.isdir(root):
+            continue
+        paths.extend(
+            entry.path for entry in os.scandir(root)
+            if entry.is_file() and entry.name.startswith("record-") and entry.name.endswith(".json")
+        )
+    return paths
+
+
+def select_pairs(jobs: List[dict], candidate_vectors, top_k: int = PRESCORE_TOP_K,
+                 min_similarity: float = PRESCORE_MIN_SIMILARITY) -> List[List[int]]:
+    """
+    Score every job against every candidate with one matrix product over hashed
+    text vectors and return, per candidate, the indices of the jobs worth
+    sending through the LLM stages (best match first).
+    """
+    if not jobs:
+        return [[] for _ in range(candidate_vectors.shape[0])]
+    job_vectors = VECTORIZER.transform(job.get("description", "") for job in jobs)
+    scores = job_vectors @ candidate_vectors.T   # jobs x candidates cosine similarity
+    return top_k_per_column(scores, top_k, min_similarity)
+
+# Last directory fetched, for conditional requests: cache key -> (ETag, companies)
+_router_directories: Dict[str, tuple] = {}
+# Each client process starts its router rotation at a random point to spread the load
+_router_cursor = random.randrange(1 << 16)
+
+def fetch_router_directory(router_base: str, cache_key: str) -> List[str]:
+    cached = _router_directories.get(cache_key)
+    headers = {"If-None-Match": cached[0]} if cached and cached[0] else {}
+    r = requests.get(f"{router_base}/companies/get", headers=headers, timeout=ROUTER_DEADLINE_S)
+    if r.status_code == 304 and cached:
+        return cached[1]
+    r.raise_for_status()
+    companies = r.json()
+    _router_directories[cache_key] = (r.headers.get("ETag"), companies)
+    return companies
+
 def get_companies_from_router(config_path="routers.json"):
+    """
+    The company directory. Federated routers each serve the merged directory,
+    so routers are tried in rotation until one answers; ROUTER_QUERY_ALL=1
+    instead merges every router's list (for routers that don't peer).
+    Fetches are conditional, and since converged routers share an ETag an
+    unchanged directory costs a 304 from whichever router is asked.
+    """
+    global _router_cursor
     all_companies = []
 
     # Load router base URLs from JSON file
@@ -33,80 +145,182 @@ def get_companies_from_router(config_path="routers.json"):
         config = json.load(f)
         router_bases = config.get("routers", [])
 
+    if router_bases:
+        start = _router_cursor % len(router_bases)
+        _router_cursor += 1
+        router_bases = router_bases[start:] + router_bases[:start]
+
     for router_base in router_bases:
-        url = f"{router_base}/companies/get"
         try:
-            r = requests.get(url)
-            r.raise_for_status()
-            companies = r.json()
-            print(f"Got from {router_base}:", companies)
-            all_companies.extend(companies)
+            companies = fetch_router_directory(router_base, router_base if ROUTER_QUERY_ALL else "*")
         except Exception as e:
             print(f"Failed to get companies from {router_base}: {e}")
+            continue
+        print(f"Got from {router_base}:", companies)
+        all_companies.extend(company for company in companies if company not in all_companies)
+        if not ROUTER_QUERY_ALL:
+            break
 
     return all_companies
     
-def get_jobs(company_url: str): 
-    url = f"{company_url}/jobs/get"
-    r = requests.get(url)
-    
+def fetch_jobs(company_url: str) -> List[dict]:
+    """
+    The company's catalog (hedged GET within JOBS_DEADLINE_S). Raises
+    CircuitOpenError or a requests exception when it can't be fetched.
+    """
+    r = get_company_health().request(company_url, "GET", "/jobs/get", JOBS_DEADLINE_S, hedge=True)
     json_response = r.json()
-    print("Got Jobs", json_response)
+    print(f"Got {len(json_response)} jobs from {company_url}")
     return json_response
+
+def get_jobs(company_url: str): 
+    """
+    Like fetch_jobs, but an empty list when the company is failing or its circuit is open.
+    """
+    try:
+        return fetch_jobs(company_url)
+    except (CircuitOpenError, requests.exceptions.RequestException) as e:
+        print(f"Skipping {company_url}: {e}")
+        return []
     
-def get_company_feedback(company_url: str, description: str, candidate_pitch: str):
+def get_company_feedback(company_url: str, description: str, candidate_pitch: str, resume: Optional[dict] = None):
     url = f"{company_url}/jobs/feedback"
     payload = {
         "description": description,
         "candidate_pitch": candidate_pitch,
-        "candidate_resume" : get_resume()
+        "candidate_resume" : resume if resume is not None else get_resume()
     }
 
     try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
+        if FEEDBACK_MODE == "async":
+            return collect_feedback_ticket(company_url, url, payload)
+        response = get_company_health().request(company_url, "POST", "/jobs/feedback", FEEDBACK_DEADLINE_S, json=payload)
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except (CircuitOpenError, requests.exceptions.RequestException) as e:
         print(f"Error during request: {e}")
         return None
 
+def collect_feedback_ticket(company_url: str, url: str, payload: dict):
+    """
+    Submit the feedback request in async mode and long-poll its ticket. A full
+    queue (503) is retried after the server's Retry-After until the deadline.
+    """
+    health = get_company_health()
+    deadline = time.monotonic() + FEEDBACK_TIMEOUT_S
+    while True:
+        try:
+            response = health.request(company_url, "POST", "/jobs/feedback", FEEDBACK_DEADLINE_S,
+                                      params={"mode": "async"}, json=payload)
+            break
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code != 503 or time.monotonic() >= deadline:
+                raise
+            time.sleep(float(e.response.headers.get("Retry-After", "1")))
+    ticket = response.json()
+
+    poll_path = ticket["poll_url"]
+    while ticket["status"] not in ("done", "failed"):
+        if time.monotonic() >= deadline:
+            print(f"Timed out waiting for feedback ticket {ticket['ticket_id']}")
+            return None
+        response = health.request(company_url, "GET", poll_path, FEEDBACK_POLL_WAIT_S + 10,
+                                  long_poll=True, params={"wait": FEEDBACK_POLL_WAIT_S})
+        ticket = response.json()
+
+    print(f"Feedback ticket {ticket['ticket_id']}: queued {ticket['queue_wait_ms']} ms, processed {ticket['processing_ms']} ms")
+    if ticket["status"] == "failed":
+        print(f"Feedback evaluation failed: {ticket['error']}")
+        return None
+    return ticket["result"]
+
 def apply_to_job(company_url: str, job_application: JobApplicationResponses, job_id: str):
     job_submission = JobApplicationSubmission(
         response=job_application,
         job_id=job_id
     )
-    url = f"{company_url}/jobs/apply"
     payload = job_submission.model_dump()
 
     try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
+        response = get_company_health().request(company_url, "POST", "/jobs/apply", APPLY_DEADLINE_S, json=payload)
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except (CircuitOpenError, requests.exceptions.RequestException) as e:
         print(f"Error during request: {e}")
         return None
 
 
-# Job Relevancy Evaluation objects
-class JobRelevancyEvaluation(BaseModel):
-    score: float
-    justification: str
-
 TURNS = 2
 RELEVANT_JOB_THRESHOLD = 5 
 
-def log_data(job_description: str, internal_review: JobRelevancyEvaluation, company_feedback: Union[str, CompanyCandidateRelevancyEvaluation]) -> str:
+def pitch_prompt(description: Optional[str] = None) -> str:
+    prompt = f"""
+        Draft a message to reach out to the human-resources for the company. Introduce yourself and your candidate, and then discuss about how your candidate is looking for a job, and highlight why you feel he is a relevant fit for the job. 
+    """
+    if description:
+        prompt += f"""
+        Here is the job description:
+
+        {prompt_budget.fit("client-pitch", "description", description)}
+    """
+    return prompt
+
+# Answers to common application questions, reused across jobs (see answer_memory.py)
+answer_memory = AnswerMemory()
+
+
+def application_prompt(application: JobApplicationQuestions) -> str:
+    return f"""
+        Here is a job application. 
+        
+        {prompt_budget.fit("client-application", "questions", application)}
+    
+        Fill out the questions using data you have on the client. Make sure that you type out the question exactly as listed in the response.
+    """
+
+def fill_application_sync(application: JobApplicationQuestions, resume: Dict[str, Any]) -> JobApplicationResponses:
+    version = resume_version(resume)
+    known, pending = answer_memory.split(application, version)
+    filled = None
+    if pending.questions:
+        filled = run_agent_sync("client-application", application_prompt(pending), max_turns=2 * TURNS).final_output
+    filled = answer_memory.merge(application, known, filled, version)
+    answer_memory.save()
+    return filled
+
+async def fill_application(application: JobApplicationQuestions, candidate: Candidate) -> JobApplicationResponses:
+    """
+    Fill in an application: questions the answer memory knows for this resume
+    are answered locally, only the rest go to the model, and the answers come
+    back in the application's question order.
+    """
+    version = resume_version(candidate.resume)
+    known, pending = answer_memory.split(application, version)
+    filled = None
+    if pending.questions:
+        filled = await run_agent(
+            "client-application",
+            application_prompt(pending),
+            max_turns=2 * TURNS,
+            context=candidate,
+        )
+        filled = filled.final_output
+    filled = answer_memory.merge(application, known, filled, version)
+    await asyncio.to_thread(answer_memory.save)
+    return filled
+
+def log_data(job_description: str, internal_review: JobRelevancyEvaluation, company_feedback: Union[str, CompanyCandidateRelevancyEvaluation],
+             data_dir: str = CLIENT_DATA_DIR, candidate_id: Optional[str] = None, job_id: Optional[str] = None,
+             company_url: Optional[str] = None) -> str:
     current_time = str(time.time())
 
     # Verify that the client data directory exists
-    os.makedirs(CLIENT_DATA_DIR, exist_ok=True)
+    os.makedirs(data_dir, exist_ok=True)
 
     processed_company_feedback = {}
     if isinstance(company_feedback, CompanyCandidateRelevancyEvaluation):
         processed_company_feedback = company_feedback.model_dump()
 
     filename = f"record-{current_time}.json"
-    filepath = os.path.join(CLIENT_DATA_DIR, filename)
+    filepath = os.path.join(data_dir, filename)
 
     data = {
         "timestamp": current_time,  # Add raw timestamp
@@ -116,9 +330,19 @@ def log_data(job_description: str, internal_review: JobRelevancyEvaluation, comp
         "internal_review": internal_review.model_dump(),
         "company_feedback": processed_company_feedback
     }
-
-    with open(filepath, "w") as f:
+    if candidate_id is not None:
+        data["candidate_id"] = candidate_id
+    # Let analytics group records by company and job (see record_columns.py)
+    if job_id is not None:
+        data["job_id"] = job_id
+    if company_url is not None:
+        data["company_url"] = company_url
+
+    # Write then rename, so readers (dashboard, analytics) never see a partial record
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "w") as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp_path, filepath)
 
     return current_time
 
@@ -132,28 +356,23 @@ def client_loop():
         jobs = get_jobs(company_url)
 
         for job in jobs:
-            # Initialize the client agent
-            client_agent = Agent(
-                    name=f"client-agent",
-                    instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                    tools=[ResumeRetrievalTool],
-                    output_type=JobRelevancyEvaluation
-            )
-
+            if get_company_health().is_open(company_url):
+                print(f"Circuit for {company_url} is open; skipping its remaining jobs")
+                break
             description = job["description"]
             company_response = ""
 
             INTERNAL_REVIEW_PROMPT = f"""
                 Here is a description for a job by a company:
                 
-                {description}
+                {prompt_budget.fit("client-review", "description", description)}
                 
                 Please compare the client's resume and determine whether the candidate would be a good fit, based on his resume. Output a rating on 
                 a scale of 0-10, 10 being extremely qualified, and 0 meaning the client has zero observable qualifications. Then, provide a justification for your rating, citing specific evidence. 
             """
 
-            internal_review = Runner.run_sync(
-                client_agent, 
+            internal_review = run_agent_sync(
+                "client-review", 
                 INTERNAL_REVIEW_PROMPT,
                 max_turns=TURNS,
             ).final_output
@@ -164,18 +383,10 @@ def client_loop():
                 # client_log_data_on_conversation(description, company, internal_review.model_dump())
                 continue
         
-            REQUEST_SERVER_REVIEW_PROMPT = f"""
-                Draft a message to reach out to the human-resources for the company. Introduce yourself and your candidate, and then discuss about how your candidate is looking for a job, and highlight why you feel he is a relevant fit for the job. 
-            """
-            
-            client_agent = Agent(
-                    name=f"client-agent",
-                    instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                    tools=[ResumeRetrievalTool],
-            )
+            REQUEST_SERVER_REVIEW_PROMPT = pitch_prompt()
 
-            candidate_pitch = Runner.run_sync(
-                client_agent, 
+            candidate_pitch = run_agent_sync(
+                "client-pitch", 
                 REQUEST_SERVER_REVIEW_PROMPT,
                 max_turns=TURNS,
             ).final_output
@@ -188,211 +399,192 @@ def client_loop():
 
             print("\n\n")
             print("Got company feedback", company_feedback)
-            company_response = CompanyCandidateRelevancyEvaluation.model_validate(company_feedback)
+            if company_feedback is not None:
+                company_response = CompanyCandidateRelevancyEvaluation.model_validate(company_feedback)
         
-            if company_response.score >= RELEVANT_JOB_THRESHOLD:
+            if company_response and company_response.score >= RELEVANT_JOB_THRESHOLD:
                 application  = JobApplicationQuestions.model_validate(job["questions"])
-
-                JOB_APPLICATION_QUESTIONS_PROMPT = f"""
-                    Here is a job application. 
-                    
-                    {application.model_dump_json()}
-                
-                    Fill out the questions using data you have on the client. Make sure that you type out the question exactly as listed in the response.
-                """
-
-                application_agent = Agent(
-                        name=f"client-agent",
-                        instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                        tools=[ResumeRetrievalTool],
-                        output_type=JobApplicationResponses
-                )
-
-                application_filled = Runner.run_sync(
-                    application_agent,
-                    JOB_APPLICATION_QUESTIONS_PROMPT,
-                    max_turns=2 * TURNS,
-                ).final_output
+                application_filled = fill_application_sync(application, get_resume())
                 
                 # Apply to the application 
                 job_id = job["id"]
                 apply_to_job(company_url, application_filled, job_id)
 
-            print("\n\n")
-            print("Filled out job application with the following data", application_filled)
+                print("\n\n")
+                print("Filled out job application with the following data", application_filled)
             
             # Log data
-            log_data(description, internal_review, company_response)
-
-async def async_client_loop():
+            log_data(description, internal_review, company_response, job_id=job.get("id"), company_url=company_url)
 
-    # Retrieve companies from the router
-    companies = await asyncio.to_thread(get_companies_from_router)
-
-    for company_url in companies:
-        jobs = await asyncio.to_thread(get_jobs, company_url)
-
-        for job in jobs:
-            # Initialize the client agent
-            client_agent = Agent(
-                    name=f"client-agent",
-                    instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                    tools=[ResumeRetrievalTool],
-                    output_type=JobRelevancyEvaluation
-            )
-
-            description = job["description"]
-            company_response = ""
-
-            INTERNAL_REVIEW_PROMPT = f"""
-                Here is a description for a job by a company:
-                
-                {description}
-                
-                Please compare the client's resume and determine whether the candidate would be a good fit, based on his resume. Output a rating on 
-                a scale of 0-10, 10 being extremely qualified, and 0 meaning the client has zero observable qualifications. Then, provide a justification for your rating, citing specific evidence. 
-            """
-
-            internal_review = await asyncio.to_thread(
-                Runner.run_sync,
-                client_agent, 
-                INTERNAL_REVIEW_PROMPT,
-                max_turns=TURNS,
-            )
-            internal_review = internal_review.final_output
-            print("Client agent came up with ", internal_review, "for internal review")
-
-            if internal_review.score < RELEVANT_JOB_THRESHOLD:
-                continue
-        
-            REQUEST_SERVER_REVIEW_PROMPT = f"""
-                Draft a message to reach out to the human-resources for the company. Introduce yourself and your candidate, and then discuss about how your candidate is looking for a job, and highlight why you feel he is a relevant fit for the job. 
-            """
+async def evaluate_jobs(company_url: str, jobs: List[dict], candidate: Candidate, done: Optional[Set[str]] = None):
+    """
+    Run the LLM stages (internal review, pitch, company feedback, application)
+    for one candidate over the jobs selected for them at one company. The ids
+    of jobs that were fully evaluated are added to `done`; jobs skipped by an
+    open circuit, left without company feedback or interrupted by an error are not.
+    """
+    done = set() if done is None else done
+    tag = f"[{candidate.candidate_id}]"
+
+    for job in jobs:
+        if get_company_health().is_open(company_url):
+            print(tag, f"Circuit for {company_url} is open; skipping its remaining jobs")
+            break
+        description = job["description"]
+        company_response = ""
+
+        INTERNAL_REVIEW_PROMPT = f"""
+            Here is a description for a job by a company:
             
-            client_agent = Agent(
-                    name=f"client-agent",
-                    instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                    tools=[ResumeRetrievalTool],
-            )
+            {prompt_budget.fit("client-review", "description", description)}
+            
+            Please compare the client's resume and determine whether the candidate would be a good fit, based on his resume. Output a rating on 
+            a scale of 0-10, 10 being extremely qualified, and 0 meaning the client has zero observable qualifications. Then, provide a justification for your rating, citing specific evidence. 
+        """
+
+        internal_review = await run_agent(
+            "client-review", 
+            INTERNAL_REVIEW_PROMPT,
+            max_turns=TURNS,
+            context=candidate,
+        )
+        internal_review = internal_review.final_output
+        print(tag, "Client agent came up with ", internal_review, "for internal review")
+
+        if internal_review.score < RELEVANT_JOB_THRESHOLD:
+            done.add(job.get("id"))
+            continue
+    
+        REQUEST_SERVER_REVIEW_PROMPT = pitch_prompt()
+
+        candidate_pitch = await run_agent(
+            "client-pitch", 
+            REQUEST_SERVER_REVIEW_PROMPT,
+            max_turns=TURNS,
+            context=candidate,
+        )
+        candidate_pitch = candidate_pitch.final_output
+
+        print("\n\n")
+        print(tag, "Client agent came up with ", candidate_pitch, "for candidate pitch")
+
+        # Request feedback from the company
+        company_feedback = await asyncio.to_thread(
+            get_company_feedback,
+            company_url, description, candidate_pitch, candidate.resume
+        )
+
+        print("\n\n")
+        print(tag, "Got company feedback", company_feedback)
+        # No feedback (company down, deadline passed): log the review and move on
+        if company_feedback is not None:
+            company_response = CompanyCandidateRelevancyEvaluation.model_validate(company_feedback)
+    
+        if company_response and company_response.score >= RELEVANT_JOB_THRESHOLD:
+            application = JobApplicationQuestions.model_validate(job["questions"])
+            application_filled = await fill_application(application, candidate)
 
-            candidate_pitch = await asyncio.to_thread(
-                Runner.run_sync,
-                client_agent, 
-                REQUEST_SERVER_REVIEW_PROMPT,
-                max_turns=TURNS,
+            job_id = job["id"]
+            await asyncio.to_thread(
+                apply_to_job,
+                company_url, application_filled, job_id
             )
-            candidate_pitch = candidate_pitch.final_output
 
             print("\n\n")
-            print("Client agent came up with ", candidate_pitch, "for candidate pitch")
+            print(tag, "Filled out job application with the following data", application_filled)
 
-            # Request feedback from the company
-            company_feedback = await asyncio.to_thread(
-                get_company_feedback,
-                company_url, description, candidate_pitch
-            )
+        await asyncio.to_thread(
+            log_data, description, internal_review, company_response,
+            candidate.data_dir, candidate.candidate_id, job.get("id"), company_url
+        )
+        if company_feedback is not None:
+            done.add(job.get("id"))
 
-            print("\n\n")
-            print("Got company feedback", company_feedback)
-            company_response = CompanyCandidateRelevancyEvaluation.model_validate(company_feedback)
-        
-            if company_response.score >= RELEVANT_JOB_THRESHOLD:
-                application = JobApplicationQuestions.model_validate(job["questions"])
+async def evaluate_company(company_url: str, jobs: List[dict], candidates: List[Candidate],
+                           eligible: Optional[List[set]] = None) -> List[Set[str]]:
+    """
+    Pre-score one company's catalog against every candidate and run the LLM
+    stages on each candidate's selection. `eligible`, if given, limits each
+    candidate to those job indices (e.g. only new or changed jobs). Returns,
+    per candidate, the ids of selected jobs that were not fully evaluated.
+    """
+    candidate_vectors = VECTORIZER.transform(flatten_text(candidate.resume) for candidate in candidates)
+    selected = await asyncio.to_thread(select_pairs, jobs, candidate_vectors)
+    if eligible is not None:
+        selected = [[i for i in rows if i in allowed] for rows, allowed in zip(selected, eligible)]
+    print(f"Selected {sum(map(len, selected))} of {len(jobs) * len(candidates)} job/candidate pairs at {company_url}")
+
+    done = [set() for _ in candidates]
+    results = await asyncio.gather(
+        *(evaluate_jobs(company_url, [jobs[i] for i in rows], candidate, finished)
+          for candidate, rows, finished in zip(candidates, selected, done)),
+        return_exceptions=True,
+    )
+    # A failure for one candidate must not stop the others
+    for candidate, result in zip(candidates, results):
+        if isinstance(result, Exception):
+            print(f"[{candidate.candidate_id}] Failed to evaluate jobs at {company_url}: {result!r}")
+    return [{jobs[i].get("id") for i in rows} - finished for rows, finished in zip(selected, done)]
 
-                JOB_APPLICATION_QUESTIONS_PROMPT = f"""
-                    Here is a job application. 
-                    
-                    {application.model_dump_json()}
-                
-                    Fill out the questions using data you have on the client. Make sure that you type out the question exactly as listed in the response.
-                """
-
-                application_agent = Agent(
-                        name=f"client-agent",
-                        instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                        tools=[ResumeRetrievalTool],
-                        output_type=JobApplicationResponses
-                )
-
-                application_filled = await asyncio.to_thread(
-                    Runner.run_sync,
-                    application_agent,
-                    JOB_APPLICATION_QUESTIONS_PROMPT,
-                    max_turns=2 * TURNS,
-                )
-                application_filled = application_filled.final_output
+async def async_client_loop(candidates: Optional[List[Candidate]] = None):
+    """
+    One full crawl: every company, every job (see crawl_scheduler.py for the incremental version).
+    """
+    candidates = candidates or load_candidates()
 
-                job_id = job["id"]
-                await asyncio.to_thread(
-                    apply_to_job,
-                    company_url, application_filled, job_id
-                )
+    # Retrieve companies from the router
+    companies = await asyncio.to_thread(get_companies_from_router)
 
-            print("\n\n")
-            print("Filled out job application with the following data", application_filled)
+    async def crawl(company_url: str):
+        # One catalog fetch per company, shared by every candidate
+        jobs = await asyncio.to_thread(get_jobs, company_url)
+        await evaluate_company(company_url, jobs, candidates)
 
-            await asyncio.to_thread(
-                log_data, description, internal_review, company_response
-            )
+    # Companies run side by side (the LLM scheduler bounds the model calls), so a
+    # slow company only delays its own jobs
+    results = await asyncio.gather(*(crawl(company_url) for company_url in companies), return_exceptions=True)
+    for company_url, result in zip(companies, results):
+        if isinstance(result, Exception):
+            print(f"Failed to evaluate jobs at {company_url}: {result!r}")
 
 class TopNRequest(BaseModel):
     start_time: float
     end_time: float
     n: int
 
-# Response model for a reason and its percentage
-class ReasonPercent(BaseModel):
-    reason: str
-    percent: str
-
-class ModelReasons(BaseModel):
-    reasons: List[ReasonPercent]
-    
-async def summarize_reasons(kind: str, n: int) -> List[ReasonPercent]:
+async def summarize_reasons(kind: str, n: int, entries: Optional[List[str]] = None) -> List[ReasonPercent]:
     """
-    Read the most recent 5 JSON log files from CLIENT_DATA_DIR and extract the top `n` reasons
-    of type `kind` ('pros' or 'cons') using an AI agent asynchronously.
+    Read the most recent 5 JSON log files from CLIENT_DATA_DIR (across all candidates) and extract the top `n` reasons
+    of type `kind` ('pros' or 'cons') using an AI agent asynchronously. Callers that already
+    collected the items (e.g. the dashboard summary) pass them as `entries`.
     """
-    # Select top 5 JSON files by filename sort (descending)
-    files = sorted(
-        [f for f in os.listdir(CLIENT_DATA_DIR) if f.endswith('.json')],
-        reverse=True
-    )[:10]
-
-    print(files)
-    
-
-    # Aggregate items from company_feedback
-    entries = []
-    for fname in files:
-        path = os.path.join(CLIENT_DATA_DIR, fname)
-        with open(path, 'r') as f:
-            data = json.load(f)
-        feedback = data.get('company_feedback', {})
-        key = 'candidate_pros' if kind == 'pros' else 'candidate_cons'
-        items = feedback.get(key, [])
-        entries.extend(items)
-
-    combined = "\n- ".join(entries)
-    instruction = (
-        "You are an analyst that reads hiring feedback and extracts the top strengths observed by companies."
-        if kind == 'pros' else
-        "You are an analyst that reads hiring feedback and extracts the top areas for improvement noticed by companies."
-    )
+    if entries is None:
+        # Select top 5 JSON files by filename sort (descending)
+        files = sorted(list_client_records(), key=os.path.basename, reverse=True)[:10]
+
+        print(files)
+
+        # Aggregate items from company_feedback
+        entries = []
+        for path in files:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            feedback = data.get('company_feedback', {})
+            key = 'candidate_pros' if kind == 'pros' else 'candidate_cons'
+            items = feedback.get(key, [])
+            entries.extend(items)
+
+    agent_key = 'summary-pros' if kind == 'pros' else 'summary-cons'
+    combined = prompt_budget.record(f"{agent_key}.entries", "\n- ".join(entries), "\n- ".join(prompt_budget.trim_entries(entries)))
+    instruction = AGENT_SPECS[agent_key].instructions
     prompt = (
         f"{instruction}\n\nHere are the collected items from the last 5 feedback logs:\n- {combined}\n\n"
         f"List the top {n} distinct reasons along with the approximate percentage of logs that mentioned each reason. "
         "Respond as a JSON array of objects {\"reason\": string, \"percent\": string}."
     )
 
-    agent = Agent(
-        name="summary-agent",
-        instructions=instruction,
-        tools=[],
-        output_type=ModelReasons
-    )
     # Use async run to avoid blocking the event loop
-    run_result = await Runner.run(agent, prompt, max_turns=2)
+    run_result = await run_agent(agent_key, prompt, max_turns=2, priority=INTERACTIVE)
     result = run_result.final_output.reasons
 
     print(result)
@@ -407,4 +599,5 @@ async def get_top_cons_data(start_time: float, end_time: float, n: int) -> List[
     return await summarize_reasons(kind='cons', n=n)
  
 if __name__ == "__main__":
+    load_settings()
     client_loop()
\ No newline at end of file
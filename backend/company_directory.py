@@ -0,0 +1,96 @@
+import hashlib
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from http_responses import dumps
+
+
+class CompanyDirectory:
+    """
+    A router's merged, versioned copy of the company directory.
+
+    Every entry carries a Lamport `version` and the `origin` router that last
+    changed it; merges keep the entry with the highest (version, origin), so
+    routers that exchange entries converge on the same directory in any order.
+    Removals are kept as tombstones so they propagate too.
+
+    Independently, each change this router applies (local or merged) gets the
+    next local `seq`, and `changes_since(seq)` returns the entries changed
+    after it: peers pull deltas with their last seen seq as a cursor, which
+    also relays entries this router learned from third routers.
+    """
+
+    def __init__(self, router_id: str):
+        self.router_id = router_id
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.seq = 0
+        self.clock = 0
+        self._lock = threading.Lock()
+        self._encoded: Optional[Tuple[int, bytes, str]] = None
+
+    def _apply(self, entry: Dict[str, Any]) -> bool:
+        current = self.entries.get(entry["url"])
+        if current is not None and (current["version"], current["origin"]) >= (entry["version"], entry["origin"]):
+            return False
+        self.seq += 1
+        self.clock = max(self.clock, entry["version"])
+        self.entries[entry["url"]] = {**entry, "seq": self.seq}
+        return True
+
+    def _local(self, url: str, deleted: bool) -> bool:
+        current = self.entries.get(url)
+        if current is not None and current["deleted"] == deleted:
+            return False
+        self.clock += 1
+        return self._apply({"url": url, "deleted": deleted, "version": self.clock, "origin": self.router_id,
+                            "updated": time.time()})
+
+    def register(self, url: str) -> bool:
+        with self._lock:
+            return self._local(url.rstrip("/"), deleted=False)
+
+    def unregister(self, url: str) -> bool:
+        with self._lock:
+            return self._local(url.rstrip("/"), deleted=True)
+
+    def merge(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """
+        Apply entries pulled from a peer; returns how many changed the directory.
+        """
+        with self._lock:
+            return sum(self._apply({key: entry[key] for key in ("url", "deleted", "version", "origin", "updated")})
+                       for entry in entries)
+
+    def changes_since(self, seq: int) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "router_id": self.router_id,
+                "seq": self.seq,
+                "entries": sorted((entry for entry in self.entries.values() if entry["seq"] > seq), key=lambda entry: entry["seq"]),
+            }
+
+    def companies(self) -> List[str]:
+        with self._lock:
+            return sorted(url for url, entry in self.entries.items() if not entry["deleted"])
+
+    def encoded_companies(self) -> Tuple[int, bytes, str]:
+        """
+        The live company list as JSON bytes plus its ETag, re-encoded only when
+        the directory changes. The ETag hashes the list itself, so routers that
+        have converged hand out the same one and a client can revalidate anywhere.
+        """
+        encoded = self._encoded
+        if encoded is not None and encoded[0] == self.seq:
+            return encoded
+        with self._lock:
+            seq = self.seq
+            body = dumps(sorted(url for url, entry in self.entries.items() if not entry["deleted"]))
+        self._encoded = (seq, body, f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"')
+        return self._encoded
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            live = sum(1 for entry in self.entries.values() if not entry["deleted"])
+            return {"router_id": self.router_id, "seq": self.seq, "clock": self.clock, "companies": live,
+                    "tombstones": len(self.entries) - live}
@@ -0,0 +1,264 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Any, Dict, Optional
+
+import requests
+
+from diagnostics import percentiles
+
+# CONSTANTS
+# Outcomes kept per company to compute its error and slow-call rates
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_RATE = float(os.getenv("BREAKER_SLOW_RATE", "0.8"))
+# A call slower than this counts towards the slow-call rate (but not as an error)
+BREAKER_SLOW_CALL_MS = float(os.getenv("BREAKER_SLOW_CALL_MS", "10000"))
+BREAKER_COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", "30"))
+# Idempotent GETs get a second, parallel attempt if the first is slower than this
+HEDGE_AFTER_MS = float(os.getenv("HEDGE_AFTER_MS", "2000"))
+# Threads running company calls, so a deadline bounds the whole call and not just each socket read
+COMPANY_CALL_WORKERS = int(os.getenv("COMPANY_CALL_WORKERS", "64"))
+# Responses that mean "busy, come back later" when they carry Retry-After
+BACKPRESSURE_STATUSES = (429, 503)
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Error-rate and slow-call-rate breaker over the last BREAKER_WINDOW calls to
+    one company. Open: calls fail fast until the cooldown passes. Half-open:
+    one probe call is let through, and its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=BREAKER_WINDOW)  # (ok, latency_ms)
+        self.latencies_ms = deque(maxlen=BREAKER_WINDOW)
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "hedged": 0, "hedge_wins": 0,
+                      "backpressure": 0}
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN_S:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN and time.monotonic() - self.opened_at < BREAKER_COOLDOWN_S
+
+    def _rates(self):
+        n = len(self.outcomes)
+        errors = sum(1 for ok, _ in self.outcomes if not ok)
+        slow = sum(1 for ok, latency in self.outcomes if ok and latency >= BREAKER_SLOW_CALL_MS)
+        return n, errors / n if n else 0.0, slow / n if n else 0.0
+
+    def record(self, ok: bool, latency_ms: Optional[float], error: Optional[str] = None):
+        """
+        Record one call; `latency_ms=None` for calls that are slow by design (long polls).
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+            self.outcomes.append((ok, latency_ms or 0.0))
+            if ok:
+                if latency_ms is not None:
+                    self.latencies_ms.append(latency_ms)
+            else:
+                self.stats["failures"] += 1
+                self.last_error = error
+
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                healthy = ok and (latency_ms or 0.0) < BREAKER_SLOW_CALL_MS
+                if healthy:
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            n, error_rate, slow_rate = self._rates()
+            if self.state == CLOSED and n >= BREAKER_MIN_CALLS and (error_rate >= BREAKER_ERROR_RATE or slow_rate >= BREAKER_SLOW_RATE):
+                self._open()
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def backpressure(self):
+        """
+        Record a load-shedding response (503/429 with Retry-After): the company
+        is healthy but busy, so it neither counts as a failure nor closes or
+        re-opens a half-open breaker (the next call probes again).
+        """
+        with self._lock:
+            self.stats["backpressure"] += 1
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        print(f"Circuit for {self.name} opened (last error: {self.last_error})")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            n, error_rate, slow_rate = self._rates()
+            return {
+                "state": OPEN if self.is_open else (HALF_OPEN if self.state != CLOSED else CLOSED),
+                "window_calls": n,
+                "error_rate": round(error_rate, 3),
+                "slow_rate": round(slow_rate, 3),
+                "latency_ms": percentiles(self.latencies_ms),
+                "last_error": self.last_error,
+                **self.stats,
+            }
+
+
+def backpressure_delay(response: Optional[requests.Response]) -> Optional[float]:
+    """
+    Seconds to wait when `response` is a load-shedding 503/429 carrying a
+    numeric Retry-After, else None.
+    """
+    if response is None or response.status_code not in BACKPRESSURE_STATUSES:
+        return None
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+class CompanyHealth:
+    """
+    HTTP calls to company servers, each behind that company's circuit
+    breaker and bounded by a deadline. Idempotent GETs can be hedged.
+    """
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=COMPANY_CALL_WORKERS, thread_name_prefix="company-call")
+
+    def breaker(self, company_url: str) -> CircuitBreaker:
+        with self._lock:
+            if company_url not in self.breakers:
+                self.breakers[company_url] = CircuitBreaker(company_url)
+            return self.breakers[company_url]
+
+    def is_open(self, company_url: str) -> bool:
+        return self.breaker(company_url).is_open
+
+    def request(self, company_url: str, method: str, path: str, deadline_s: float, hedge: bool = False,
+                long_poll: bool = False, **kwargs) -> requests.Response:
+        """
+        `method` `company_url + path` within `deadline_s`. Raises CircuitOpenError
+        without calling while the company's breaker is open; HTTP errors (4xx
+        included) and timeouts raise requests exceptions and count as failures.
+        A 503/429 with Retry-After is backpressure, not a failure: the call is
+        retried after the advertised delay while that fits in the deadline,
+        and the last such response is raised otherwise.
+        Long polls do not count towards the slow-call rate.
+        """
+        breaker = self.breaker(company_url)
+        deadline = time.monotonic() + deadline_s
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit for {company_url} is open")
+
+            started = time.monotonic()
+            timeout = max(0.1, deadline - started)
+            try:
+                if hedge and method.upper() == "GET":
+                    response = self._hedged_get(breaker, company_url + path, timeout, **kwargs)
+                else:
+                    response = self._bounded(method, company_url + path, timeout, **kwargs)
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                retry_after = backpressure_delay(e.response)
+                if retry_after is None:
+                    breaker.record(False, None if long_poll else (time.monotonic() - started) * 1000, f"{type(e).__name__}: {e}")
+                    raise
+                breaker.backpressure()
+                if time.monotonic() + retry_after >= deadline:
+                    raise
+                time.sleep(retry_after)
+                continue
+            except requests.RequestException as e:
+                breaker.record(False, None if long_poll else (time.monotonic() - started) * 1000, f"{type(e).__name__}: {e}")
+                raise
+            breaker.record(True, None if long_poll else (time.monotonic() - started) * 1000)
+            return response
+
+    def _bounded(self, method: str, url: str, deadline_s: float, **kwargs) -> requests.Response:
+        # The requests timeout applies per connect/read, so a server trickling bytes could outlast it
+        future = self._pool.submit(requests.request, method, url, timeout=deadline_s, **kwargs)
+        try:
+            return future.result(timeout=deadline_s)
+        except FutureTimeout:
+            future.cancel()
+            raise requests.Timeout(f"{method} {url} exceeded its {deadline_s:.1f}s deadline")
+
+    def _hedged_get(self, breaker: CircuitBreaker, url: str, deadline_s: float, **kwargs) -> requests.Response:
+        deadline = time.monotonic() + deadline_s
+        attempts = [self._pool.submit(requests.get, url, timeout=deadline_s, **kwargs)]
+        done, _ = wait(attempts, timeout=min(HEDGE_AFTER_MS / 1000, deadline_s))
+        if not done:
+            breaker.count("hedged")
+            attempts.append(self._pool.submit(requests.get, url, timeout=max(0.1, deadline - time.monotonic()), **kwargs))
+
+        error = None
+        pending = set(attempts)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise requests.Timeout(f"GET {url} exceeded its {deadline_s}s deadline")
+            for future in done:
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    error = e
+                    continue
+                if response.ok or not pending:
+                    if future is not attempts[0]:
+                        breaker.count("hedge_wins")
+                    return response
+        raise error
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = list(self.breakers.items())
+        return {company_url: breaker.snapshot() for company_url, breaker in breakers}
+
+
+_health: Optional[CompanyHealth] = None
+
+
+def get_company_health() -> CompanyHealth:
+    global _health
+    if _health is None:
+        _health = CompanyHealth()
+    return _health
@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import requests
+
+from client_loop import (CLIENT_DATA_DIR, Candidate, evaluate_company, fetch_jobs, get_companies_from_router,
+                         load_candidates)
+from answer_memory import resume_version
+from company_health import CircuitOpenError, get_company_health
+
+# CONSTANTS
+CRAWL_STATE_PATH = os.path.join(CLIENT_DATA_DIR, "crawl_schedule.json")
+CRAWL_MIN_INTERVAL_S = float(os.getenv("CRAWL_MIN_INTERVAL_S", "900"))        # 15 minutes
+CRAWL_MAX_INTERVAL_S = float(os.getenv("CRAWL_MAX_INTERVAL_S", "86400"))      # 24 hours
+CRAWL_INITIAL_INTERVAL_S = float(os.getenv("CRAWL_INITIAL_INTERVAL_S", "3600"))
+# A changed catalog shortens the interval by this factor; an unchanged one lengthens it
+CRAWL_SPEEDUP = 0.5
+CRAWL_BACKOFF = 1.5
+# Each next run is moved by up to this fraction of the interval, either way
+CRAWL_JITTER = float(os.getenv("CRAWL_JITTER", "0.1"))
+CRAWL_FAILURE_RETRY_S = 60.0
+# First crawls of newly listed companies are spread over this window
+CRAWL_STARTUP_SPREAD_S = 5.0
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "4"))
+ROUTER_REFRESH_S = float(os.getenv("ROUTER_REFRESH_S", "600"))
+# Weight of the latest crawl in the change-rate moving average
+CHANGE_RATE_ALPHA = 0.3
+
+
+def job_fingerprint(job: dict) -> str:
+    content = json.dumps([job.get("description", ""), job.get("questions", {})], sort_keys=True)
+    return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
+
+
+def resume_fingerprint(candidate: Candidate) -> str:
+    return resume_version(candidate.resume)
+
+
+class CompanySchedule:
+    """
+    Crawl bookkeeping for one company: when to crawl next, the learned
+    interval, how often its catalog changes, and the fingerprint of every job
+    (and candidate resume) already evaluated, so re-crawls only pay for
+    new or changed jobs, plus the job/candidate pairs that did not finish
+    (open circuit, no company feedback, errors) and are retried next time.
+    """
+
+    def __init__(self, company_url: str, next_run: float, interval_s: float = CRAWL_INITIAL_INTERVAL_S):
+        self.company_url = company_url
+        self.next_run = next_run
+        self.interval_s = interval_s
+        self.change_rate = 1.0     # moving average of "did the last crawl find changes"
+        self.last_crawl: Optional[float] = None
+        self.last_change: Optional[float] = None
+        self.last_new_or_changed = 0
+        self.crawls = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.running = False
+        self.jobs: Dict[str, str] = {}        # job id -> fingerprint
+        self.candidates: Dict[str, str] = {}  # candidate id -> resume fingerprint
+        self.pending: Dict[str, List[str]] = {}  # candidate id -> job ids still to evaluate
+
+    @property
+    def priority(self) -> float:
+        return self.change_rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: value for key, value in vars(self).items() if key != "running"}
+        data["jobs"], data["candidates"] = dict(self.jobs), dict(self.candidates)
+        data["pending"] = {candidate_id: list(job_ids) for candidate_id, job_ids in self.pending.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompanySchedule":
+        schedule = cls(data["company_url"], data["next_run"], data["interval_s"])
+        for key, value in data.items():
+            if hasattr(schedule, key) and key != "running":
+                setattr(schedule, key, value)
+        return schedule
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        return {
+            "company_url": self.company_url,
+            "next_run": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.next_run)),
+            "seconds_until_next_run": max(0.0, round(self.next_run - now, 1)),
+            "interval_s": round(self.interval_s, 1),
+            "change_rate": round(self.change_rate, 3),
+            "jobs": len(self.jobs),
+            "pending_pairs": sum(map(len, self.pending.values())),
+            "last_new_or_changed": self.last_new_or_changed,
+            "last_crawl": self.last_crawl,
+            "last_change": self.last_change,
+            "crawls": self.crawls,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "running": self.running,
+        }
+
+
+class CrawlScheduler:
+    """
+    Crawls each company on its own adaptive interval instead of all of them
+    every 12 hours. A crawl that finds new or changed jobs halves the
+    company's interval (down to CRAWL_MIN_INTERVAL_S); one that finds nothing
+    stretches it by 1.5x (up to CRAWL_MAX_INTERVAL_S). Next runs are jittered
+    so many clients don't hit a company at once, due companies with the
+    highest recent change rate go first, and only new or changed jobs (or
+    jobs a candidate has not been evaluated against) reach the LLM stages.
+    """
+
+    def __init__(self, state_path: str = CRAWL_STATE_PATH, concurrency: int = CRAWL_CONCURRENCY):
+        self.state_path = state_path
+        self.companies: Dict[str, CompanySchedule] = {}
+        self.router_refreshed_at = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wake = asyncio.Event()
+        # The event loop only keeps weak references to tasks; these keep running crawls alive
+        self._tasks: Set[asyncio.Task] = set()
+        self._load()
+
+    # Persistence
+    def _load(self):
+        try:
+            with open(self.state_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in data.get("companies", []):
+            schedule = CompanySchedule.from_dict(entry)
+            self.companies[schedule.company_url] = schedule
+
+    async def _save(self):
+        # Snapshot on the event loop, write on a thread
+        state = {"companies": [schedule.to_dict() for schedule in self.companies.values()]}
+        await asyncio.to_thread(self._write_state, state)
+
+    def _write_state(self, state: dict):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    # Scheduling
+    def _jittered(self, delay_s: float) -> float:
+        return delay_s * random.uniform(1 - CRAWL_JITTER, 1 + CRAWL_JITTER)
+
+    def refresh_companies(self, company_urls: List[str]):
+        now = time.time()
+        for company_url in company_urls:
+            if company_url not in self.companies:
+                self.companies[company_url] = CompanySchedule(company_url, now + random.uniform(0, CRAWL_STARTUP_SPREAD_S))
+        if company_urls:
+            # Forget companies the routers no longer list (unless a crawl is in flight)
+            for company_url in set(self.companies) - set(company_urls):
+                if not self.companies[company_url].running:
+                    del self.companies[company_url]
+        self.router_refreshed_at = now
+
+    def due(self, now: float) -> List[CompanySchedule]:
+        due = [schedule for schedule in self.companies.values() if schedule.next_run <= now and not schedule.running]
+        return sorted(due, key=lambda schedule: (-schedule.priority, schedule.next_run))
+
+    def run_now(self, company_url: str) -> bool:
+        schedule = self.companies.get(company_url)
+        if schedule is None:
+            return False
+        schedule.next_run = time.time()
+        self._wake.set()
+        return True
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [schedule.summary(now) for schedule in sorted(self.companies.values(), key=lambda s: s.next_run)]
+
+    # Crawling
+    def _record_success(self, schedule: CompanySchedule, changed: int):
+        now = time.time()
+        schedule.crawls += 1
+        schedule.failures = 0
+        schedule.last_error = None
+        schedule.last_crawl = now
+        schedule.last_new_or_changed = changed
+        schedule.change_rate = (1 - CHANGE_RATE_ALPHA) * schedule.change_rate + CHANGE_RATE_ALPHA * (1.0 if changed else 0.0)
+        if changed:
+            schedule.last_change = now
+            schedule.interval_s = max(CRAWL_MIN_INTERVAL_S, schedule.interval_s * CRAWL_SPEEDUP)
+        else:
+            schedule.interval_s = min(CRAWL_MAX_INTERVAL_S, schedule.interval_s * CRAWL_BACKOFF)
+        schedule.next_run = now + self._jittered(schedule.interval_s)
+
+    def _record_failure(self, schedule: CompanySchedule, error: Exception):
+        # Retry sooner than the learned interval, backing off while the company stays down
+        schedule.failures += 1
+        schedule.last_error = f"{type(error).__name__}: {error}"
+        delay = min(CRAWL_MAX_INTERVAL_S, schedule.interval_s, CRAWL_FAILURE_RETRY_S * 2 ** (schedule.failures - 1))
+        schedule.next_run = time.time() + self._jittered(delay)
+
+    async def crawl(self, schedule: CompanySchedule, candidates: List[Candidate]):
+        company_url = schedule.company_url
+        try:
+            jobs = await asyncio.to_thread(fetch_jobs, company_url)
+        except (CircuitOpenError, requests.exceptions.RequestException, ValueError) as e:
+            print(f"Crawl of {company_url} failed: {e}")
+            self._record_failure(schedule, e)
+            return
+
+        fingerprints = [job_fingerprint(job) for job in jobs]
+        changed = {i for i, (job, fingerprint) in enumerate(zip(jobs, fingerprints))
+                   if schedule.jobs.get(job.get("id")) != fingerprint}
+        catalog_changed = len(changed) + len(set(schedule.jobs) - {job.get("id") for job in jobs})
+
+        # Candidates that are new here, or whose resume changed, are evaluated against everything;
+        # the others against new or changed jobs plus the ones they did not finish last time
+        everything = set(range(len(jobs)))
+        resumes = [resume_fingerprint(candidate) for candidate in candidates]
+        eligible = []
+        for candidate, resume in zip(candidates, resumes):
+            if schedule.candidates.get(candidate.candidate_id) != resume:
+                eligible.append(everything)
+                continue
+            retry = set(schedule.pending.get(candidate.candidate_id, ()))
+            eligible.append(changed | {i for i, job in enumerate(jobs) if job.get("id") in retry})
+        print(f"Crawling {company_url}: {len(changed)} new or changed of {len(jobs)} jobs")
+        unfinished = [set() for _ in candidates]
+        if any(eligible):
+            unfinished = await evaluate_company(company_url, jobs, candidates, eligible)
+
+        schedule.jobs = {job.get("id"): fingerprint for job, fingerprint in zip(jobs, fingerprints)}
+        schedule.candidates.update(
+            (candidate.candidate_id, resume) for candidate, resume in zip(candidates, resumes)
+        )
+        for candidate, job_ids in zip(candidates, unfinished):
+            job_ids &= set(schedule.jobs)
+            if job_ids:
+                schedule.pending[candidate.candidate_id] = sorted(job_ids)
+            else:
+                schedule.pending.pop(candidate.candidate_id, None)
+
+        n_unfinished = sum(map(len, unfinished))
+        if get_company_health().is_open(company_url):
+            self._record_failure(schedule, CircuitOpenError(f"Circuit opened during the crawl; {n_unfinished} pairs left"))
+        elif n_unfinished:
+            self._record_failure(schedule, RuntimeError(f"{n_unfinished} job/candidate pairs did not finish"))
+        else:
+            self._record_success(schedule, catalog_changed)
+
+    async def _run_one(self, schedule: CompanySchedule):
+        async with self._semaphore:
+            try:
+                candidates = await asyncio.to_thread(load_candidates)
+                await self.crawl(schedule, candidates)
+            except Exception as e:
+                print(f"Crawl of {schedule.company_url} crashed: {e!r}")
+                self._record_failure(schedule, e)
+            finally:
+                schedule.running = False
+                await self._save()
+                self._wake.set()
+
+    async def run(self):
+        """
+        Run forever: refresh the company list from the routers, start every due
+        crawl, then sleep until the next one is due (or the list needs refreshing).
+        """
+        while True:
+            now = time.time()
+            if now - self.router_refreshed_at >= ROUTER_REFRESH_S:
+                try:
+                    self.refresh_companies(await asyncio.to_thread(get_companies_from_router))
+                except Exception as e:
+                    print(f"Failed to refresh companies: {e!r}")
+                    self.router_refreshed_at = now
+
+            for schedule in self.due(now):
+                schedule.running = True
+                task = asyncio.create_task(self._run_one(schedule))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            waiting = [schedule.next_run for schedule in self.companies.values() if not schedule.running]
+            next_wake = min(waiting + [self.router_refreshed_at + ROUTER_REFRESH_S])
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=max(0.5, next_wake - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        """
+        Cancel the crawls in progress; each saves its schedule on the way out.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
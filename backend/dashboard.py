@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from client_loop import CLIENT_DATA_DIR, list_client_records, summarize_reasons
+
+# CONSTANTS
+# Pros and cons are summarized from the newest records in the window
+SUMMARY_RECORDS = 10
+# Finished (or in-flight) summaries kept by ETag
+SUMMARY_CACHE_SIZE = 32
+# Score above which a review counts as a relevant match / a company approval
+APPROVAL_SCORE = 5.0
+
+
+@dataclass
+class RecordSummary:
+    name: str
+    timestamp: float
+    internal_score: Any
+    company_score: Any
+    pros: List[str]
+    cons: List[str]
+    # Missing from records written before log_data recorded them
+    company_url: Optional[str] = None
+    job_id: Optional[str] = None
+
+
+@dataclass
+class WindowScan:
+    totals: Dict[str, int]
+    # In-window records, newest first
+    records: List[RecordSummary] = field(default_factory=list)
+    fingerprint: str = ""
+
+    def etag(self, n: int) -> str:
+        return f'"{hashlib.sha256(f"{self.fingerprint}:{n}".encode()).hexdigest()[:24]}"'
+
+    def entries(self, kind: str) -> List[str]:
+        recent = self.records[:SUMMARY_RECORDS]
+        return [item for record in recent for item in (record.pros if kind == "pros" else record.cons)]
+
+
+def _score(section: Any) -> Any:
+    return section.get("score") if isinstance(section, dict) else None
+
+
+def summarize_record(path: str) -> Optional[RecordSummary]:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        timestamp = float(data.get("timestamp"))
+    except (OSError, ValueError, TypeError):
+        return None
+    feedback = data.get("company_feedback") or {}
+    return RecordSummary(
+        name=os.path.basename(path),
+        timestamp=timestamp,
+        internal_score=_score(data.get("internal_review", {})),
+        company_score=_score(feedback),
+        pros=list(feedback.get("candidate_pros", []) if isinstance(feedback, dict) else []),
+        cons=list(feedback.get("candidate_cons", []) if isinstance(feedback, dict) else []),
+        company_url=data.get("company_url"),
+        job_id=data.get("job_id"),
+    )
+
+
+class RecordScanner:
+    """
+    One pass over the client's records for a time window. Each record file is
+    parsed once and its summary kept until the file's mtime or size changes,
+    so repeated scans only stat the directory and read new records.
+    """
+
+    def __init__(self, data_dir: str = CLIENT_DATA_DIR):
+        self.data_dir = data_dir
+        self._summaries: Dict[str, Tuple[int, int, Optional[RecordSummary]]] = {}
+        self._lock = threading.Lock()
+
+    def _summary(self, path: str) -> Optional[RecordSummary]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        cached = self._summaries.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        summary = summarize_record(path)
+        self._summaries[path] = (stat.st_mtime_ns, stat.st_size, summary)
+        return summary
+
+    def scan(self, start_time: float, end_time: float) -> WindowScan:
+        with self._lock:
+            paths = list_client_records(self.data_dir)
+            for gone in set(self._summaries) - set(paths):
+                del self._summaries[gone]
+            summaries = [self._summary(path) for path in paths]
+            keys = {path: self._summaries[path][:2] for path in paths if path in self._summaries}
+
+        totals = {"total_applications": 0, "relevant_matches": 0, "approved": 0}
+        records = []
+        fingerprint = hashlib.sha256()
+        for path, summary in sorted(zip(paths, summaries), key=lambda item: item[0]):
+            if summary is None or not (start_time <= summary.timestamp <= end_time):
+                continue
+            records.append(summary)
+            fingerprint.update(f"{path}:{keys.get(path)}\n".encode())
+            totals["total_applications"] += 1
+            if isinstance(summary.internal_score, (int, float)) and summary.internal_score > APPROVAL_SCORE:
+                totals["relevant_matches"] += 1
+            if isinstance(summary.company_score, (int, float)) and summary.company_score > APPROVAL_SCORE:
+                totals["approved"] += 1
+
+        records.sort(key=lambda record: record.name, reverse=True)
+        return WindowScan(totals=totals, records=records, fingerprint=fingerprint.hexdigest())
+
+
+class DashboardSummaries:
+    """
+    Totals, top pros and top cons for a window, computed from one scan. The
+    two summaries run concurrently, and results are shared by ETag, so
+    identical dashboard refreshes (even in-flight ones) cost one set of model calls.
+    """
+
+    def __init__(self, scanner: RecordScanner):
+        self.scanner = scanner
+        self._summaries: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+
+    async def _build(self, scan: WindowScan, n: int) -> Dict[str, Any]:
+        async def reasons(kind: str):
+            entries = scan.entries(kind)
+            return await summarize_reasons(kind, n, entries) if entries else []
+
+        pros, cons = await asyncio.gather(reasons("pros"), reasons("cons"), return_exceptions=True)
+        errors = {kind: f"{type(result).__name__}: {result}"
+                  for kind, result in (("pros", pros), ("cons", cons)) if isinstance(result, Exception)}
+        return {
+            "totals": scan.totals,
+            "pros": [] if "pros" in errors else pros,
+            "cons": [] if "cons" in errors else cons,
+            "records": len(scan.records),
+            "errors": errors,
+        }
+
+    async def get(self, scan: WindowScan, n: int) -> Dict[str, Any]:
+        etag = scan.etag(n)
+        future = self._summaries.get(etag)
+        if future is None:
+            future = self._summaries[etag] = asyncio.ensure_future(self._build(scan, n))
+            while len(self._summaries) > SUMMARY_CACHE_SIZE:
+                self._summaries.popitem(last=False)
+        else:
+            self._summaries.move_to_end(etag)
+        try:
+            summary = await asyncio.shield(future)
+        except Exception:
+            self._summaries.pop(etag, None)
+            raise
+        if summary["errors"]:
+            # Partial results are served but not reused
+            self._summaries.pop(etag, None)
+        return summary
@@ -0,0 +1,211 @@
+import asyncio
+import functools
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, List
+
+# CONSTANTS
+LOOP_DIAGNOSTICS = os.getenv("LOOP_DIAGNOSTICS", "0") == "1"
+LAG_SAMPLE_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))        # seconds between loop probes
+BLOCKING_THRESHOLD = float(os.getenv("LOOP_BLOCKING_THRESHOLD", "0.05"))  # lag (seconds) reported as a block
+BLOCKING_IO_WORKERS = int(os.getenv("BLOCKING_IO_WORKERS", "8"))
+MAX_SAMPLES = 4096
+
+_io_executor = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide thread pool used for blocking file work.
+    """
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking-io")
+    return _io_executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking callable on the managed I/O pool so it never stalls the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_io_executor():
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=False)
+        _io_executor = None
+
+
+def percentiles(samples: Iterable[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """
+    Nearest-rank percentiles of `samples`, plus the max, rounded to microseconds.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {**{f"p{p}": 0.0 for p in points}, "max": 0.0}
+
+    result = {}
+    for p in points:
+        rank = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        result[f"p{p}"] = round(ordered[rank], 3)
+    result["max"] = round(ordered[-1], 3)
+    return result
+
+
+def _handler_label(scope: dict) -> str:
+    endpoint = scope.get("endpoint")
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "?")
+    name = getattr(endpoint, "__name__", None)
+    label = f"{scope.get('method', '')} {path}".strip()
+    return f"{name} ({label})" if name else label
+
+
+class LoopLagMonitor:
+    """
+    Periodically probes the event loop and measures how late each probe wakes up.
+    Any lag above BLOCKING_THRESHOLD is attributed to the handlers that were in
+    flight during the probe window.
+    """
+
+    def __init__(self, interval: float = LAG_SAMPLE_INTERVAL, threshold: float = BLOCKING_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag_samples = deque(maxlen=MAX_SAMPLES)
+        self.request_latency = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+        self.blocking_events = deque(maxlen=100)
+        self.blocking_handlers = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        self._active: Dict[int, tuple] = {}
+        self._finished = deque(maxlen=512)
+        self._ids = count()
+        self._task = None
+
+    # Request tracking (called by the middleware)
+    def request_started(self, scope: dict) -> int:
+        token = next(self._ids)
+        self._active[token] = (time.perf_counter(), scope)
+        return token
+
+    def request_finished(self, token: int):
+        started, scope = self._active.pop(token)
+        finished = time.perf_counter()
+        label = _handler_label(scope)
+        self._finished.append((finished, label))
+        self.request_latency[label].append((finished - started) * 1000)
+
+    def _handlers_during(self, window_start: float) -> List[str]:
+        labels = {_handler_label(scope) for _, scope in self._active.values()}
+        labels.update(label for finished, label in self._finished if finished >= window_start)
+        return sorted(labels)
+
+    # Probe loop
+    async def _probe(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - start - self.interval)
+            self.lag_samples.append(lag * 1000)
+
+            if lag >= self.threshold:
+                handlers = self._handlers_during(start)
+                lag_ms = round(lag * 1000, 3)
+                self.blocking_events.append({
+                    "timestamp": time.time(),
+                    "lag_ms": lag_ms,
+                    "handlers": handlers,
+                })
+                for handler in handlers:
+                    stats = self.blocking_handlers[handler]
+                    stats["count"] += 1
+                    stats["total_ms"] = round(stats["total_ms"] + lag_ms, 3)
+                    stats["max_ms"] = max(stats["max_ms"], lag_ms)
+                print(f"[diagnostics] event loop blocked for {lag_ms}ms while running: {', '.join(handlers) or 'no handler'}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self, include_samples: bool = False) -> dict:
+        snapshot = {
+            "enabled": True,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "samples": len(self.lag_samples),
+            "lag_ms": percentiles(self.lag_samples),
+            "in_flight": sorted(_handler_label(scope) for _, scope in self._active.values()),
+            "blocking_handlers": dict(sorted(self.blocking_handlers.items(), key=lambda kv: -kv[1]["total_ms"])),
+            "recent_blocking_events": list(self.blocking_events),
+            "request_latency_ms": {
+                label: {**percentiles(samples), "count": len(samples)}
+                for label, samples in self.request_latency.items()
+            },
+        }
+        if include_samples:
+            # Raw per-endpoint latencies, so callers can merge percentiles across processes
+            snapshot["request_latency_samples_ms"] = {
+                label: list(samples) for label, samples in self.request_latency.items()
+            }
+        return snapshot
+
+
+class LoopDiagnosticsMiddleware:
+    """
+    Pure ASGI middleware that tells the monitor which handlers are in flight.
+    """
+
+    def __init__(self, app, monitor: LoopLagMonitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = self.monitor.request_started(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.request_finished(token)
+
+
+def install_loop_diagnostics(app, enabled: bool = LOOP_DIAGNOSTICS):
+    """
+    Wire the lag monitor into a FastAPI app and expose GET /diagnostics/loop.
+    Set LOOP_DIAGNOSTICS=1 to turn it on; otherwise only the endpoint is registered.
+    """
+    monitor = LoopLagMonitor() if enabled else None
+
+    if monitor is not None:
+        app.add_middleware(LoopDiagnosticsMiddleware, monitor=monitor)
+
+        async def _start_monitor():
+            monitor.start()
+
+        async def _stop_monitor():
+            monitor.stop()
+
+        app.add_event_handler("startup", _start_monitor)
+        app.add_event_handler("shutdown", _stop_monitor)
+
+    app.add_event_handler("shutdown", shutdown_io_executor)
+
+    @app.get("/diagnostics/loop", response_model=dict)
+    async def get_loop_diagnostics(include_samples: bool = False):
+        if monitor is None:
+            return {"enabled": False}
+        return monitor.snapshot(include_samples=include_samples)
+
+    return monitor
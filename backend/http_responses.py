@@ -0,0 +1,146 @@
+import gzip
+import json
+import os
+from typing import Any, Optional
+
+from starlette.responses import Response
+
+from diagnostics import run_blocking
+
+# Optional accelerators: orjson for encoding, brotli for `br` responses
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# CONSTANTS
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# Bodies above this are compressed off the event loop
+OFFLOAD_COMPRESSION_BYTES = 256 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/plain", "text/html", "text/csv")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Compact UTF-8 JSON, through orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for plain dict/list payloads that skips FastAPI's
+    response-model validation and `jsonable_encoder` walk.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick `br` (when brotli is available) or `gzip` from an Accept-Encoding header, honouring q=0.
+    """
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware that compresses complete (single-message) responses
+    of a compressible type above `minimum_size`. Streamed responses such as
+    server-sent events pass through untouched so they are not buffered.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if message.get("more_body", False):
+                # Streaming body: forward as-is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            response_headers = [(k, v) for k, v in start["headers"]]
+            lowered = {k.lower(): v for k, v in response_headers}
+            content_type = lowered.get(b"content-type", b"").decode("latin-1")
+            if (len(body) < self.minimum_size or b"content-encoding" in lowered
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= OFFLOAD_COMPRESSION_BYTES:
+                body = await run_blocking(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            response_headers = [(k, v) for k, v in response_headers if k.lower() not in (b"content-length", b"vary")]
+            vary = lowered.get(b"vary")
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": response_headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def install_compression(app, minimum_size: int = COMPRESSION_MIN_BYTES):
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
@@ -0,0 +1,467 @@
+import json
+import os
+import pickle
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from text_vectors import TOKEN_RE, flatten_text
+
+# CONSTANTS
+FIELDS = ("description", "questions")
+SNAPSHOT_EVERY = int(os.getenv("JOB_TEXT_INDEX_SNAPSHOT_EVERY", "5000"))
+SNAPSHOT_VERSION = 1
+TAIL_MERGE_DOCS = 1024
+PHRASE_SCAN_THRESHOLD = 256
+
+QUERY_TOKEN_RE = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+EMPTY = np.zeros(0, dtype=np.int32)
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def index_tokens(text: str) -> List[str]:
+    # Unlike the vectorizer, keep stopwords so phrases match exactly
+    return TOKEN_RE.findall(text.lower())
+
+
+def questions_text(questions: dict) -> str:
+    return flatten_text(questions.get("questions", []))
+
+
+class JobTextIndex:
+    """
+    Positional inverted index over job descriptions and question text.
+
+    Every job version gets a fresh document number, so posting lists are
+    append-only `array('i')`s that stay sorted, and deleted or replaced
+    documents are simply masked out via `_live` until the next snapshot
+    compacts and renumbers them. Queries are evaluated as boolean masks over
+    document numbers. Token sequences (for phrase checks) live in one flat
+    array per field, plus a small dict tail of recently added documents that
+    is merged in periodically.
+
+    Durability: a pickled snapshot plus an append-only JSONL op log that is
+    replayed on open. Replaying is idempotent, so a crash between writing a
+    snapshot and truncating the log is harmless.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, "snapshot.pkl")
+        self.log_path = os.path.join(directory, "ops.jsonl")
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._log = None
+        self._ops_since_snapshot = 0
+        self._reset()
+
+    def _reset(self):
+        self._vocab: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, array]] = {field: {} for field in FIELDS}
+        self._flat: Dict[str, np.ndarray] = {field: EMPTY for field in FIELDS}
+        self._offsets: Dict[str, np.ndarray] = {field: np.zeros(1, dtype=np.int64) for field in FIELDS}
+        self._tail: Dict[str, Dict[int, np.ndarray]] = {field: {} for field in FIELDS}
+        self._flat_docs = 0                          # docs [0, _flat_docs) are in the flat arrays
+        self._doc_job: List[Optional[str]] = []     # doc number -> job id (None once superseded)
+        self._job_doc: Dict[str, int] = {}          # job id -> current doc number
+        self._mtimes: Dict[str, float] = {}
+        self._folders: Dict[str, str] = {}          # job id -> its folder under the job folders
+        self._live = np.zeros(1024, dtype=bool)
+
+    # Indexing
+    def _term_id(self, term: str) -> int:
+        term_id = self._vocab.get(term)
+        if term_id is None:
+            term_id = self._vocab[term] = len(self._vocab)
+        return term_id
+
+    def _put(self, job_id: str, texts: Dict[str, str], mtime: float, folder: Optional[str] = None):
+        self._delete(job_id)
+        doc = len(self._doc_job)
+        self._doc_job.append(job_id)
+        self._job_doc[job_id] = doc
+        self._mtimes[job_id] = mtime
+        self._folders[job_id] = folder or job_id
+        if doc >= self._live.shape[0]:
+            self._live = np.concatenate([self._live, np.zeros(self._live.shape[0], dtype=bool)])
+        self._live[doc] = True
+
+        for field in FIELDS:
+            term_ids = np.array([self._term_id(token) for token in index_tokens(texts.get(field, ""))], dtype=np.int32)
+            self._tail[field][doc] = term_ids
+            postings = self._postings[field]
+            for term_id in np.unique(term_ids).tolist():
+                postings.setdefault(term_id, array("i")).append(doc)
+
+        if len(self._doc_job) - self._flat_docs >= TAIL_MERGE_DOCS:
+            self._merge_tail()
+
+    def _delete(self, job_id: str) -> bool:
+        doc = self._job_doc.pop(job_id, None)
+        if doc is None:
+            return False
+        self._mtimes.pop(job_id, None)
+        self._folders.pop(job_id, None)
+        self._doc_job[doc] = None
+        self._live[doc] = False
+        for field in FIELDS:
+            self._tail[field].pop(doc, None)
+        return True
+
+    def _apply(self, op: dict):
+        if op["op"] == "put":
+            self._put(op["id"], op["texts"], op.get("mtime", 0.0), op.get("folder"))
+        elif op["op"] == "del":
+            self._delete(op["id"])
+
+    def _doc_tokens(self, field: str, doc: int) -> np.ndarray:
+        if doc < self._flat_docs:
+            offsets = self._offsets[field]
+            return self._flat[field][offsets[doc]:offsets[doc + 1]]
+        return self._tail[field].get(doc, EMPTY)
+
+    def _merge_tail(self):
+        docs = range(self._flat_docs, len(self._doc_job))
+        for field in FIELDS:
+            tail = [self._tail[field].get(doc, EMPTY) for doc in docs]
+            lengths = np.array([tokens.shape[0] for tokens in tail], dtype=np.int64)
+            offsets = self._offsets[field]
+            self._flat[field] = np.concatenate([self._flat[field], *tail])
+            self._offsets[field] = np.concatenate([offsets, offsets[-1] + np.cumsum(lengths)])
+            self._tail[field] = {}
+        self._flat_docs = len(self._doc_job)
+
+    # Persistence
+    def _append(self, *ops: dict):
+        self._log.write("".join(json.dumps(op) + "\n" for op in ops))
+        self._log.flush()
+        self._ops_since_snapshot += len(ops)
+        if self._ops_since_snapshot >= SNAPSHOT_EVERY:
+            self._snapshot()
+
+    def _compact(self):
+        # Renumber live documents 0..n-1 (order preserved) and drop dead postings and tokens
+        live_docs = np.flatnonzero(self._live[:len(self._doc_job)])
+        remap = np.full(len(self._doc_job) + 1, -1, dtype=np.int32)
+        remap[live_docs] = np.arange(live_docs.shape[0], dtype=np.int32)
+
+        for field in FIELDS:
+            compacted = {}
+            for term_id, docs in self._postings[field].items():
+                new_docs = remap[np.frombuffer(docs, dtype=np.int32)]
+                new_docs = new_docs[new_docs >= 0]
+                if new_docs.shape[0]:
+                    compacted[term_id] = array("i", new_docs.tobytes())
+            self._postings[field] = compacted
+
+            tokens = [self._doc_tokens(field, doc) for doc in live_docs.tolist()]
+            lengths = np.array([t.shape[0] for t in tokens], dtype=np.int64)
+            self._flat[field] = np.concatenate([EMPTY, *tokens])
+            self._offsets[field] = np.concatenate([np.zeros(1, dtype=np.int64), np.cumsum(lengths)])
+            self._tail[field] = {}
+
+        self._doc_job = [self._doc_job[doc] for doc in live_docs.tolist()]
+        self._job_doc = {job_id: doc for doc, job_id in enumerate(self._doc_job)}
+        self._flat_docs = len(self._doc_job)
+        self._live = np.zeros(max(1024, 2 * len(self._doc_job)), dtype=bool)
+        self._live[:len(self._doc_job)] = True
+
+    def _snapshot(self):
+        self._compact()
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "vocab": self._vocab,
+            "postings": self._postings,
+            "flat": self._flat,
+            "offsets": self._offsets,
+            "doc_job": self._doc_job,
+            "mtimes": self._mtimes,
+            "folders": self._folders,
+        }
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+        self._log.seek(0)
+        self._log.truncate()
+        self._ops_since_snapshot = 0
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "rb") as f:
+                    state = pickle.load(f)
+                if state.get("version") == SNAPSHOT_VERSION:
+                    self._vocab = state["vocab"]
+                    self._postings = state["postings"]
+                    self._flat = state["flat"]
+                    self._offsets = state["offsets"]
+                    self._doc_job = state["doc_job"]
+                    self._job_doc = {job_id: doc for doc, job_id in enumerate(self._doc_job)}
+                    self._mtimes = state["mtimes"]
+                    # Snapshots from before folders were tracked are re-keyed by sync()
+                    self._folders = state.get("folders", {})
+                    self._flat_docs = len(self._doc_job)
+                    self._live = np.zeros(max(1024, 2 * len(self._doc_job)), dtype=bool)
+                    self._live[:len(self._doc_job)] = True
+            except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+                self._reset()
+
+        if os.path.exists(self.log_path):
+            valid_bytes = 0
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        break  # torn final write
+                    self._apply(op)
+                    self._ops_since_snapshot += 1
+                    valid_bytes += len(line)
+            # Drop a torn tail so later appends are not stranded behind it
+            if valid_bytes != os.path.getsize(self.log_path):
+                os.truncate(self.log_path, valid_bytes)
+        self._log = open(self.log_path, "a")
+
+    def upsert(self, job_id: str, description: str, questions: dict, mtime: float = 0.0, folder: Optional[str] = None):
+        texts = {"description": description, "questions": questions_text(questions)}
+        with self._lock:
+            self._put(job_id, texts, mtime, folder)
+            self._append({"op": "put", "id": job_id, "texts": texts, "mtime": mtime, "folder": folder or job_id})
+
+    def upsert_many(self, jobs: List[Tuple[str, str, dict, float]]):
+        """
+        Index a batch of (job id, description, questions, mtime), logged with a single
+        write; each job's folder is named after its id, as create_jobs writes them.
+        """
+        ops = [{"op": "put", "id": job_id, "texts": {"description": description, "questions": questions_text(questions)},
+                "mtime": mtime} for job_id, description, questions, mtime in jobs]
+        with self._lock:
+            for op in ops:
+                self._apply(op)
+            self._append(*ops)
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            removed = self._delete(job_id)
+            if removed:
+                self._append({"op": "del", "id": job_id})
+            return removed
+    def sync(self, job_folders: str):
+        """
+        Load the snapshot and op log, then re-index jobs whose files changed
+        while the server was down (under their questions.json id) and drop jobs
+        whose folder is gone.
+        """
+        with self._lock:
+            if self._log is None:
+                self._load()
+            known = dict(self._mtimes)
+            by_folder = {folder: job_id for job_id, folder in self._folders.items()}
+
+        seen = set()
+        if os.path.isdir(job_folders):
+            for entry in os.scandir(job_folders):
+                description_path = os.path.join(entry.path, "description.txt")
+                questions_path = os.path.join(entry.path, "questions.json")
+                try:
+                    mtime = max(os.stat(description_path).st_mtime, os.stat(questions_path).st_mtime)
+                except OSError:
+                    continue
+                job_id = by_folder.get(entry.name)
+                if job_id is not None and known.get(job_id) == mtime:
+                    seen.add(job_id)
+                    continue
+                try:
+                    with open(description_path) as f:
+                        description = f.read()
+                    with open(questions_path) as f:
+                        questions = json.load(f)
+                    new_id = questions["id"]
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+                seen.add(new_id)
+                # Rebuilt from the source files, so skip the op log; the snapshot below persists it
+                with self._lock:
+                    if job_id is not None and job_id != new_id:
+                        self._delete(job_id)  # the folder now holds another job
+                    self._put(new_id, {"description": description, "questions": questions_text(questions)},
+                              mtime, entry.name)
+                    self._ops_since_snapshot += 1
+
+        with self._lock:
+            for job_id in set(known) - seen:
+                folder = self._folders.get(job_id)
+                if folder is None or not os.path.isdir(os.path.join(job_folders, folder)):
+                    self._delete(job_id)
+                    self._ops_since_snapshot += 1
+            if self._ops_since_snapshot:
+                self._snapshot()
+        self.ready.set()
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                if self._ops_since_snapshot:
+                    self._snapshot()
+                self._log.close()
+                self._log = None
+
+    # Queries
+    def _term_mask(self, term_id: int, fields) -> np.ndarray:
+        mask = np.zeros(len(self._doc_job), dtype=bool)
+        for field in fields:
+            docs = self._postings[field].get(term_id)
+            if docs is not None:
+                mask[np.frombuffer(docs, dtype=np.int32)] = True
+        return mask
+
+    def _phrase_mask(self, terms: List[str], fields) -> np.ndarray:
+        term_ids = [self._vocab.get(term) for term in terms]
+        if any(term_id is None for term_id in term_ids):
+            return np.zeros(len(self._doc_job), dtype=bool)
+
+        candidates = self._live[:len(self._doc_job)].copy()
+        for term_id in set(term_ids):
+            candidates &= self._term_mask(term_id, fields)
+        if len(terms) == 1 or not candidates.any():
+            return candidates
+
+        # Verify adjacency: per document when few candidates, else one vectorized scan per field
+        phrase = np.array(term_ids, dtype=np.int32)
+        n = phrase.shape[0]
+        matched = np.zeros_like(candidates)
+        candidate_docs = np.flatnonzero(candidates)
+        for field in fields:
+            if candidate_docs.shape[0] <= PHRASE_SCAN_THRESHOLD:
+                docs = candidate_docs.tolist()
+            else:
+                flat, offsets = self._flat[field], self._offsets[field]
+                if flat.shape[0] >= n:
+                    hits = flat[:flat.shape[0] - n + 1] == phrase[0]
+                    for i in range(1, n):
+                        hits &= flat[i:flat.shape[0] - n + 1 + i] == phrase[i]
+                    starts = np.flatnonzero(hits)
+                    starts_doc = np.searchsorted(offsets, starts, side="right") - 1
+                    # A match must not run past the end of its document
+                    matched[starts_doc[starts + n <= offsets[starts_doc + 1]]] = True
+                docs = [doc for doc in candidate_docs.tolist() if doc >= self._flat_docs]
+
+            for doc in docs:
+                tokens = self._doc_tokens(field, doc)
+                if tokens.shape[0] < n:
+                    continue
+                starts = np.flatnonzero(tokens[:tokens.shape[0] - n + 1] == phrase[0])
+                if any(np.array_equal(tokens[start:start + n], phrase) for start in starts.tolist()):
+                    matched[doc] = True
+        return matched & candidates
+
+    def query(self, text: str, fields=FIELDS, offset: int = 0, limit: int = 20) -> Tuple[int, List[str]]:
+        """
+        Evaluate a boolean query and return (total matches, one page of job ids),
+        most recently indexed first. Raises QuerySyntaxError on malformed input.
+        """
+        tree = parse_query(text)
+        with self._lock:
+            mask = self._evaluate(tree, fields) & self._live[:len(self._doc_job)]
+            docs = np.flatnonzero(mask)
+            total = int(docs.shape[0])
+            page = docs[::-1][offset:offset + limit]
+            return total, [self._doc_job[doc] for doc in page.tolist()]
+
+    def _evaluate(self, node, fields) -> np.ndarray:
+        kind = node[0]
+        if kind == "phrase":
+            return self._phrase_mask(node[1], fields)
+        if kind == "not":
+            return self._live[:len(self._doc_job)] & ~self._evaluate(node[1], fields)
+        if kind == "and":
+            mask = self._live[:len(self._doc_job)].copy()
+            for child in node[1]:
+                mask &= self._evaluate(child, fields)
+                if not mask.any():
+                    break
+            return mask
+        if kind == "or":
+            mask = np.zeros(len(self._doc_job), dtype=bool)
+            for child in node[1]:
+                mask |= self._evaluate(child, fields)
+            return mask
+        raise QuerySyntaxError(f"Unknown node {kind!r}")
+
+    def __len__(self) -> int:
+        return len(self._job_doc)
+
+
+# ------------------- QUERY PARSER -------------------
+
+def parse_query(text: str):
+    """
+    Parse a query such as `rust AND (distributed OR "systems programming") -java`
+    into a tree of ("and"|"or", [children]), ("not", child) and ("phrase", [terms]).
+    Adjacent clauses are ANDed; `-term` is shorthand for NOT term.
+    """
+    tokens = QUERY_TOKEN_RE.findall(text)
+    if not tokens:
+        raise QuerySyntaxError("Empty query")
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() == "OR":
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and():
+        children = [parse_not()]
+        while peek() is not None and peek() not in (")", "OR"):
+            if peek() == "AND":
+                take()
+            children.append(parse_not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_not():
+        token = peek()
+        if token == "NOT":
+            take()
+            return ("not", parse_not())
+        if token is not None and token.startswith("-") and len(token) > 1:
+            tokens[position] = token[1:]
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        token = take() if peek() is not None else None
+        if token is None or token in (")", "AND", "OR"):
+            raise QuerySyntaxError(f"Unexpected {token or 'end of query'!r}")
+        if token == "(":
+            node = parse_or()
+            closing = take() if peek() is not None else None
+            if closing != ")":
+                raise QuerySyntaxError("Missing closing parenthesis")
+            return node
+        terms = index_tokens(token.strip('"'))
+        if not terms:
+            raise QuerySyntaxError(f"No searchable terms in {token!r}")
+        return ("phrase", terms)
+
+    tree = parse_or()
+    if peek() is not None:
+        raise QuerySyntaxError(f"Unexpected {peek()!r}")
+    return tree
@@ -2,28 +2,44 @@ import json
 import os
 import shutil
 import uuid
+from typing import List, Optional, Tuple
 
-def get_job_data(job_folders: str = "test_data/jobs"): 
+JOB_FIELDS = ("id", "description", "questions")
+
+def get_job_data(job_folders: str = "test_data/jobs", fields = JOB_FIELDS): 
+    """
+    Load every job, reading only the files the requested `fields` need
+    (the id lives in questions.json, so `id` alone skips the descriptions).
+    """
     assert os.path.exists(job_folders)
+    fields = set(fields)
+    read_description = "description" in fields
+    read_questions = bool(fields & {"id", "questions"})
 
     jobs = []
     for path in os.listdir(job_folders):
         job_folder_path = os.path.join(job_folders, path)
+        job = {}
 
-        with open(os.path.join(job_folder_path, "description.txt"), 'r') as f:
-            description = f.read()
+        if read_description:
+            with open(os.path.join(job_folder_path, "description.txt"), 'r') as f:
+                job["description"] = f.read()
 
-        with open(os.path.join(job_folder_path, "questions.json"), 'r') as f:
-            questions = json.load(f)
+        if read_questions:
+            with open(os.path.join(job_folder_path, "questions.json"), 'r') as f:
+                questions = json.load(f)
+            if "questions" in fields:
+                job["questions"] = questions
+            if "id" in fields:
+                job["id"] = questions["id"]
 
-        jobs.append({
-            "description" : description,
-            "questions" : questions,
-            "id" : questions["id"]
-        })
+        jobs.append(job)
 
     return jobs
 
+def get_job_ids(job_folders: str = "test_data/jobs"):
+    return [job["id"] for job in get_job_data(job_folders, fields=("id",))]
+
 def job_exists(job_id: str , job_folders: str = "test_data/jobs"): 
     assert os.path.exists(job_folders)
 
@@ -39,20 +55,46 @@ def job_exists(job_id: str , job_folders: str = "test_data/jobs"):
 
     return False
 
-def create_job(description: str, questions: dict, job_folders: str = "test_data/jobs") -> str:
-    os.makedirs(job_folders, exist_ok=True)
+def _write_job_files(description: str, questions: dict, job_folders: str, indent=2) -> Tuple[str, str, float, float]:
+    """
+    Write one job folder (its parent must exist) and return (job id,
+    questions JSON, description mtime, questions mtime).
+    """
     job_id = questions.get("id") or str(uuid.uuid4())
     questions["id"] = job_id
     job_dir = os.path.join(job_folders, f"{job_id}")
-    os.makedirs(job_dir, exist_ok=True)
+    try:
+        os.mkdir(job_dir)
+    except FileExistsError:
+        pass
 
+    encoded_questions = json.dumps(questions, indent=indent)
     with open(os.path.join(job_dir, "description.txt"), 'w') as f:
         f.write(description)
+        f.flush()
+        description_mtime = os.fstat(f.fileno()).st_mtime
 
     with open(os.path.join(job_dir, "questions.json"), 'w') as f:
-        json.dump(questions, f, indent=2)
+        f.write(encoded_questions)
+        f.flush()
+        questions_mtime = os.fstat(f.fileno()).st_mtime
 
-    return job_id
+    return job_id, encoded_questions, description_mtime, questions_mtime
+
+def create_job(description: str, questions: dict, job_folders: str = "test_data/jobs") -> str:
+    os.makedirs(job_folders, exist_ok=True)
+    return _write_job_files(description, questions, job_folders)[0]
+
+def create_jobs(jobs: List[Tuple[str, dict]], job_folders: str = "test_data/jobs") -> List[Tuple[str, str, float, float]]:
+    """
+    Write a batch of (description, questions) jobs. Returns one (job id,
+    questions JSON, description mtime, questions mtime) tuple per job so
+    callers can publish the batch without reading the files back. The
+    questions are written compactly: indented JSON goes through the much
+    slower pure-Python encoder.
+    """
+    os.makedirs(job_folders, exist_ok=True)
+    return [_write_job_files(description, questions, job_folders, indent=None) for description, questions in jobs]
 
 def delete_job(job_id: str, job_folders: str = "test_data/jobs") -> bool:
     for path in os.listdir(job_folders):
@@ -67,7 +109,11 @@ def delete_job(job_id: str, job_folders: str = "test_data/jobs") -> bool:
             continue
     return False
 
-def update_job(job_id: str, new_description: str = None, new_questions: dict = None, job_folders: str = "test_data/jobs") -> bool:
+def update_job(job_id: str, new_description: str = None, new_questions: dict = None, job_folders: str = "test_data/jobs") -> Optional[str]:
+    """
+    Rewrite the job whose questions.json id is `job_id`. Returns the name of its
+    folder under `job_folders` (which need not match the id), or None if no job has that id.
+    """
     for path in os.listdir(job_folders):
         job_folder_path = os.path.join(job_folders, path)
         try:
@@ -83,10 +129,10 @@ def update_job(job_id: str, new_description: str = None, new_questions: dict = N
                         new_questions["id"] = job_id  # ensure ID doesn't change
                         with open(os.path.join(job_folder_path, "questions.json"), 'w') as q_file:
                             json.dump(new_questions, q_file, indent=2)
-                    return True
+                    return path
         except FileNotFoundError:
             continue
-    return False
+    return None
 
 
 if __name__ == "__main__":
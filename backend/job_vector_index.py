@@ -0,0 +1,239 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from text_vectors import HashingVectorizer
+
+# CONSTANTS
+INDEX_FEATURES = int(os.getenv("JOB_INDEX_FEATURES", "1024"))
+INITIAL_CAPACITY = 1024
+SCORE_CHUNK_ROWS = 16384
+META_FLUSH_INTERVAL_S = 2.0
+
+
+class JobVectorIndex:
+    """
+    Hashed text vectors for every job description, kept in a memory-mapped
+    `.npy` file (one row per job) so the catalog never has to be loaded to
+    answer a similarity query.
+
+    `meta.json` maps rows to job ids (the id in questions.json), the folder
+    the job lives in and the description mtime the row was built from. It is only a cache: `sync()` reconciles it against the job
+    folders at startup, so a lost or stale meta file costs a partial rebuild.
+    """
+
+    def __init__(self, directory: str, n_features: int = INDEX_FEATURES):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.vectorizer = HashingVectorizer(n_features=n_features)
+        self.n_features = n_features
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._rows: Dict[str, int] = {}       # job id -> row
+        self._mtimes: Dict[str, float] = {}   # job id -> description mtime at indexing time
+        self._folders: Dict[str, str] = {}    # job id -> its folder under the job folders
+        self._row_ids: List[Optional[str]] = []  # row -> job id (None for free rows)
+        self._free: List[int] = []
+        self._live = np.zeros(0, dtype=bool)
+        self._dirty = False
+        self._flushed_at = 0.0
+
+    # Storage
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta = {}
+        if os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+
+        vectors = None
+        if os.path.exists(self.vectors_path):
+            vectors = np.load(self.vectors_path, mmap_mode="r+")
+            if vectors.ndim != 2 or vectors.shape[1] != self.n_features:
+                vectors, meta = None, {}  # built with another dimension; start over
+
+        if vectors is None:
+            vectors = np.lib.format.open_memmap(self.vectors_path, mode="w+", dtype=np.float32,
+                                                shape=(INITIAL_CAPACITY, self.n_features))
+
+        self._vectors = vectors
+        self._live = np.zeros(vectors.shape[0], dtype=bool)
+        self._row_ids = [None] * vectors.shape[0]
+        for job_id, (row, mtime, *folder) in meta.get("rows", {}).items():
+            if row < vectors.shape[0]:
+                self._rows[job_id] = row
+                self._mtimes[job_id] = mtime
+                if folder:
+                    self._folders[job_id] = folder[0]
+                self._live[row] = True
+                self._row_ids[row] = job_id
+        self._free = [row for row in range(vectors.shape[0] - 1, -1, -1) if not self._live[row]]
+
+    def _grow(self):
+        old = self._vectors
+        old_capacity = old.shape[0]
+        capacity = old_capacity * 2
+        tmp_path = self.vectors_path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.n_features))
+        grown[:old_capacity] = old
+        grown.flush()
+        del grown
+        self._vectors = None
+        del old
+        os.replace(tmp_path, self.vectors_path)
+        self._vectors = np.load(self.vectors_path, mmap_mode="r+")
+        self._live = np.concatenate([self._live, np.zeros(capacity - old_capacity, dtype=bool)])
+        self._row_ids.extend([None] * (capacity - old_capacity))
+        self._free.extend(range(capacity - 1, old_capacity - 1, -1))
+
+    def _flush_meta(self, force: bool = False):
+        if not self._dirty or (not force and time.monotonic() - self._flushed_at < META_FLUSH_INTERVAL_S):
+            return
+        self._vectors.flush()
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"rows": {job_id: [row, self._mtimes.get(job_id, 0.0), self._folders.get(job_id)]
+                                for job_id, row in self._rows.items()}}, f)
+        os.replace(tmp_path, self.meta_path)
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._flush_meta(force=True)
+
+    # Updates
+    def _put(self, job_id: str, description: str, mtime: float, folder: Optional[str] = None):
+        vector = self.vectorizer.transform_one(description)
+        row = self._rows.get(job_id)
+        if row is None:
+            if not self._free:
+                self._grow()
+            row = self._free.pop()
+            self._rows[job_id] = row
+            self._row_ids[row] = job_id
+            self._live[row] = True
+        self._vectors[row] = vector
+        self._mtimes[job_id] = mtime
+        self._folders[job_id] = folder or job_id
+        self._dirty = True
+
+    def _remove(self, job_id: str):
+        row = self._rows.pop(job_id, None)
+        if row is None:
+            return False
+        self._mtimes.pop(job_id, None)
+        self._folders.pop(job_id, None)
+        self._live[row] = False
+        self._row_ids[row] = None
+        self._vectors[row] = 0.0
+        self._free.append(row)
+        self._dirty = True
+        return True
+
+    def upsert(self, job_id: str, description: str, mtime: float = 0.0, folder: Optional[str] = None):
+        with self._lock:
+            self._put(job_id, description, mtime, folder)
+            self._flush_meta()
+
+    def upsert_many(self, jobs: List[Tuple[str, str, float]]):
+        """
+        Index a batch of (job id, description, mtime) under one lock and one meta
+        flush; each job's folder is named after its id, as create_jobs writes them.
+        """
+        with self._lock:
+            for job_id, description, mtime in jobs:
+                self._put(job_id, description, mtime)
+            self._flush_meta()
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            removed = self._remove(job_id)
+            self._flush_meta()
+            return removed
+
+    def sync(self, job_folders: str):
+        """
+        Open the index and bring it in line with the job folders: index new or
+        modified descriptions under their questions.json id and drop jobs whose
+        folder is gone.
+        """
+        with self._lock:
+            if self._vectors is None:
+                self._open()
+            indexed = set(self._rows)
+            by_folder = {folder: job_id for job_id, folder in self._folders.items()}
+
+        seen = set()
+        if os.path.isdir(job_folders):
+            for entry in os.scandir(job_folders):
+                description_path = os.path.join(entry.path, "description.txt")
+                try:
+                    mtime = os.stat(description_path).st_mtime
+                except OSError:
+                    continue
+                job_id = by_folder.get(entry.name)
+                if job_id is not None and self._mtimes.get(job_id) == mtime:
+                    seen.add(job_id)
+                    continue
+                try:
+                    with open(description_path) as f:
+                        description = f.read()
+                    with open(os.path.join(entry.path, "questions.json")) as f:
+                        new_id = json.load(f)["id"]
+                except (OSError, ValueError, KeyError, TypeError):
+                    continue
+                seen.add(new_id)
+                with self._lock:
+                    if job_id is not None and job_id != new_id:
+                        self._remove(job_id)  # the folder now holds another job
+                    self._put(new_id, description, mtime, entry.name)
+
+        with self._lock:
+            for job_id in indexed - seen:
+                # A job created while we were scanning has a folder; only drop truly missing ones
+                folder = self._folders.get(job_id)
+                if folder is None or not os.path.isdir(os.path.join(job_folders, folder)):
+                    self._remove(job_id)
+            self._flush_meta(force=True)
+        self.ready.set()
+
+    # Queries
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def search(self, text: str, k: int = 20, min_score: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Top-`k` (job id, cosine similarity) pairs for `text`, best first.
+        """
+        query = self.vectorizer.transform_one(text)
+        with self._lock:
+            if self._vectors is None or not self._rows:
+                return []
+            n_rows = self._vectors.shape[0]
+            scores = np.empty(n_rows, dtype=np.float32)
+            # Score in chunks so only a slice of the memmap is paged in at a time
+            for start in range(0, n_rows, SCORE_CHUNK_ROWS):
+                stop = min(start + SCORE_CHUNK_ROWS, n_rows)
+                scores[start:stop] = self._vectors[start:stop] @ query
+            scores[~self._live] = -np.inf
+
+            k = min(k, len(self._rows))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results = [(self._row_ids[row], float(scores[row])) for row in top]
+        if min_score is not None:
+            results = [(job_id, score) for job_id, score in results if score >= min_score]
+        return results
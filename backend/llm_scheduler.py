@@ -0,0 +1,282 @@
+import asyncio
+import heapq
+import os
+import threading
+import time
+from itertools import count
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+# Priorities (lower runs first)
+INTERACTIVE = 0   # dashboard / recruiter requests someone is waiting on
+BACKGROUND = 1    # batch work such as the periodic client loop
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# CONSTANTS
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+TARGET_LATENCY_S = float(os.getenv("LLM_TARGET_LATENCY_S", "20"))
+RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3"))
+RATE_LIMIT_BACKOFF_S = float(os.getenv("LLM_RATE_LIMIT_BACKOFF_S", "2"))
+OUTPUT_TOKEN_ESTIMATE = 512
+POLL_INTERVAL_S = 0.05
+
+
+def estimate_tokens(prompt: str) -> int:
+    # ~4 characters per token for English text, plus room for the response
+    return len(prompt) // 4 + OUTPUT_TOKEN_ESTIMATE
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+def usage_tokens(result: Any) -> Optional[int]:
+    """
+    Total tokens reported by an agents SDK run result, if it carries usage.
+    """
+    responses = getattr(result, "raw_responses", None) or []
+    total = sum(getattr(getattr(response, "usage", None), "total_tokens", 0) or 0 for response in responses)
+    return total or None
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` per second.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        # Positive delta refunds an over-estimate, negative delta charges the difference
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+
+class LLMScheduler:
+    """
+    Process-wide gate for every model call. Calls wait in a priority queue
+    (interactive before background, FIFO within a priority) and start only when
+    the request and token buckets allow it and a concurrency slot is free.
+    The concurrency limit follows AIMD: halved on a 429, trimmed when latency
+    exceeds the target, and grown by one after a window of healthy calls.
+
+    State is guarded by a threading lock and waiters poll, so one scheduler
+    serves async handlers, worker threads and `asyncio.run` callers alike.
+    """
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE, tokens_per_minute: float = TOKENS_PER_MINUTE,
+                 max_concurrency: int = MAX_CONCURRENCY, min_concurrency: int = MIN_CONCURRENCY,
+                 target_latency_s: float = TARGET_LATENCY_S, rate_limit_retries: int = RATE_LIMIT_RETRIES):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.concurrency_limit = max(self.min_concurrency, max_concurrency // 2)
+        self.target_latency_s = target_latency_s
+        self.rate_limit_retries = rate_limit_retries
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._healthy_streak = 0
+        self._waiting = []
+        self._seq = count()
+        self._lock = threading.Lock()
+        self.stats = {
+            "started": {name: 0 for name in PRIORITY_NAMES.values()},
+            "completed": 0,
+            "failed": 0,
+            "rate_limited": 0,
+            "queue_wait_s": {name: 0.0 for name in PRIORITY_NAMES.values()},
+        }
+
+    # Admission
+    def _enqueue(self, priority: int, tokens: int) -> tuple:
+        ticket = (priority, next(self._seq), tokens)
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _cancel(self, ticket: tuple):
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+
+    def _try_start(self, ticket: tuple) -> float:
+        """
+        Start `ticket` if it is at the head of the queue and capacity allows.
+        Returns 0 when started, otherwise how long to wait before retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._waiting[0] != ticket or self.in_flight >= self.concurrency_limit:
+                return POLL_INTERVAL_S
+            if now < self._paused_until:
+                return min(self._paused_until - now, 1.0)
+
+            _, _, tokens = ticket
+            wait = max(self.request_bucket.wait_time(1, now), self.token_bucket.wait_time(tokens, now))
+            if wait > 0:
+                return min(wait, 1.0)
+
+            self.request_bucket.take(1)
+            self.token_bucket.take(tokens)
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            return 0.0
+
+    def _started(self, priority: int, enqueued: float):
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        with self._lock:
+            self.stats["started"][name] = self.stats["started"].get(name, 0) + 1
+            self.stats["queue_wait_s"][name] = self.stats["queue_wait_s"].get(name, 0.0) + time.monotonic() - enqueued
+
+    async def acquire(self, priority: int, tokens: int):
+        enqueued = time.monotonic()
+        ticket = self._enqueue(priority, tokens)
+        try:
+            while (wait := self._try_start(ticket)) > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._cancel(ticket)
+            raise
+        self._started(priority, enqueued)
+
+    def acquire_sync(self, priority: int, tokens: int):
+        enqueued = time.monotonic()
+        ticket = self._enqueue(priority, tokens)
+        try:
+            while (wait := self._try_start(ticket)) > 0:
+                time.sleep(wait)
+        except BaseException:
+            self._cancel(ticket)
+            raise
+        self._started(priority, enqueued)
+
+    def release(self, latency_s: float, estimated_tokens: int, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self.in_flight -= 1
+            actual = usage_tokens(result)
+            if actual is not None:
+                self.token_bucket.adjust(estimated_tokens - actual)
+
+            if error is not None and is_rate_limited(error):
+                # Multiplicative decrease, and hold off new calls briefly
+                self.stats["rate_limited"] += 1
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit // 2)
+                self._paused_until = time.monotonic() + RATE_LIMIT_BACKOFF_S
+                self._healthy_streak = 0
+            elif error is not None:
+                self.stats["failed"] += 1
+            elif latency_s > self.target_latency_s:
+                self.stats["completed"] += 1
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit - 1)
+                self._healthy_streak = 0
+            else:
+                # Additive increase once a full window of calls has been healthy
+                self.stats["completed"] += 1
+                self._healthy_streak += 1
+                if self._healthy_streak >= self.concurrency_limit:
+                    self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1)
+                    self._healthy_streak = 0
+
+    # Entry points
+    async def run(self, priority: int, prompt: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        tokens = estimate_tokens(prompt)
+        for attempt in range(self.rate_limit_retries + 1):
+            await self.acquire(priority, tokens)
+            started = time.monotonic()
+            try:
+                result = await call()
+            except BaseException as e:
+                # Includes cancellation, so the slot is never leaked
+                self.release(time.monotonic() - started, tokens, error=e)
+                if isinstance(e, Exception) and is_rate_limited(e) and attempt < self.rate_limit_retries:
+                    continue
+                raise
+            self.release(time.monotonic() - started, tokens, result=result)
+            return result
+
+    def run_sync(self, priority: int, prompt: str, call: Callable[[], Any]) -> Any:
+        tokens = estimate_tokens(prompt)
+        for attempt in range(self.rate_limit_retries + 1):
+            self.acquire_sync(priority, tokens)
+            started = time.monotonic()
+            try:
+                result = call()
+            except BaseException as e:
+                # Includes cancellation, so the slot is never leaked
+                self.release(time.monotonic() - started, tokens, error=e)
+                if isinstance(e, Exception) and is_rate_limited(e) and attempt < self.rate_limit_retries:
+                    continue
+                raise
+            self.release(time.monotonic() - started, tokens, result=result)
+            return result
+
+    async def stream(self, priority: int, prompt: str, open_stream: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Like `run`, but for a streamed call: the slot is held until the stream
+        ends. A 429 is only retried if it arrives before the first event.
+        """
+        tokens = estimate_tokens(prompt)
+        for attempt in range(self.rate_limit_retries + 1):
+            await self.acquire(priority, tokens)
+            started = time.monotonic()
+            last = None
+            try:
+                async for event in open_stream():
+                    last = event
+                    yield event
+            except BaseException as e:
+                # Includes the consumer going away (GeneratorExit / cancellation)
+                self.release(time.monotonic() - started, tokens, error=e)
+                if isinstance(e, Exception) and is_rate_limited(e) and last is None and attempt < self.rate_limit_retries:
+                    continue
+                raise
+            self.release(time.monotonic() - started, tokens, result=getattr(last, "result", None))
+            return
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waiting = {}
+            for priority, _, _ in self._waiting:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            return {
+                "concurrency_limit": self.concurrency_limit,
+                "in_flight": self.in_flight,
+                "waiting": waiting,
+                "request_tokens_available": round(self.request_bucket.tokens, 1),
+                "llm_tokens_available": round(self.token_bucket.tokens, 1),
+                "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                **self.stats,
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
@@ -2,61 +2,22 @@ import os
 import json
 import asyncio
 from typing import List
-from agents import Agent, Runner, trace
-from dotenv import load_dotenv
 from pydantic import BaseModel
-from agent_tools import ResumeRetrievalTool
+from model_backend import load_settings, run_agent_sync
 from job_utils import get_job_data
+from models import *
 import uuid
 
-# 1) Load .env to get OPENAI_API_KEY
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise EnvironmentError("Please set the OPENAI_API_KEY environment variable (e.g. in a .env file).")
-
 # 6) Asynchronous "main" function that runs a 4-step demo
 def main():
-    agent = Agent(
-            name=f"test",
-            instructions="You are a staffing agent that helps clients apply for job applications.",
-            tools=[ResumeRetrievalTool],
-    )
-
-    o = Runner.run_sync(
-            agent, 
+    o = run_agent_sync(
+            "demo", 
             "Tell me about Ansh.",
             max_turns= 5,
         ).final_output
 
     print(o)
     
-# Job Relevancy Evaluation objects
-class JobRelevancyEvaluation(BaseModel):
-    score: float
-    justification: str
-
-# Job Relevancy Evaluation objects
-class CompanyCandidateRelevancyEvaluation(BaseModel):
-    score: float
-    candidate_pros: List[str]
-    candidate_cons: List[str]
-
-class JobApplicationResponse(BaseModel):
-    question: str
-    response: str
-
-class JobApplicationQuestion(BaseModel):
-    expected_response: str
-    type: str
-    question: str
-
-class JobApplicationQuestions(BaseModel):
-    questions: List[JobApplicationQuestion]
-
-class JobApplicationResponses(BaseModel):
-    responses: List[JobApplicationQuestion]
-    
 TURNS = 2
 RELEVANT_JOB_THRESHOLD = 5 
 
@@ -76,14 +37,6 @@ def run_conversation():
     print("Initializing agentic conversation.")
     company = "zyphra"
     for job in job_data:
-        # Initialize the client agent
-        client_agent = Agent(
-                name=f"client-agent",
-                instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                tools=[ResumeRetrievalTool],
-                output_type=JobRelevancyEvaluation
-        )
-
         description = job["description"]
 
         INTERNAL_REVIEW_PROMPT = f"""
@@ -91,8 +44,8 @@ def run_conversation():
             a scale of 0-10, 10 being extremely qualified, and 0 meaning the client has zero observable qualifications. Then, provide a justification for your rating, citing specific evidence. 
         """
 
-        internal_review = Runner.run_sync(
-            client_agent, 
+        internal_review = run_agent_sync(
+            "client-review", 
             INTERNAL_REVIEW_PROMPT,
             max_turns=TURNS,
         ).final_output
@@ -106,15 +59,9 @@ def run_conversation():
         REQUEST_SERVER_REVIEW_PROMPT = f"""
             Draft a message to reach out to the human-resources for the company. Introduce yourself and your candidate, and then discuss about how your candidate is looking for a job, and highlight why you feel he is a relevant fit for the job. 
         """
-        
-        client_agent = Agent(
-                name=f"client-agent",
-                instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                tools=[ResumeRetrievalTool],
-        )
-
-        candidate_pitch = Runner.run_sync(
-            client_agent, 
+
+        candidate_pitch = run_agent_sync(
+            "client-pitch", 
             REQUEST_SERVER_REVIEW_PROMPT,
             max_turns=TURNS,
         ).final_output
@@ -136,15 +83,8 @@ def run_conversation():
         
         """
 
-        # Initialize the server agent
-        server_agent = Agent(
-                name=f"server-agent",
-                instructions="You are Sammy, a human resources agent that works with clients and representatives to identify good fits for prospective hires.",
-                tools=[],
-                output_type=CompanyCandidateRelevancyEvaluation
-        )
-        company_response = Runner.run_sync(
-            server_agent,
+        company_response = run_agent_sync(
+            "server-feedback",
             COMPANY_INTERNAL_REVIEW_PROMPT,
             max_turns=TURNS,
         ).final_output
@@ -162,15 +102,8 @@ def run_conversation():
                 Fill out the questions using data you have on the client. Make sure that you type out the question exactly as listed in the response.
             """
 
-            application_agent = Agent(
-                    name=f"client-agent",
-                    instructions="You are Alicia, a staffing agent that helps clients apply for job applications.",
-                    tools=[ResumeRetrievalTool],
-                    output_type=JobApplicationResponses
-            )
-
-            application_filled = Runner.run_sync(
-                application_agent,
+            application_filled = run_agent_sync(
+                "client-application",
                 JOB_APPLICATION_QUESTIONS_PROMPT,
                 max_turns=2 * TURNS,
             ).final_output
@@ -182,4 +115,5 @@ def run_conversation():
     print("Completed agentic conversation")
 
 if __name__ == "__main__":
+    load_settings()
     run_conversation()
@@ -0,0 +1,544 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import typing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from agent_registry import AGENT_SPECS, get_agent, warm_agents
+from llm_scheduler import BACKGROUND, get_scheduler
+from models import JobApplicationResponse, JobApplicationResponses
+from run_log import (RUN_LOG_DIR, RunRecorder, context_candidate, decode_output, get_recorder, prompt_hash, read_runs,
+                     run_log_paths)
+
+DEFAULT_MODEL_BACKEND = "openai"
+
+_backend = None
+# Finished runs per agent key in this process, whatever the backend
+_completed_runs: Dict[str, int] = {}
+
+
+def load_settings():
+    """
+    Load .env and build the configured model backend (MODEL_BACKEND=openai|fake|replay).
+    Raises EnvironmentError if the OpenAI backend is selected without an API key.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return get_backend()
+
+
+def create_backend(name: str) -> "ModelBackend":
+    name = name.strip().lower()
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "fake":
+        return FakeModelBackend.from_env()
+    if name == "replay":
+        return ReplayBackend.from_env()
+    raise ValueError(f"Unknown MODEL_BACKEND {name!r} (expected 'openai', 'fake' or 'replay')")
+
+
+def get_backend() -> "ModelBackend":
+    global _backend
+    if _backend is None:
+        backend = create_backend(os.getenv("MODEL_BACKEND", DEFAULT_MODEL_BACKEND))
+        recorder = get_recorder()
+        # Replayed runs are already in a log
+        _backend = RecordingBackend(backend, recorder) if recorder and backend.name != "replay" else backend
+    return _backend
+
+
+def set_backend(backend: "ModelBackend"):
+    global _backend
+    _backend = backend
+
+
+async def run_agent(key: str, prompt: str, max_turns: int, priority: int = BACKGROUND, context: Any = None):
+    """
+    Run the registered agent `key` on the configured backend, admitted through the
+    process-wide LLM scheduler. `context` is handed to the agent's tools (e.g. the
+    candidate whose resume `get_resume` returns). The result exposes `final_output`.
+    """
+    backend = get_backend()
+    if not backend.scheduled:
+        # Schedules its own provider calls (e.g. replay misses sent to a fallback)
+        result = await backend.run(key, prompt, max_turns, context, priority=priority)
+    else:
+        result = await get_scheduler().run(priority, prompt, lambda: backend.run(key, prompt, max_turns, context))
+    _count_run(key)
+    return result
+
+
+def run_agent_sync(key: str, prompt: str, max_turns: int, priority: int = BACKGROUND, context: Any = None):
+    backend = get_backend()
+    if not backend.scheduled:
+        result = backend.run_sync(key, prompt, max_turns, context, priority=priority)
+    else:
+        result = get_scheduler().run_sync(priority, prompt, lambda: backend.run_sync(key, prompt, max_turns, context))
+    _count_run(key)
+    return result
+
+
+def stream_agent(key: str, prompt: str, max_turns: int, priority: int = BACKGROUND, context: Any = None) -> AsyncIterator[Any]:
+    """
+    Streamed variant of `run_agent`: yields `StreamDelta`s as output text
+    arrives (partial JSON for structured agents), then one `StreamFinal`.
+    """
+    backend = get_backend()
+    if not backend.scheduled:
+        events = backend.stream(key, prompt, max_turns, context, priority=priority)
+    else:
+        events = get_scheduler().stream(priority, prompt, lambda: backend.stream(key, prompt, max_turns, context))
+    return _counted_stream(key, events)
+
+
+def _count_run(key: str):
+    _completed_runs[key] = _completed_runs.get(key, 0) + 1
+
+
+async def _counted_stream(key: str, events: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    async for event in events:
+        if isinstance(event, StreamFinal):
+            _count_run(key)
+        yield event
+
+
+def run_log_snapshot() -> dict:
+    backend = get_backend()
+    completed = dict(sorted(_completed_runs.items()))
+    if isinstance(backend, RecordingBackend):
+        return {"backend": backend.inner.name, "completed_runs": completed, "recording": backend.recorder.snapshot()}
+    if isinstance(backend, ReplayBackend):
+        recording = backend.fallback.recorder.snapshot() if isinstance(backend.fallback, RecordingBackend) else {"enabled": False}
+        return {"backend": backend.name, "completed_runs": completed, "replay": backend.snapshot(), "recording": recording}
+    return {"backend": backend.name, "completed_runs": completed, "recording": {"enabled": False}}
+
+
+@dataclass
+class StreamDelta:
+    text: str
+
+
+@dataclass
+class StreamFinal:
+    output: Any
+    result: Any = None
+
+
+class ModelBackend:
+    name = "base"
+    # Calls go through the process-wide LLM scheduler (rate limits, concurrency);
+    # unscheduled backends take a `priority` and admit their own provider calls
+    scheduled = True
+
+    async def run(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        raise NotImplementedError
+
+    def run_sync(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        return asyncio.run(self.run(key, prompt, max_turns, context))
+
+    async def stream(self, key: str, prompt: str, max_turns: int, context: Any = None) -> AsyncIterator[Any]:
+        # Backends without token streaming deliver the whole output as one delta
+        result = await self.run(key, prompt, max_turns, context)
+        yield StreamDelta(output_text(result.final_output))
+        yield StreamFinal(result.final_output, result)
+
+    def warm(self, keys: Optional[Iterable[str]] = None):
+        pass
+
+
+class OpenAIBackend(ModelBackend):
+    """
+    Hosted models through the agents SDK `Runner`.
+    """
+    name = "openai"
+
+    def __init__(self):
+        if not os.getenv("OPENAI_API_KEY"):
+            raise EnvironmentError("Please set the OPENAI_API_KEY environment variable (e.g. in a .env file).")
+
+    async def run(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        from agents import Runner
+
+        return await Runner.run(get_agent(key), prompt, context=context, max_turns=max_turns)
+
+    def run_sync(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        from agents import Runner
+
+        return Runner.run_sync(get_agent(key), prompt, context=context, max_turns=max_turns)
+
+    async def stream(self, key: str, prompt: str, max_turns: int, context: Any = None) -> AsyncIterator[Any]:
+        from agents import Runner
+        from openai.types.responses import ResponseTextDeltaEvent
+
+        result = Runner.run_streamed(get_agent(key), prompt, context=context, max_turns=max_turns)
+        async for event in result.stream_events():
+            if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                yield StreamDelta(event.data.delta)
+        yield StreamFinal(result.final_output, result)
+
+    def warm(self, keys: Optional[Iterable[str]] = None):
+        warm_agents(keys)
+
+
+class RecordingBackend(ModelBackend):
+    """
+    Wraps another backend and appends every finished run (or failure) to the run log.
+    """
+
+    def __init__(self, inner: ModelBackend, recorder: RunRecorder):
+        self.inner = inner
+        self.recorder = recorder
+        self.name = inner.name
+        self.scheduled = inner.scheduled
+
+    async def run(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        started = time.perf_counter()
+        try:
+            result = await self.inner.run(key, prompt, max_turns, context)
+        except Exception as e:
+            self.recorder.record(self.name, key, prompt, context, (time.perf_counter() - started) * 1000, error=e)
+            raise
+        self.recorder.record(self.name, key, prompt, context, (time.perf_counter() - started) * 1000,
+                             output=result.final_output, result=result)
+        return result
+
+    def run_sync(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        started = time.perf_counter()
+        try:
+            result = self.inner.run_sync(key, prompt, max_turns, context)
+        except Exception as e:
+            self.recorder.record(self.name, key, prompt, context, (time.perf_counter() - started) * 1000, error=e)
+            raise
+        self.recorder.record(self.name, key, prompt, context, (time.perf_counter() - started) * 1000,
+                             output=result.final_output, result=result)
+        return result
+
+    async def stream(self, key: str, prompt: str, max_turns: int, context: Any = None) -> AsyncIterator[Any]:
+        started = time.perf_counter()
+        try:
+            async for event in self.inner.stream(key, prompt, max_turns, context):
+                if isinstance(event, StreamFinal):
+                    self.recorder.record(self.name, key, prompt, context, (time.perf_counter() - started) * 1000,
+                                         output=event.output, result=event.result)
+                yield event
+        except Exception as e:
+            self.recorder.record(self.name, key, prompt, context, (time.perf_counter() - started) * 1000, error=e)
+            raise
+
+    def warm(self, keys: Optional[Iterable[str]] = None):
+        self.inner.warm(keys)
+
+
+def output_text(output: Any) -> str:
+    # What the model would have emitted: plain text, or JSON for structured outputs
+    if isinstance(output, BaseModel):
+        return output.model_dump_json()
+    return output if isinstance(output, str) else json.dumps(output)
+
+
+# ------------------- LOCAL STAND-IN PROVIDER -------------------
+
+class FakeModelError(RuntimeError):
+    """
+    Injected failure from the fake backend. `status_code` mirrors the provider error it imitates.
+    """
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class FakeRunResult:
+    final_output: Any
+    latency_ms: float
+
+
+FAKE_FIRST_TOKEN_FRACTION = 0.2
+FAKE_STREAM_CHUNK_CHARS = 16
+
+FAKE_PHRASES = [
+    "hands-on experience with distributed systems",
+    "strong Python and PyTorch skills",
+    "clear ownership of end-to-end projects",
+    "experience optimizing GPU workloads",
+    "solid communication with cross-functional teams",
+    "limited experience leading large teams",
+    "no published research in top venues",
+    "a track record of shipping production infrastructure",
+    "familiarity with cloud platforms and containers",
+    "exposure to hardware and accelerator design",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    return f"The candidate shows {rng.choice(FAKE_PHRASES)}."
+
+
+def _fake_application(prompt: str, rng: random.Random) -> JobApplicationResponses:
+    # The application prompt embeds `JobApplicationQuestions.model_dump_json()`; answer each question verbatim
+    start = prompt.find('{"questions"')
+    questions = []
+    if start != -1:
+        try:
+            questions = json.JSONDecoder().raw_decode(prompt, start)[0].get("questions", [])
+        except ValueError:
+            questions = []
+    return JobApplicationResponses(responses=[
+        JobApplicationResponse(question=q.get("question", ""), response=_sentence(rng))
+        for q in questions
+    ])
+
+
+def fake_value(annotation: Any, rng: random.Random, prompt: str = "", field_name: str = "") -> Any:
+    """
+    Build a deterministic, schema-valid value for `annotation`.
+    """
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if annotation is None or annotation is str:
+        if field_name == "percent":
+            return f"{rng.randint(5, 95)}%"
+        return _sentence(rng)
+    if annotation is bool:
+        return rng.random() < 0.5
+    if annotation is int:
+        return rng.randint(1, 10)
+    if annotation is float:
+        return round(rng.uniform(0, 10), 1)
+    if origin in (list, typing.List):
+        return [fake_value(args[0] if args else str, rng, prompt, field_name) for _ in range(rng.randint(2, 4))]
+    if origin is typing.Union:
+        return fake_value(next(arg for arg in args if arg is not type(None)), rng, prompt, field_name)
+    if isinstance(annotation, type) and issubclass(annotation, JobApplicationResponses):
+        return _fake_application(prompt, rng)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation(**{
+            name: fake_value(field.annotation, rng, prompt, name)
+            for name, field in annotation.model_fields.items()
+        })
+    raise TypeError(f"Fake backend cannot build a value for {annotation!r}")
+
+
+class FakeModelBackend(ModelBackend):
+    """
+    Offline stand-in for the hosted model. Outputs are a pure function of
+    (seed, agent, prompt) and always validate against the agent's output type.
+    Latency and injected failures come from a seeded per-process stream.
+    """
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 800.0, jitter_ms: float = 200.0, failure_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self._faults = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "FakeModelBackend":
+        latency_ms = float(os.getenv("FAKE_MODEL_LATENCY_MS", "800"))
+        return cls(
+            latency_ms=latency_ms,
+            jitter_ms=float(os.getenv("FAKE_MODEL_JITTER_MS", latency_ms / 4)),
+            failure_rate=float(os.getenv("FAKE_MODEL_FAILURE_RATE", "0")),
+            rate_limit_rate=float(os.getenv("FAKE_MODEL_RATE_LIMIT_RATE", "0")),
+            seed=int(os.getenv("FAKE_MODEL_SEED", "0")),
+        )
+
+    def _plan(self, key: str):
+        delay = max(0.0, self._faults.gauss(self.latency_ms, self.jitter_ms)) / 1000 if self.jitter_ms else self.latency_ms / 1000
+        roll = self._faults.random()
+        if roll < self.rate_limit_rate:
+            return delay, FakeModelError(f"Fake rate limit for {key}", status_code=429)
+        if roll < self.rate_limit_rate + self.failure_rate:
+            return delay, FakeModelError(f"Fake model failure for {key}")
+        return delay, None
+
+    def _output(self, key: str, prompt: str, context: Any = None):
+        # Tools read the candidate from the context, so it is part of the "input" too
+        candidate = getattr(context, "candidate_id", "")
+        digest = hashlib.sha256(f"{self.seed}:{key}:{candidate}:{prompt}".encode()).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        return fake_value(AGENT_SPECS[key].output_type, rng, prompt)
+
+    async def run(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        delay, error = self._plan(key)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return FakeRunResult(final_output=self._output(key, prompt, context), latency_ms=delay * 1000)
+
+    async def stream(self, key: str, prompt: str, max_turns: int, context: Any = None) -> AsyncIterator[Any]:
+        # First chunk after a fraction of the latency, the rest spread over the remainder
+        delay, error = self._plan(key)
+        await asyncio.sleep(delay * FAKE_FIRST_TOKEN_FRACTION)
+        if error:
+            raise error
+        output = self._output(key, prompt, context)
+        text = output_text(output)
+        chunks = [text[i:i + FAKE_STREAM_CHUNK_CHARS] for i in range(0, len(text), FAKE_STREAM_CHUNK_CHARS)] or [""]
+        gap = delay * (1 - FAKE_FIRST_TOKEN_FRACTION) / len(chunks)
+        for index, chunk in enumerate(chunks):
+            if index:
+                await asyncio.sleep(gap)
+            yield StreamDelta(chunk)
+        yield StreamFinal(output, FakeRunResult(final_output=output, latency_ms=delay * 1000))
+
+    def run_sync(self, key: str, prompt: str, max_turns: int, context: Any = None):
+        delay, error = self._plan(key)
+        time.sleep(delay)
+        if error:
+            raise error
+        return FakeRunResult(final_output=self._output(key, prompt, context), latency_ms=delay * 1000)
+
+
+# ------------------- OFFLINE REPLAY -------------------
+
+class ReplayMissError(LookupError):
+    """
+    No recorded run matches the call (and no fallback backend is configured).
+    """
+
+
+class ReplayedRunError(RuntimeError):
+    """
+    A recorded run that failed, raised again on replay. `status_code` is the original one.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class ReplayRunResult:
+    final_output: Any
+    latency_ms: float
+    usage: Optional[dict] = None
+
+
+class ReplayBackend(ModelBackend):
+    """
+    Answers calls from recorded run logs, matched on (agent, candidate, prompt).
+    Repeated identical calls are served the recorded runs in order (the last
+    one repeats), so a replayed cycle sees the same outputs and failures as the
+    recorded one. Hits skip the LLM scheduler and, unless `replay_latency` is
+    set, return at disk speed. Misses raise ReplayMissError or go to `fallback`
+    through the scheduler, recorded to the run log when recording is on.
+    """
+    name = "replay"
+    scheduled = False
+
+    def __init__(self, paths: List[str], fallback: Optional[ModelBackend] = None, replay_latency: bool = False):
+        self.paths = paths
+        self.fallback = fallback
+        self.replay_latency = replay_latency
+        self.runs: Dict[str, List[dict]] = {}
+        for entry in read_runs(paths):
+            self.runs.setdefault(entry["prompt_hash"], []).append(entry)
+        self._served: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "fallbacks": 0, "replayed_errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "ReplayBackend":
+        source = os.getenv("REPLAY_LOG", RUN_LOG_DIR)
+        paths = run_log_paths(source)
+        if not paths:
+            raise FileNotFoundError(f"No run logs found at {source!r} (set REPLAY_LOG to a file, directory or glob)")
+        fallback = os.getenv("REPLAY_FALLBACK", "").strip()
+        fallback_backend = create_backend(fallback) if fallback else None
+        recorder = get_recorder()
+        if fallback_backend is not None and recorder:
+            # Misses are new runs; log them so the next replay covers them
+            fallback_backend = RecordingBackend(fallback_backend, recorder)
+        return cls(
+            paths,
+            fallback=fallback_backend,
+            replay_latency=os.getenv("REPLAY_LATENCY", "0") == "1",
+        )
+
+    def _next(self, key: str, prompt: str, context: Any) -> Optional[dict]:
+        digest = prompt_hash(key, prompt, context_candidate(context))
+        runs = self.runs.get(digest)
+        if not runs:
+            return None
+        index = self._served.get(digest, 0)
+        self._served[digest] = index + 1
+        return runs[min(index, len(runs) - 1)]
+
+    def _result(self, key: str, entry: dict) -> ReplayRunResult:
+        if "error" in entry:
+            self.stats["replayed_errors"] += 1
+            raise ReplayedRunError(entry["error"], entry.get("status_code"))
+        self.stats["hits"] += 1
+        output = decode_output(entry.get("output"), AGENT_SPECS[key].output_type)
+        return ReplayRunResult(final_output=output, latency_ms=entry.get("latency_ms", 0.0), usage=entry.get("usage"))
+
+    def _miss(self, key: str):
+        self.stats["misses"] += 1
+        if self.fallback is None:
+            raise ReplayMissError(f"No recorded {key} run for this prompt")
+        self.stats["fallbacks"] += 1
+
+    async def run(self, key: str, prompt: str, max_turns: int, context: Any = None, priority: int = BACKGROUND):
+        entry = self._next(key, prompt, context)
+        if entry is None:
+            self._miss(key)
+            if not self.fallback.scheduled:
+                return await self.fallback.run(key, prompt, max_turns, context)
+            return await get_scheduler().run(priority, prompt,
+                                             lambda: self.fallback.run(key, prompt, max_turns, context))
+        if self.replay_latency:
+            await asyncio.sleep(entry.get("latency_ms", 0.0) / 1000)
+        return self._result(key, entry)
+
+    def run_sync(self, key: str, prompt: str, max_turns: int, context: Any = None, priority: int = BACKGROUND):
+        entry = self._next(key, prompt, context)
+        if entry is None:
+            self._miss(key)
+            if not self.fallback.scheduled:
+                return self.fallback.run_sync(key, prompt, max_turns, context)
+            return get_scheduler().run_sync(priority, prompt,
+                                            lambda: self.fallback.run_sync(key, prompt, max_turns, context))
+        if self.replay_latency:
+            time.sleep(entry.get("latency_ms", 0.0) / 1000)
+        return self._result(key, entry)
+
+    async def stream(self, key: str, prompt: str, max_turns: int, context: Any = None,
+                     priority: int = BACKGROUND) -> AsyncIterator[Any]:
+        entry = self._next(key, prompt, context)
+        if entry is None:
+            self._miss(key)
+            if not self.fallback.scheduled:
+                events = self.fallback.stream(key, prompt, max_turns, context)
+            else:
+                events = get_scheduler().stream(priority, prompt,
+                                                lambda: self.fallback.stream(key, prompt, max_turns, context))
+            async for event in events:
+                yield event
+            return
+        if self.replay_latency:
+            await asyncio.sleep(entry.get("latency_ms", 0.0) / 1000)
+        result = self._result(key, entry)
+        yield StreamDelta(output_text(result.final_output))
+        yield StreamFinal(result.final_output, result)
+
+    def snapshot(self) -> dict:
+        return {
+            "logs": len(self.paths),
+            "recorded_prompts": len(self.runs),
+            "recorded_runs": sum(len(runs) for runs in self.runs.values()),
+            "replay_latency": self.replay_latency,
+            "fallback": self.fallback.name if self.fallback else None,
+            **self.stats,
+        }
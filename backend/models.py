@@ -24,4 +24,16 @@ class JobApplicationSubmission(BaseModel):
 class CompanyCandidateRelevancyEvaluation(BaseModel):
     score: float
     candidate_pros: List[str]
-    candidate_cons: List[str]
\ No newline at end of file
+    candidate_cons: List[str]
+
+class JobRelevancyEvaluation(BaseModel):
+    score: float
+    justification: str
+
+# Response model for a reason and its percentage
+class ReasonPercent(BaseModel):
+    reason: str
+    percent: str
+
+class ModelReasons(BaseModel):
+    reasons: List[ReasonPercent]
@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Optional exact tokenizer; without it we fall back to ~4 characters per token
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None
+
+# CONSTANTS
+TOKENIZER_ENCODING = os.getenv("PROMPT_TOKENIZER_ENCODING", "o200k_base")
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = " [...] "
+# Share of a trimmed text kept from its start; the rest comes from its end
+HEAD_FRACTION = 0.75
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Per-stage token budgets for the variable parts of each prompt (PROMPT_BUDGET_<PART>=n overrides)
+DEFAULT_BUDGETS = {
+    "description": 1200,
+    "pitch": 400,
+    "resume": 800,
+    "question": 120,
+    "summary_entry": 60,
+    "summary_entries": 2000,
+}
+BUDGETS = {part: int(os.getenv(f"PROMPT_BUDGET_{part.upper()}", str(tokens))) for part, tokens in DEFAULT_BUDGETS.items()}
+
+_encoder = None
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "tokens_in": 0, "tokens_out": 0, "trimmed": 0})
+
+
+def _get_encoder():
+    global _encoder
+    if _encoder is None and tiktoken is not None:
+        try:
+            _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception:
+            _encoder = False  # encoding files unavailable (offline); use the estimate
+    return _encoder or None
+
+
+def count_tokens(text: str) -> int:
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def normalize_text(text: Any) -> str:
+    return WHITESPACE_RE.sub(" ", str(text)).strip()
+
+
+def trim_text(text: str, max_tokens: int) -> str:
+    """
+    Collapse whitespace and, if `text` is still over `max_tokens`, keep its
+    head and tail around a truncation marker (requirements often sit at the end).
+    """
+    text = normalize_text(text)
+    if max_tokens <= 0 or count_tokens(text) <= max_tokens:
+        return text
+
+    encoder = _get_encoder()
+    budget = max(1, max_tokens - count_tokens(TRUNCATION_MARKER))
+    head_tokens = int(budget * HEAD_FRACTION)
+    tail_tokens = budget - head_tokens
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        head = encoder.decode(tokens[:head_tokens])
+        tail = encoder.decode(tokens[len(tokens) - tail_tokens:]) if tail_tokens else ""
+    else:
+        head = text[:head_tokens * CHARS_PER_TOKEN]
+        tail = text[len(text) - tail_tokens * CHARS_PER_TOKEN:] if tail_tokens else ""
+    return head.rstrip() + TRUNCATION_MARKER + tail.lstrip()
+
+
+def _digest_value(value: Any) -> str:
+    # Nested entries keep their values only; the section header names them
+    if isinstance(value, dict):
+        return " | ".join(filter(None, (_digest_value(item) for item in value.values())))
+    if isinstance(value, list):
+        return ", ".join(filter(None, (_digest_value(item) for item in value)))
+    return "" if value is None else normalize_text(value)
+
+
+def _digest_lines(resume: Any) -> Iterable[str]:
+    if not isinstance(resume, dict):
+        yield _digest_value(resume)
+        return
+    for key, value in resume.items():
+        if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+            entries = [entry for entry in map(_digest_value, value) if entry]
+            if entries:
+                yield f"{key}:"
+                yield from (f"- {entry}" for entry in entries)
+        else:
+            text = _digest_value(value)
+            if text:
+                yield f"{key}: {text}"
+
+
+def resume_digest(resume: Any, max_tokens: Optional[int] = None) -> str:
+    """
+    Compact, deterministic plain-text rendering of a resume: one line per
+    section or entry, empty fields dropped, whitespace collapsed. Later lines
+    (older experience, projects) are dropped first when over budget.
+    """
+    if hasattr(resume, "model_dump"):
+        resume = resume.model_dump()
+    if isinstance(resume, str):
+        try:
+            resume = json.loads(resume)
+        except ValueError:
+            pass
+    max_tokens = BUDGETS["resume"] if max_tokens is None else max_tokens
+
+    lines = list(_digest_lines(resume))
+    digest = "\n".join(lines)
+    while len(lines) > 1 and count_tokens(digest) > max_tokens:
+        lines.pop()
+        while len(lines) > 1 and lines[-1].endswith(":"):
+            lines.pop()  # a section header with no entries left
+        digest = "\n".join(lines)
+    return trim_text(digest, max_tokens) if count_tokens(digest) > max_tokens else digest
+
+
+def compact_questions(application: Any, max_tokens: Optional[int] = None) -> str:
+    """
+    `JobApplicationQuestions` as compact JSON, with each question's text
+    trimmed to `max_tokens`. It stays valid JSON with the same shape.
+    """
+    data = application.model_dump() if hasattr(application, "model_dump") else dict(application)
+    max_tokens = BUDGETS["question"] if max_tokens is None else max_tokens
+    questions = [
+        {**question, "question": trim_text(question.get("question", ""), max_tokens)}
+        for question in data.get("questions", [])
+    ]
+    return json.dumps({**data, "questions": questions}, ensure_ascii=False, separators=(",", ":"))
+
+
+def trim_entries(entries: List[str], max_tokens: Optional[int] = None, entry_tokens: Optional[int] = None) -> List[str]:
+    """
+    Trim each entry to `entry_tokens` and keep entries until the total reaches `max_tokens`.
+    """
+    max_tokens = BUDGETS["summary_entries"] if max_tokens is None else max_tokens
+    entry_tokens = BUDGETS["summary_entry"] if entry_tokens is None else entry_tokens
+    kept, total = [], 0
+    for entry in entries:
+        entry = trim_text(entry, entry_tokens)
+        tokens = count_tokens(entry)
+        if kept and total + tokens > max_tokens:
+            break
+        kept.append(entry)
+        total += tokens
+    return kept
+
+
+def record(stage: str, original: Any, compressed: str) -> str:
+    """
+    Count one prompt part of `stage` before and after compression, and return the compressed text.
+    """
+    before = count_tokens(original if isinstance(original, str) else str(original))
+    after = count_tokens(compressed)
+    with _stats_lock:
+        stats = _stats[stage]
+        stats["calls"] += 1
+        stats["tokens_in"] += before
+        stats["tokens_out"] += after
+        stats["trimmed"] += after < before
+    return compressed
+
+
+def fit(stage: str, part: str, value: Any) -> str:
+    """
+    Compress one part ("description", "pitch", "resume", "questions", ...) of a
+    `stage` prompt to its budget, recording the sizes before and after.
+    """
+    if part == "resume":
+        compressed = resume_digest(value)
+    elif part == "questions":
+        compressed = compact_questions(value)
+        value = value.model_dump_json() if hasattr(value, "model_dump_json") else json.dumps(value)
+    else:
+        compressed = trim_text(value, BUDGETS[part])
+    return record(f"{stage}.{part}", value, compressed)
+
+
+def snapshot() -> Dict[str, Any]:
+    with _stats_lock:
+        stages = {stage: dict(stats) for stage, stats in _stats.items()}
+    for stats in stages.values():
+        stats["saved_pct"] = round(100 * (1 - stats["tokens_out"] / stats["tokens_in"]), 1) if stats["tokens_in"] else 0.0
+    return {
+        "tokenizer": TOKENIZER_ENCODING if _get_encoder() is not None else f"estimate ({CHARS_PER_TOKEN} chars/token)",
+        "budgets": dict(BUDGETS),
+        "stages": stages,
+    }
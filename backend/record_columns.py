@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from client_loop import CLIENT_DATA_DIR, RELEVANT_JOB_THRESHOLD, list_client_records
+from dashboard import summarize_record
+
+# CONSTANTS
+# Histograms are counted at this many bins per score point, which also sets the percentile resolution
+FINE_BINS_PER_POINT = 100
+ANALYTICS_DIR = os.path.join(CLIENT_DATA_DIR, "analytics")
+# Queries re-scan client_data for new records at most this often
+ANALYTICS_REFRESH_S = float(os.getenv("ANALYTICS_REFRESH_S", "30"))
+ANALYTICS_SAVE_INTERVAL_S = 60.0
+SCORE_RANGE = (0.0, 10.0)
+TREND_BUCKETS_S = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+MAX_TREND_BUCKETS = 5000
+UNKNOWN = -1
+
+COLUMN_DTYPES = {
+    "timestamp": np.float64,
+    "internal": np.float32,      # NaN when the record has no internal score
+    "company": np.float32,       # NaN when the company gave no feedback
+    "company_code": np.int32,    # index into `companies`, UNKNOWN for older records
+    "job_code": np.int32,        # index into `jobs`, UNKNOWN for older records
+}
+
+
+def record_key(path: str, data_dir: str) -> int:
+    relative = os.path.relpath(path, data_dir)
+    return int.from_bytes(hashlib.blake2b(relative.encode(), digest_size=8).digest(), "little")
+
+
+def _score(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+
+
+def _rate(numerator: int, denominator: int) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+def segment_sums(values: np.ndarray, bounds: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """
+    Sums of values[bounds[i]:bounds[i + 1]] for each i (0 for empty segments).
+    """
+    # A trailing zero keeps every start a valid index, even for empty segments at the end
+    padded = np.append(values, np.zeros(1, dtype=values.dtype))
+    sums = np.add.reduceat(padded, bounds[:-1], dtype=dtype)
+    sums[bounds[:-1] == bounds[1:]] = 0
+    return sums
+
+
+class RecordColumns:
+    """
+    The client's records compacted into NumPy columns sorted by timestamp, so
+    analytics queries are a binary search for the time window plus vectorized
+    passes over the slice instead of a JSON parse per record.
+
+    Company URLs and job ids are dictionary-encoded (int32 codes). `refresh()`
+    appends records it has not seen (tracked by a 64-bit hash of their path);
+    records are append-only logs, so deleted files are not removed. The
+    columns are saved to ANALYTICS_DIR and reloaded at startup.
+    """
+
+    def __init__(self, data_dir: str = CLIENT_DATA_DIR, directory: str = ANALYTICS_DIR):
+        self.data_dir = data_dir
+        self.directory = directory
+        self.columns_path = os.path.join(directory, "columns.npz")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        self.companies: List[str] = []
+        self.jobs: List[str] = []
+        self._company_codes: Dict[str, int] = {}
+        self._job_codes: Dict[str, int] = {}
+        self._seen = np.zeros(0, dtype=np.uint64)   # sorted record keys
+        # Records that could not be parsed (e.g. caught mid-write), by (mtime, size);
+        # they are retried once the file changes
+        self._unreadable: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        self._saved_at = 0.0
+        self._dirty = False
+        self._load()
+
+    # Storage
+    def _load(self):
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            with np.load(self.columns_path) as stored:
+                columns = {name: stored[name].astype(dtype, copy=False) for name, dtype in COLUMN_DTYPES.items()}
+                seen = stored["seen"]
+        except (OSError, ValueError, KeyError):
+            return
+        self.columns, self._seen = columns, seen
+        self.companies, self.jobs = meta.get("companies", []), meta.get("jobs", [])
+        self._company_codes = {company: code for code, company in enumerate(self.companies)}
+        self._job_codes = {job_id: code for code, job_id in enumerate(self.jobs)}
+
+    def _save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.columns_path + ".tmp.npz"
+        np.savez(tmp_path, seen=self._seen, **self.columns)
+        os.replace(tmp_path, self.columns_path)
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"companies": self.companies, "jobs": self.jobs}, f)
+        os.replace(tmp_path, self.meta_path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    # Ingest
+    def _code(self, value: Optional[str], codes: Dict[str, int], values: List[str]) -> int:
+        if not value:
+            return UNKNOWN
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, columns: Dict[str, np.ndarray], keys: np.ndarray):
+        """
+        Merge new rows (already encoded) into the columns, keeping them sorted by timestamp.
+        """
+        # Sort the (few) new rows, then insert them at their binary-searched
+        # positions: O(n) per column instead of re-sorting everything
+        order = np.argsort(columns["timestamp"], kind="stable")
+        positions = np.searchsorted(self.columns["timestamp"], columns["timestamp"][order], side="right")
+        merged = {name: np.insert(self.columns[name], positions, columns[name][order].astype(dtype, copy=False))
+                  for name, dtype in COLUMN_DTYPES.items()}
+        # Swap in whole arrays so concurrent queries see either the old or the new columns
+        self.columns = merged
+        keys = np.sort(keys.astype(np.uint64))
+        self._seen = np.insert(self._seen, np.searchsorted(self._seen, keys), keys)
+        self._dirty = True
+
+    def _unseen(self, keys: np.ndarray) -> np.ndarray:
+        if not self._seen.size:
+            return np.arange(keys.size)
+        positions = np.minimum(np.searchsorted(self._seen, keys), self._seen.size - 1)
+        return np.flatnonzero(self._seen[positions] != keys)
+
+    def refresh(self, max_age_s: float = 0.0) -> int:
+        """
+        Ingest records not seen yet (unless the last refresh is younger than
+        `max_age_s`) and return how many were added.
+        """
+        with self._lock:
+            if time.monotonic() - self._refreshed_at < max_age_s:
+                return 0
+            paths = list_client_records(self.data_dir)
+            keys = np.fromiter((record_key(path, self.data_dir) for path in paths), dtype=np.uint64, count=len(paths))
+            new = self._unseen(keys)
+
+            rows = {name: [] for name in COLUMN_DTYPES}
+            parsed = []
+            for index in new:
+                path = paths[index]
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if self._unreadable.get(path) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                summary = summarize_record(path)
+                if summary is None:
+                    self._unreadable[path] = (stat.st_mtime_ns, stat.st_size)
+                    continue
+                self._unreadable.pop(path, None)
+                parsed.append(index)
+                rows["timestamp"].append(summary.timestamp)
+                rows["internal"].append(_score(summary.internal_score))
+                rows["company"].append(_score(summary.company_score))
+                rows["company_code"].append(self._code(summary.company_url, self._company_codes, self.companies))
+                rows["job_code"].append(self._code(summary.job_id, self._job_codes, self.jobs))
+            if parsed:
+                self.append({name: np.asarray(values, dtype=COLUMN_DTYPES[name]) for name, values in rows.items()},
+                            keys[np.asarray(parsed, dtype=np.int64)])
+            if self._dirty and time.monotonic() - self._saved_at >= ANALYTICS_SAVE_INTERVAL_S:
+                self._save()
+            self._refreshed_at = time.monotonic()
+            return len(rows["timestamp"])
+
+    # Queries
+    def window(self, start_time: float, end_time: float, company_url: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        The columns for records with start_time <= timestamp <= end_time
+        (views, found by binary search), optionally for one company only.
+        """
+        columns = self.columns
+        timestamps = columns["timestamp"]
+        lo = np.searchsorted(timestamps, start_time, side="left")
+        hi = np.searchsorted(timestamps, end_time, side="right")
+        sliced = {name: column[lo:hi] for name, column in columns.items()}
+        if company_url is not None:
+            mask = sliced["company_code"] == self._company_codes.get(company_url, -2)
+            sliced = {name: column[mask] for name, column in sliced.items()}
+        return sliced
+
+    def histogram(self, start_time: float, end_time: float, score: str = "internal", bins: int = 10,
+                  company_url: Optional[str] = None) -> Dict[str, Any]:
+        values = self.window(start_time, end_time, company_url)[score]
+        values = values[~np.isnan(values)]
+        low, high = SCORE_RANGE
+        # One integer-binned pass at fine resolution (a multiple of `bins`); the requested
+        # bins and the percentiles both come from it, so nothing has to be sorted
+        per_bin = max(1, int(FINE_BINS_PER_POINT * (high - low)) // bins)
+        n_fine = bins * per_bin
+        index = np.clip(((values - low) * np.float32(n_fine / (high - low))).astype(np.int32), 0, n_fine - 1)
+        fine = np.bincount(index, minlength=n_fine)
+        counts = fine.reshape(bins, per_bin).sum(axis=1)
+        edges = np.linspace(low, high, bins + 1)
+        cumulative = np.cumsum(fine)
+        return {
+            "score": score,
+            "count": int(values.size),
+            "mean": round(float(values.mean(dtype=np.float64)), 3) if values.size else None,
+            "percentiles": {
+                f"p{q}": round(low + (np.searchsorted(cumulative, q / 100 * values.size) + 0.5) * (high - low) / n_fine, 2)
+                for q in (50, 90, 99)
+            } if values.size else {},
+            "bins": [{"low": round(float(low), 3), "high": round(float(high), 3), "count": int(count)}
+                     for low, high, count in zip(edges[:-1], edges[1:], counts)],
+        }
+
+    def funnel(self, start_time: float, end_time: float, top: int = 50) -> Dict[str, Any]:
+        """
+        Per-company conversion through the client pipeline's own stages:
+        evaluated -> relevant (internal score >= RELEVANT_JOB_THRESHOLD, pitched)
+        -> company feedback received -> approved (company score >= threshold, applied).
+        """
+        columns = self.window(start_time, end_time)
+        # Shift codes by one so UNKNOWN lands in bin 0
+        codes = columns["company_code"].astype(np.int64) + 1
+        n_bins = len(self.companies) + 1
+        with np.errstate(invalid="ignore"):
+            relevant = columns["internal"] >= RELEVANT_JOB_THRESHOLD
+            approved = columns["company"] >= RELEVANT_JOB_THRESHOLD
+        stages = {
+            "evaluated": np.bincount(codes, minlength=n_bins),
+            "relevant": np.bincount(codes, weights=relevant, minlength=n_bins).astype(np.int64),
+            "feedback": np.bincount(codes, weights=~np.isnan(columns["company"]), minlength=n_bins).astype(np.int64),
+            "approved": np.bincount(codes, weights=approved, minlength=n_bins).astype(np.int64),
+        }
+
+        def stage_row(counts: Dict[str, int]) -> Dict[str, Any]:
+            return {
+                **counts,
+                "relevance_rate": _rate(counts["relevant"], counts["evaluated"]),
+                "feedback_rate": _rate(counts["feedback"], counts["relevant"]),
+                "approval_rate": _rate(counts["approved"], counts["feedback"]),
+                "conversion_rate": _rate(counts["approved"], counts["evaluated"]),
+            }
+
+        order = np.argsort(-stages["evaluated"], kind="stable")
+        companies = []
+        for code in order[:top]:
+            if stages["evaluated"][code] == 0:
+                break
+            companies.append({
+                "company_url": self.companies[code - 1] if code else None,
+                **stage_row({stage: int(counts[code]) for stage, counts in stages.items()}),
+            })
+        return {
+            "total": stage_row({stage: int(counts.sum()) for stage, counts in stages.items()}),
+            "companies": companies,
+        }
+
+    def trends(self, start_time: float, end_time: float, bucket: str = "day",
+               company_url: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Records, mean scores and approvals per hour/day/week bucket of the window.
+        """
+        bucket_s = TREND_BUCKETS_S[bucket]
+        first = np.floor(start_time / bucket_s) * bucket_s
+        n_buckets = int((end_time - first) // bucket_s) + 1
+        if n_buckets > MAX_TREND_BUCKETS:
+            raise ValueError(f"Window spans {n_buckets} {bucket} buckets (at most {MAX_TREND_BUCKETS})")
+
+        columns = self.window(start_time, end_time, company_url)
+        # The slice is sorted by time, so each bucket is a contiguous run found by binary search
+        bounds = np.searchsorted(columns["timestamp"], first + np.arange(n_buckets + 1) * bucket_s, side="left")
+        records = np.diff(bounds)
+        series = {"records": records}
+        for score in ("internal", "company"):
+            values = columns[score]
+            present = ~np.isnan(values)
+            series[f"{score}_n"] = segment_sums(present, bounds, np.int64)
+            series[f"{score}_sum"] = segment_sums(np.where(present, values, np.float32(0)), bounds)
+        with np.errstate(invalid="ignore"):
+            series["approved"] = segment_sums(columns["company"] >= RELEVANT_JOB_THRESHOLD, bounds, np.int64)
+
+        return [
+            {
+                "start": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(first + i * bucket_s)),
+                "records": int(records[i]),
+                "mean_internal_score": round(float(series["internal_sum"][i] / series["internal_n"][i]), 3) if series["internal_n"][i] else None,
+                "mean_company_score": round(float(series["company_sum"][i] / series["company_n"][i]), 3) if series["company_n"][i] else None,
+                "approved": int(series["approved"][i]),
+            }
+            for i in range(n_buckets)
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        columns = self.columns
+        return {
+            "records": int(columns["timestamp"].size),
+            "companies": len(self.companies),
+            "jobs": len(self.jobs),
+            "bytes": int(sum(column.nbytes for column in columns.values()) + self._seen.nbytes),
+        }
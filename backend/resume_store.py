@@ -0,0 +1,113 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class ResumeConflictError(Exception):
+    """
+    Raised when a write's If-Match precondition does not match the current resume version.
+    """
+
+    def __init__(self, etag: str):
+        super().__init__(f"Resume has changed (current ETag {etag})")
+        self.etag = etag
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Compare an If-Match / If-None-Match header value against `etag`.
+    Handles lists of tags, weak validators and the `*` wildcard.
+    """
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResumeStore:
+    """
+    Serves the resume from an in-memory snapshot and funnels every write through
+    a single writer thread. The ETag is a digest of the content alone, so it is
+    the same across processes and restarts and dashboard edits can use optimistic
+    concurrency; `version` counts content changes seen by this process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = 0
+        self.etag = None
+        self._snapshot = None
+        self._mtime_ns = None
+        self._lock = asyncio.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resume-writer")
+
+    def _set_snapshot(self, data: dict, mtime_ns: int):
+        self._snapshot = data
+        self._mtime_ns = mtime_ns
+        etag = f'"{hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]}"'
+        if etag != self.etag:
+            self.version += 1
+            self.etag = etag
+
+    def _load_from_disk(self):
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        return data, os.stat(self.path).st_mtime_ns
+
+    def _write_to_disk(self, data: dict) -> int:
+        # Write to a temp file and swap it in so readers never see a partial resume
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        return os.stat(self.path).st_mtime_ns
+
+    def _is_current(self) -> bool:
+        return self._snapshot is not None and os.stat(self.path).st_mtime_ns == self._mtime_ns
+
+    async def _refresh(self):
+        # Pick up edits made outside this process (e.g. by hand) without re-parsing on
+        # every GET; callers hold `_lock`, so a reload never races an update's write
+        if self._is_current():
+            return
+        loop = asyncio.get_running_loop()
+        data, mtime_ns = await loop.run_in_executor(self._writer, self._load_from_disk)
+        self._set_snapshot(data, mtime_ns)
+
+    async def read(self) -> dict:
+        """
+        Return the current snapshot. Callers must treat it as read-only.
+        """
+        if not self._is_current():
+            async with self._lock:
+                await self._refresh()
+        return self._snapshot
+
+    async def update(self, mutate: Callable[[dict], None], if_match: Optional[str] = None) -> str:
+        """
+        Apply `mutate` to a copy of the resume and persist it, one writer at a time.
+        Returns the new ETag, or raises ResumeConflictError if `if_match` is stale.
+        """
+        async with self._lock:
+            await self._refresh()
+            if if_match and not etag_matches(if_match, self.etag):
+                raise ResumeConflictError(self.etag)
+
+            data = copy.deepcopy(self._snapshot)
+            mutate(data)
+
+            loop = asyncio.get_running_loop()
+            mtime_ns = await loop.run_in_executor(self._writer, self._write_to_disk, data)
+            self._set_snapshot(data, mtime_ns)
+            return self.etag
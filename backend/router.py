@@ -1,14 +1,138 @@
-from fastapi import FastAPI
-from typing import List
+from fastapi import FastAPI, Header, HTTPException, Response
+from typing import List, Optional
+from pydantic import BaseModel
+from diagnostics import install_loop_diagnostics
+from http_responses import install_compression
+from company_directory import CompanyDirectory
+from resume_store import etag_matches
+import asyncio
+import os
+import time
+import uuid
+
+import requests
 
 app = FastAPI()
 
-# DUMMY DATA 
+# gzip/brotli for large responses
+install_compression(app)
+
+# Opt-in event-loop lag monitor (LOOP_DIAGNOSTICS=1)
+install_loop_diagnostics(app)
+
+# DUMMY DATA
 COMPANY_SERVER_URL = "http://localhost:8002"
+# Comma-separated company server URLs, e.g. for local benchmarks
 router_companies = [
-    COMPANY_SERVER_URL
+    url.strip() for url in os.getenv("ROUTER_COMPANIES", COMPANY_SERVER_URL).split(",") if url.strip()
 ]
 
+# CONSTANTS
+# Comma-separated base URLs of peer routers whose directories are merged into this one
+ROUTER_PEERS = [url.strip().rstrip("/") for url in os.getenv("ROUTER_PEERS", "").split(",") if url.strip()]
+ROUTER_SYNC_INTERVAL_S = float(os.getenv("ROUTER_SYNC_INTERVAL_S", "10"))
+ROUTER_PEER_TIMEOUT_S = float(os.getenv("ROUTER_PEER_TIMEOUT_S", "5"))
+# A fresh id per process, so peers notice a restart (and its reset change feed)
+ROUTER_ID = os.getenv("ROUTER_ID") or f"router-{uuid.uuid4().hex[:8]}"
+
+directory = CompanyDirectory(ROUTER_ID)
+
+# Per peer: its router id, our cursor into its change feed and the last outcome
+peer_state = {
+    peer: {"router_id": None, "seq": 0, "pulls": 0, "changes": 0, "errors": 0, "last_sync": None, "last_error": None}
+    for peer in ROUTER_PEERS
+}
+background_tasks = []
+
+
+def fetch_changes(peer: str, since: int) -> dict:
+    r = requests.get(f"{peer}/directory/changes", params={"since": since}, timeout=ROUTER_PEER_TIMEOUT_S)
+    r.raise_for_status()
+    return r.json()
+
+
+async def pull_peer(peer: str):
+    state = peer_state[peer]
+    try:
+        delta = await asyncio.to_thread(fetch_changes, peer, state["seq"])
+        if state["router_id"] not in (None, delta["router_id"]) or delta["seq"] < state["seq"]:
+            # The peer restarted with a new change feed: read it from the start
+            delta = await asyncio.to_thread(fetch_changes, peer, 0)
+    except (requests.RequestException, ValueError, KeyError) as e:
+        state["errors"] += 1
+        state["last_error"] = f"{type(e).__name__}: {e}"
+        return
+    state["changes"] += directory.merge(delta["entries"])
+    state.update(router_id=delta["router_id"], seq=delta["seq"], last_sync=time.time(), last_error=None)
+    state["pulls"] += 1
+
+
+async def sync_peers():
+    while True:
+        await asyncio.sleep(ROUTER_SYNC_INTERVAL_S)
+        await asyncio.gather(*(pull_peer(peer) for peer in ROUTER_PEERS))
+
+
+@app.on_event("startup")
+async def start_peer_sync():
+    # The Lamport clock starts from zero after a restart. Catch up with the peers
+    # first so local writes (the seed list, then /companies/*) are versioned past
+    # everything they hold instead of losing to it; requests are only served
+    # once startup is done. Peers that are down now are merged by the sync loop.
+    await asyncio.gather(*(pull_peer(peer) for peer in ROUTER_PEERS))
+    for url in router_companies:
+        directory.register(url)
+    if ROUTER_PEERS:
+        background_tasks.append(asyncio.create_task(sync_peers()))
+
+
+@app.on_event("shutdown")
+async def stop_peer_sync():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+
 @app.get("/companies/get", response_model=List[str])
-def get_items():
-    return router_companies
\ No newline at end of file
+async def get_items(if_none_match: Optional[str] = Header(None)):
+    """
+    The merged company list, served from memory. Send the last ETag as
+    If-None-Match to get a 304 when the directory has not changed.
+    """
+    seq, body, etag = directory.encoded_companies()
+    headers = {"ETag": etag, "X-Directory-Version": str(seq), "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+class CompanyRegistration(BaseModel):
+    url: str
+
+
+@app.post("/companies/register")
+async def register_company(company: CompanyRegistration):
+    changed = directory.register(company.url)
+    return {"url": company.url, "changed": changed, "version": directory.seq}
+
+
+@app.post("/companies/unregister")
+async def unregister_company(company: CompanyRegistration):
+    if company.url.rstrip("/") not in directory.companies():
+        raise HTTPException(status_code=404, detail="Unknown company")
+    directory.unregister(company.url)
+    return {"url": company.url, "changed": True, "version": directory.seq}
+
+
+@app.get("/directory/changes", response_model=dict)
+async def get_directory_changes(since: int = 0):
+    """
+    Entries changed after this router's change sequence `since` (tombstones
+    included), plus the current sequence to use as the next cursor.
+    """
+    return directory.changes_since(since)
+
+
+@app.get("/directory/status", response_model=dict)
+async def get_directory_status():
+    return {**directory.snapshot(), "peers": peer_state}
@@ -0,0 +1,177 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from prompt_budget import count_tokens
+
+# CONSTANTS
+# Every agent run is appended to RUN_LOG_DIR/runs-<date>-<pid>.jsonl (RUN_LOG=0 turns recording off)
+RUN_LOG_ENABLED = os.getenv("RUN_LOG", "1") != "0"
+RUN_LOG_DIR = os.getenv("RUN_LOG_DIR", "run_logs")
+RUN_LOG_FORMAT_VERSION = 1
+
+
+def prompt_hash(agent: str, prompt: str, candidate: str = "") -> str:
+    """
+    Replay key of one run: the agent, the candidate its tools read from, and the prompt.
+    """
+    return hashlib.sha256(f"{agent}:{candidate}:{prompt}".encode()).hexdigest()[:32]
+
+
+def context_candidate(context: Any) -> str:
+    return getattr(context, "candidate_id", "") or ""
+
+
+def encode_output(output: Any) -> Any:
+    if isinstance(output, BaseModel):
+        return output.model_dump(mode="json")
+    return output
+
+
+def decode_output(output: Any, output_type: Any) -> Any:
+    if isinstance(output_type, type) and issubclass(output_type, BaseModel) and output is not None:
+        return output_type.model_validate(output)
+    return output
+
+
+def result_usage(result: Any, prompt: str, output: Any) -> Dict[str, Any]:
+    """
+    Token usage reported by an agents SDK run result, or an estimate from
+    the prompt and output text when the backend reports none.
+    """
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    if usage is not None and getattr(usage, "total_tokens", 0):
+        return {
+            "requests": usage.requests,
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "total_tokens": usage.total_tokens,
+        }
+    text = output if isinstance(output, str) else json.dumps(encode_output(output))
+    input_tokens, output_tokens = count_tokens(prompt), count_tokens(text or "")
+    return {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens, "estimated": True}
+
+
+class RunRecorder:
+    """
+    Append-only JSONL log of agent runs, one file per process and day so
+    concurrent workers never interleave writes. Each line records the agent,
+    prompt hash, output (or error), latency and token usage; the prompt text
+    is written only the first time its hash appears in a file. Lines are
+    encoded and written by a single writer thread, so `record` never blocks
+    the event loop on disk.
+    """
+
+    def __init__(self, log_dir: str = RUN_LOG_DIR):
+        self.log_dir = log_dir
+        self.records = 0
+        self.bytes = 0
+        self._path: Optional[str] = None
+        self._file = None
+        self._prompts_written = set()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-log-writer")
+
+    def _current_file(self):
+        path = os.path.join(self.log_dir, f"runs-{time.strftime('%Y%m%d')}-{os.getpid()}.jsonl")
+        if path != self._path:
+            if self._file is not None:
+                self._file.close()
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._path = path
+            self._file = open(path, "a", encoding="utf-8")
+            self._prompts_written = set()
+        return self._file
+
+    def record(self, backend: str, agent: str, prompt: str, context: Any, latency_ms: float,
+               output: Any = None, result: Any = None, error: Optional[BaseException] = None):
+        self._writer.submit(self._write, round(time.time(), 3), backend, agent, prompt, context, latency_ms,
+                            output, result, error)
+
+    def _write(self, ts: float, backend: str, agent: str, prompt: str, context: Any, latency_ms: float,
+               output: Any, result: Any, error: Optional[BaseException]):
+        try:
+            key = prompt_hash(agent, prompt, context_candidate(context))
+            entry = {
+                "v": RUN_LOG_FORMAT_VERSION,
+                "ts": ts,
+                "backend": backend,
+                "agent": agent,
+                "prompt_hash": key,
+                "candidate": context_candidate(context) or None,
+                "latency_ms": round(latency_ms, 1),
+            }
+            if error is None:
+                entry["output"] = encode_output(output)
+                entry["usage"] = result_usage(result, prompt, output)
+            else:
+                entry["error"] = f"{type(error).__name__}: {error}"
+                entry["status_code"] = getattr(error, "status_code", None)
+
+            f = self._current_file()
+            if key not in self._prompts_written:
+                entry["prompt"] = prompt
+                self._prompts_written.add(key)
+            line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+            f.write(line)
+            f.flush()
+        except Exception as e:
+            # Nobody awaits the writer, so a bad entry is reported here rather than lost
+            print(f"Failed to record agent run: {e}")
+            return
+        self.records += 1
+        self.bytes += len(line)
+
+    def flush(self):
+        # Wait for every run recorded so far to reach the log
+        self._writer.submit(lambda: None).result()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"enabled": True, "path": self._path, "records": self.records, "bytes": self.bytes}
+
+
+def run_log_paths(source: str) -> List[str]:
+    """
+    Log files named by `source`: a file, a directory of *.jsonl logs, or a glob.
+    """
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.jsonl")))
+    if os.path.isfile(source):
+        return [source]
+    return sorted(glob.glob(source))
+
+
+def read_runs(paths: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    """
+    Recorded runs in file order, each with its prompt text restored when the log has it.
+    """
+    for path in paths:
+        prompts = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a process that was killed mid-write
+                    continue
+                if "prompt" in entry:
+                    prompts[entry["prompt_hash"]] = entry["prompt"]
+                else:
+                    entry["prompt"] = prompts.get(entry["prompt_hash"])
+                yield entry
+
+
+_recorder: Optional[RunRecorder] = None
+
+
+def get_recorder() -> Optional[RunRecorder]:
+    global _recorder
+    if _recorder is None and RUN_LOG_ENABLED:
+        _recorder = RunRecorder()
+    return _recorder
@@ -1,12 +1,16 @@
 # server.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, List, Union
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from job_utils import get_job_data, job_exists, create_job, delete_job, update_job
-from agents import Agent, Runner, trace
-from dotenv import load_dotenv
+from typing import Dict, List, Optional, Tuple, Union
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, ValidationError
+from job_utils import JOB_FIELDS, get_job_data, get_job_ids, job_exists, create_job, create_jobs, delete_job, update_job
+from agent_registry import RATING_AGENT_INSTRUCTIONS, SERVER_AGENTS, SKILLS_AGENT_INSTRUCTIONS
+from model_backend import StreamDelta, StreamFinal, load_settings, run_agent, run_log_snapshot, stream_agent
+from llm_scheduler import INTERACTIVE, get_scheduler
+import asyncio
+import hashlib
 import json
 import os 
 from models import *
@@ -15,17 +19,59 @@ import time
 import random
 from pathlib import Path
 from collections import Counter
+from diagnostics import install_loop_diagnostics, run_blocking
+from http_responses import FastJSONResponse, dumps, install_compression
+from job_text_index import FIELDS as TEXT_INDEX_FIELDS, JobTextIndex, QuerySyntaxError
+from job_vector_index import JobVectorIndex
+from text_vectors import flatten_text
+from utils import sse_event
+from ticket_queue import FINISHED_STATES, QueueFullError, TicketQueue
+from admission import AdmissionGate, AdmissionRejected
+import prompt_budget
+from shared_state import SharedState, claim_worker_slot
+from application_stats import ApplicationStats
 
 # CONSTANTS
 TURNS = 2
 APPLICATIONS_FOLDER = "applications"
 SERVER_CONVERSATION_DATA = "server_data/conversations"
-
-# 1) Load .env to get OPENAI_API_KEY
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise EnvironmentError("Please set the OPENAI_API_KEY environment variable (e.g. in a .env file).")
+JOBS_FOLDER = "test_data/jobs"
+JOB_INDEX_DIR = "server_data/job_index"
+JOB_TEXT_INDEX_DIR = "server_data/job_text_index"
+# State shared by all uvicorn workers on this host (see shared_state.py)
+SHARED_STATE_PATH = "server_data/shared_state.db"
+WORKER_LOCK_DIR = "server_data/workers"
+CATALOG_POLL_S = float(os.getenv("CATALOG_POLL_S", "1.0"))
+CATALOG_RESYNC_S = float(os.getenv("CATALOG_RESYNC_S", "60"))
+# 0 disables the shared feedback cache
+FEEDBACK_CACHE_TTL_S = float(os.getenv("FEEDBACK_CACHE_TTL_S", "3600"))
+FEEDBACK_CLAIM_STALE_S = 120.0
+FEEDBACK_CLAIM_POLL_S = 0.1
+SHARED_TICKET_POLL_S = 0.25
+MAX_SEARCH_K = 200
+MAX_QUERY_LIMIT = 100
+FEEDBACK_WORKERS = int(os.getenv("FEEDBACK_WORKERS", "4"))
+FEEDBACK_QUEUE_DEPTH = int(os.getenv("FEEDBACK_QUEUE_DEPTH", "100"))
+FEEDBACK_TICKET_TTL_S = float(os.getenv("FEEDBACK_TICKET_TTL_S", "600"))
+MAX_LONG_POLL_S = 30.0
+# Jobs per write batch (catalog transaction and index update) in POST /jobs/bulk
+BULK_BATCH_JOBS = int(os.getenv("BULK_BATCH_JOBS", "500"))
+MAX_BULK_LINE_BYTES = 1024 * 1024
+MAX_BULK_ERRORS = 100
+EXPORT_PAGE_JOBS = 1000
+SSE_KEEPALIVE_S = 15.0
+# Keep proxies from caching or buffering event streams
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Admission control for the endpoints that start model calls: requests beyond
+# the in-flight limit wait in a bounded queue, and are shed with a 503 when it
+# is full or they waited longer than ADMISSION_QUEUE_TIMEOUT_S
+FEEDBACK_MAX_IN_FLIGHT = int(os.getenv("FEEDBACK_MAX_IN_FLIGHT", "8"))
+FEEDBACK_MAX_QUEUED = int(os.getenv("FEEDBACK_MAX_QUEUED", "16"))
+RATINGS_MAX_IN_FLIGHT = int(os.getenv("RATINGS_MAX_IN_FLIGHT", "4"))
+RATINGS_MAX_QUEUED = int(os.getenv("RATINGS_MAX_QUEUED", "8"))
+SKILLS_MAX_IN_FLIGHT = int(os.getenv("SKILLS_MAX_IN_FLIGHT", "2"))
+SKILLS_MAX_QUEUED = int(os.getenv("SKILLS_MAX_QUEUED", "4"))
+ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_S", "5"))
 
 app = FastAPI()
 
@@ -37,19 +83,158 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for large responses
+install_compression(app)
+
+# Opt-in event-loop lag monitor (LOOP_DIAGNOSTICS=1)
+install_loop_diagnostics(app)
+
+@app.on_event("startup")
+async def prepare_agents():
+    # Fail fast on a missing OPENAI_API_KEY, then import the agents SDK and build
+    # the server agents in the background so the worker starts serving immediately
+    backend = load_settings()
+    asyncio.create_task(run_blocking(backend.warm, SERVER_AGENTS))
+
+# Long-running loops stopped before the indexes they touch are closed
+background_tasks = []
+
+@app.on_event("startup")
+async def open_job_index():
+    # Reconcile the shared catalog and this worker's job indexes with the job
+    # folders without delaying startup, then follow other workers' writes
+    seen_version = await run_blocking(shared_state.catalog_version)
+    asyncio.create_task(run_blocking(shared_state.sync_catalog, JOBS_FOLDER))
+    asyncio.create_task(run_blocking(job_index.sync, JOBS_FOLDER))
+    asyncio.create_task(run_blocking(job_text_index.sync, JOBS_FOLDER))
+    background_tasks.append(asyncio.create_task(follow_shared_catalog(seen_version)))
+    asyncio.create_task(run_blocking(application_stats.sync, APPLICATIONS_FOLDER))
+
+@app.on_event("shutdown")
+async def close_job_index():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await run_blocking(job_index.flush)
+    await run_blocking(job_text_index.close)
+
+@app.get("/diagnostics/llm", response_model=dict)
+async def get_llm_scheduler_stats():
+    return get_scheduler().snapshot()
+
+@app.get("/diagnostics/prompts", response_model=dict)
+async def get_prompt_budget_stats():
+    return prompt_budget.snapshot()
+
+@app.get("/diagnostics/runs", response_model=dict)
+async def get_run_log_stats():
+    return run_log_snapshot()
+
+@app.get("/diagnostics/admission", response_model=dict)
+async def get_admission_stats():
+    return {gate.name: gate.snapshot() for gate in (feedback_gate, ratings_gate, skills_gate)}
+
+@app.get("/diagnostics/shared", response_model=dict)
+async def get_shared_state_stats():
+    return {"worker_slot": WORKER_SLOT, **await run_blocking(shared_state.snapshot)}
+
+
+# ------------------- JOB INDEXES -------------------
+
+shared_state = SharedState(SHARED_STATE_PATH)
+application_stats = ApplicationStats(SHARED_STATE_PATH)
+
+# Each worker process keeps its own copy of the job indexes, in a directory
+# tied to a host-wide worker slot so a restarted worker picks its files back up
+WORKER_SLOT = claim_worker_slot(WORKER_LOCK_DIR)
+
+def worker_dir(directory: str) -> str:
+    return directory if WORKER_SLOT == 0 else f"{directory}-{WORKER_SLOT}"
+
+job_index = JobVectorIndex(worker_dir(JOB_INDEX_DIR))
+job_text_index = JobTextIndex(worker_dir(JOB_TEXT_INDEX_DIR))
+
+def _refresh_indexes(job_id: str, folder: str):
+    # Folders need not be named after the job id, which is the one in questions.json
+    description_path = os.path.join(JOBS_FOLDER, folder, "description.txt")
+    questions_path = os.path.join(JOBS_FOLDER, folder, "questions.json")
+    try:
+        with open(description_path, "r") as f:
+            description = f.read()
+        with open(questions_path, "r") as f:
+            questions = json.load(f)
+        description_mtime = os.stat(description_path).st_mtime
+        questions_mtime = os.stat(questions_path).st_mtime
+    except FileNotFoundError:
+        return
+    job_index.upsert(job_id, description, description_mtime, folder)
+    job_text_index.upsert(job_id, description, questions, max(description_mtime, questions_mtime), folder)
+
+def _drop_from_indexes(job_id: str):
+    job_index.remove(job_id)
+    job_text_index.remove(job_id)
+
+def _on_job_changed(job_id: str, folder: str):
+    """
+    Publish a created or updated job (stored in JOBS_FOLDER/`folder`) to the
+    shared catalog and refresh this worker's indexes.
+    """
+    shared_state.refresh_job(JOBS_FOLDER, folder)
+    _refresh_indexes(job_id, folder)
+
+def _on_job_removed(job_id: str):
+    shared_state.remove_job(job_id)
+    _drop_from_indexes(job_id)
+
+def _apply_catalog_changes(changes):
+    for job_id, deleted in changes:
+        if deleted:
+            _drop_from_indexes(job_id)
+            continue
+        folder = shared_state.job_folder(job_id)
+        if folder is not None:
+            _refresh_indexes(job_id, folder)
+
+async def follow_shared_catalog(seen_version: int):
+    """
+    Apply jobs written by other workers to this worker's indexes, periodically
+    re-scan the job folders for out-of-band edits, and expire cached entries.
+    """
+    while True:
+        await asyncio.sleep(CATALOG_POLL_S)
+        try:
+            seen_version, changes = await run_blocking(shared_state.changes_since, seen_version)
+            if changes:
+                await run_blocking(_apply_catalog_changes, changes)
+            if shared_state.ready.is_set():
+                # A no-op when any worker already re-scanned within the interval
+                await run_blocking(shared_state.sync_catalog, JOBS_FOLDER, CATALOG_RESYNC_S)
+            if FEEDBACK_CACHE_TTL_S > 0:
+                await run_blocking(shared_state.expire_feedback, FEEDBACK_CACHE_TTL_S)
+            await run_blocking(shared_state.expire_tickets, FEEDBACK_TICKET_TTL_S)
+        except Exception as e:
+            print(f"Failed to follow the shared catalog: {e!r}")
+
+
+# ------------------- ADMISSION CONTROL -------------------
+
+# Per worker process; each gate bounds one endpoint's concurrent requests
+feedback_gate = AdmissionGate("feedback", FEEDBACK_MAX_IN_FLIGHT, FEEDBACK_MAX_QUEUED, ADMISSION_QUEUE_TIMEOUT_S)
+ratings_gate = AdmissionGate("ratings", RATINGS_MAX_IN_FLIGHT, RATINGS_MAX_QUEUED, ADMISSION_QUEUE_TIMEOUT_S)
+skills_gate = AdmissionGate("skills", SKILLS_MAX_IN_FLIGHT, SKILLS_MAX_QUEUED, ADMISSION_QUEUE_TIMEOUT_S)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, e: AdmissionRejected):
+    # Shed requests get the same body an HTTPException would, plus when to retry
+    return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": str(e.retry_after)})
+
 
-# Job Relevancy Evaluation objects
-class CompanyCandiateRelevancyEvaluation(BaseModel):
-    score: float
-    candidate_pros: List[str]
-    candidate_cons: List[str]
-    
 class FeedbackRequest(BaseModel):
     description: str
     candidate_pitch: str
     candidate_resume: dict
 
-async def log_data(job_description: str, candidate_pitch: str, company_feedback: dict):
+def _write_conversation_record(job_description: str, candidate_pitch: str, company_feedback: dict):
     current_time = str(time.time())
 
     #TODO: Add in the application information, to see what questions are most useful questions commonly being asked?
@@ -65,16 +250,37 @@ async def log_data(job_description: str, candidate_pitch: str, company_feedback:
         }
         json.dump(data, f)
 
+async def log_data(job_description: str, candidate_pitch: str, company_feedback: dict):
+    await run_blocking(_write_conversation_record, job_description, candidate_pitch, company_feedback)
 
-@app.get("/jobs/get", response_model=List[dict])
-def list_jobs():
-    return get_job_data()
 
-@app.post("/jobs/feedback", response_model=CompanyCandiateRelevancyEvaluation)
-async def get_feedback(payload: FeedbackRequest):
-    description = payload.description
-    candidate_pitch = payload.candidate_pitch
-    candidate_resume = str(payload.candidate_resume)
+def parse_fields(fields: Union[str, None]):
+    if not fields:
+        return JOB_FIELDS
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in JOB_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"fields must be a comma-separated subset of {', '.join(JOB_FIELDS)}")
+    return requested
+
+@app.get("/jobs/get", response_model=List[dict])
+async def list_jobs(fields: Union[str, None] = None):
+    """
+    Every job, optionally projected with `?fields=id,questions`. Served from
+    the shared catalog (re-encoded only when it changes); until its first sync
+    finishes, only the files backing the requested fields are read.
+    """
+    fields = parse_fields(fields)
+    if shared_state.ready.is_set():
+        body = await run_blocking(shared_state.encoded_jobs, fields, dumps)
+        return Response(body, media_type="application/json")
+    jobs = await run_blocking(get_job_data, JOBS_FOLDER, fields)
+    return FastJSONResponse(jobs)
+
+def feedback_prompt(payload: FeedbackRequest) -> str:
+    description = prompt_budget.fit("feedback", "description", payload.description)
+    candidate_pitch = prompt_budget.fit("feedback", "pitch", payload.candidate_pitch)
+    candidate_resume = prompt_budget.fit("feedback", "resume", payload.candidate_resume)
 
     ### SERVER SIDE
     COMPANY_INTERNAL_REVIEW_PROMPT = f"""
@@ -93,52 +299,296 @@ async def get_feedback(payload: FeedbackRequest):
         Internally evaluate whether the candiate would be a good fit for the job description, and for the company. Come up with reasons for why this candidate would be able to perform the responsibilities highlighted in the description, and potential drawbacks. Then, provide a rating on a scale of 1-10 on why the candidate may be a good fit, with 10 being the best, and 0 being absolutely underqualified. 
     
     """
+    return COMPANY_INTERNAL_REVIEW_PROMPT
 
-    # Initialize the server agent
-    server_agent = Agent(
-            name=f"server-agent",
-            instructions="You are Sammy, a human resources agent that works with clients and representatives to identify good fits for prospective hires.",
-            tools=[],
-            output_type=CompanyCandiateRelevancyEvaluation
-    )
+async def claim_cached_feedback(key: str):
+    """
+    The cached evaluation for `key` (waiting while another worker computes it),
+    or None once this caller holds the claim and should run the model itself.
+    """
+    while True:
+        status, result = await run_blocking(shared_state.claim_feedback, key, FEEDBACK_CLAIM_STALE_S)
+        if status != "pending":
+            return result
+        deadline = time.monotonic() + FEEDBACK_CLAIM_STALE_S
+        while time.monotonic() < deadline:
+            await asyncio.sleep(FEEDBACK_CLAIM_POLL_S)
+            present, result = await run_blocking(shared_state.get_feedback, key)
+            if result is not None:
+                return result
+            if not present:
+                break  # the other call failed and released its claim
+
+async def evaluate_feedback(payload: FeedbackRequest) -> CompanyCandidateRelevancyEvaluation:
+    prompt = feedback_prompt(payload)
+    key = hashlib.sha256(prompt.encode()).hexdigest() if FEEDBACK_CACHE_TTL_S > 0 else None
+    cached = await claim_cached_feedback(key) if key else None
+    if cached is not None:
+        evaluation = CompanyCandidateRelevancyEvaluation.model_validate(cached)
+    else:
+        try:
+            company_response = await run_agent(
+                "server-feedback",
+                prompt,
+                max_turns=TURNS,
+            )
+        except BaseException:
+            if key:
+                await run_blocking(shared_state.release_feedback, key)
+            raise
+
+        print("GOT COMPANY RESPONSE", company_response)
+        evaluation = company_response.final_output
+        if key:
+            await run_blocking(shared_state.put_feedback, key, evaluation.model_dump())
+
+    await log_data(payload.description, payload.candidate_pitch, evaluation.model_dump())
+    return evaluation
+
+@app.post("/jobs/feedback/stream")
+async def stream_feedback(payload: FeedbackRequest, request: Request):
+    """
+    Server-sent events version of /jobs/feedback: `started` right away, `delta`
+    events carrying the evaluation's partial JSON as the model produces it,
+    then `result` (the validated evaluation) or `error`. Shares the
+    /jobs/feedback admission limit for as long as the stream is open.
+    """
+    permit = await feedback_gate.acquire()
+
+    async def events():
+        yield sse_event("started", {})
+        try:
+            async for event in stream_agent("server-feedback", feedback_prompt(payload), max_turns=TURNS, priority=INTERACTIVE):
+                if isinstance(event, StreamDelta):
+                    if event.text:
+                        yield sse_event("delta", {"text": event.text})
+                elif isinstance(event, StreamFinal):
+                    await log_data(payload.description, payload.candidate_pitch, event.output.model_dump())
+                    yield sse_event("result", event.output.model_dump())
+                if await request.is_disconnected():
+                    return
+        except Exception as e:
+            yield sse_event("error", {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            permit.release()
+
+    # The background task releases the slot if the stream never started
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS,
+                             background=BackgroundTask(permit.release))
+
+async def publish_ticket(ticket):
+    # Lets any worker answer polls for a ticket queued on this one
+    await run_blocking(shared_state.put_ticket, ticket.id, ticket.version, _ticket_body(ticket))
+
+# Evaluations for `POST /jobs/feedback?mode=async`, drained by a fixed worker pool
+feedback_queue = TicketQueue(FEEDBACK_WORKERS, FEEDBACK_QUEUE_DEPTH, FEEDBACK_TICKET_TTL_S, on_change=publish_ticket)
+
+@app.on_event("startup")
+async def start_feedback_workers():
+    feedback_queue.start()
+
+@app.on_event("shutdown")
+async def stop_feedback_workers():
+    await feedback_queue.stop()
+
+def _ticket_body(ticket) -> dict:
+    return ticket.to_dict(lambda result: result.model_dump())
+
+@app.post("/jobs/feedback", response_model=CompanyCandidateRelevancyEvaluation)
+async def get_feedback(payload: FeedbackRequest, mode: str = "sync"):
+    """
+    Evaluate a candidate pitch. With `mode=async` the evaluation is queued and
+    a 202 with a ticket is returned immediately; collect the result from
+    /jobs/feedback/tickets/{ticket_id} (optionally with ?wait=) or its /events stream.
+    Sync requests beyond the admission limit get a 503 with Retry-After.
+    """
+    if mode == "sync":
+        async with feedback_gate.admit():
+            return await evaluate_feedback(payload)
+    if mode != "async":
+        raise HTTPException(status_code=400, detail="mode must be 'sync' or 'async'")
 
-    company_response = await Runner.run(
-        server_agent,
-        COMPANY_INTERNAL_REVIEW_PROMPT,
-        max_turns=TURNS,
+    try:
+        ticket = feedback_queue.submit(lambda: evaluate_feedback(payload))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    await publish_ticket(ticket)
+
+    poll_url = f"/jobs/feedback/tickets/{ticket.id}"
+    return JSONResponse(
+        status_code=202,
+        content={**_ticket_body(ticket), "poll_url": poll_url, "events_url": f"{poll_url}/events"},
+        headers={"Location": poll_url},
     )
-    
-    print("GOT COMPANY RESPONSE", company_response)
-    
-    await log_data(description, candidate_pitch, company_response.final_output.model_dump())
-    return company_response.final_output
 
-@app.post("/jobs/apply")
-async def apply_to_job(payload: JobApplicationSubmission):
-    
+@app.get("/jobs/feedback/tickets/{ticket_id}", response_model=dict)
+async def get_feedback_ticket(ticket_id: str, wait: float = 0.0):
+    """
+    Ticket status and, once done, the evaluation. `wait` (seconds) long-polls
+    until the ticket finishes or the wait elapses.
+    """
+    ticket = feedback_queue.get(ticket_id)
+    if ticket is None:
+        # Queued on another worker: follow its published state instead
+        body = None
+        async for body in shared_ticket_updates(ticket_id, min(max(wait, 0.0), MAX_LONG_POLL_S)):
+            pass
+        if body is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired ticket")
+        return body
+    if wait > 0:
+        await feedback_queue.wait(ticket, min(wait, MAX_LONG_POLL_S))
+    return _ticket_body(ticket)
+
+async def shared_ticket_updates(ticket_id: str, timeout: float):
+    """
+    Yield a ticket's published state each time it changes, until it finishes or `timeout` elapses.
+    """
+    deadline = time.monotonic() + timeout
+    seen = None
+    while True:
+        body = await run_blocking(shared_state.get_ticket, ticket_id)
+        if body is None:
+            return
+        if body != seen:
+            seen = body
+            yield body
+        if body["status"] in FINISHED_STATES or time.monotonic() >= deadline:
+            return
+        await asyncio.sleep(SHARED_TICKET_POLL_S)
+
+@app.get("/jobs/feedback/tickets/{ticket_id}/events")
+async def stream_feedback_ticket(ticket_id: str, request: Request):
+    """
+    Server-sent events: one `status` event per state change, ending with `result` or `error`.
+    """
+    ticket = feedback_queue.get(ticket_id)
+    if ticket is None:
+        if await run_blocking(shared_state.get_ticket, ticket_id) is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired ticket")
+        return StreamingResponse(shared_ticket_events(ticket_id, request), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    async def events():
+        seen = -1
+        while True:
+            if ticket.version != seen:
+                seen = ticket.version
+                body = _ticket_body(ticket)
+                if ticket.status in FINISHED_STATES:
+                    yield sse_event("result" if ticket.error is None else "error", body)
+                    return
+                yield sse_event("status", body)
+            if await request.is_disconnected():
+                return
+            if not await feedback_queue.wait_for_change(ticket, seen, SSE_KEEPALIVE_S):
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def shared_ticket_events(ticket_id: str, request: Request):
+    while not await request.is_disconnected():
+        async for body in shared_ticket_updates(ticket_id, SSE_KEEPALIVE_S):
+            if body["status"] in FINISHED_STATES:
+                yield sse_event("result" if body["error"] is None else "error", body)
+                return
+            yield sse_event("status", body)
+        yield ": keep-alive\n\n"
+
+@app.get("/jobs/feedback/queue", response_model=dict)
+async def get_feedback_queue_stats():
+    return feedback_queue.snapshot()
+
+def save_application(payload: JobApplicationSubmission) -> bool:
     # Verify that the job exists
-    if not job_exists(payload.job_id):
-        return {"status" : "failure"}
+    exists = shared_state.job_exists(payload.job_id) if shared_state.ready.is_set() else job_exists(payload.job_id)
+    if not exists:
+        return False
 
     applications_save_path = os.path.join(APPLICATIONS_FOLDER, payload.job_id)
     os.makedirs(applications_save_path, exist_ok = True)
 
     app_id = str(uuid.uuid4())
+    response = payload.response.model_dump()
     with open(os.path.join(applications_save_path, f"app-{app_id}.json"), "w") as f:
-        json.dump(payload.response.model_dump(), f)
+        json.dump(response, f)
+
+    application_stats.record(payload.job_id, app_id, response["responses"])
+    return True
+
+@app.post("/jobs/apply")
+async def apply_to_job(payload: JobApplicationSubmission):
+    if not await run_blocking(save_application, payload):
+        return {"status" : "failure"}
 
     return {"status" : "success"}
 
 @app.get("/jobs/ids", response_model=List[str])
-def list_job_ids():
+async def list_job_ids():
     """
     Return a list of all available job IDs.
     """
-    job_data = get_job_data()
-    e = [job.get("id", f"unknown-{i}") for i, job in enumerate(job_data)]
-    print(e)
-    return e
+    if shared_state.ready.is_set():
+        body = await run_blocking(shared_state.encoded_jobs, ("id",), lambda jobs: dumps([job["id"] for job in jobs]), "ids")
+        return Response(body, media_type="application/json")
+    return FastJSONResponse(await run_blocking(get_job_ids, JOBS_FOLDER))
+
+
+def parse_since(days: Union[int, None]):
+    if days is None:
+        return None
+    if days <= 0:
+        raise HTTPException(status_code=400, detail="days must be positive")
+    return time.time() - days * 86400
+
+def _require_application_stats():
+    if not application_stats.ready.is_set():
+        raise HTTPException(status_code=503, detail="Application statistics are still being built", headers={"Retry-After": "5"})
+
+@app.get("/jobs/{job_id}/applications/stats", response_model=dict)
+async def get_job_application_stats(job_id: str, days: Union[int, None] = None):
+    """
+    Application statistics for one job without any model calls: submissions
+    per day (limited to the last `days` if given), the share of applications
+    answering every question, and per question the completion rate, mean
+    response length and a response-length histogram.
+    """
+    _require_application_stats()
+    stats = await run_blocking(application_stats.job_stats, job_id, parse_since(days))
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No applications found for this job")
+    return FastJSONResponse(stats)
+
+@app.get("/applications/stats", response_model=dict)
+async def get_application_stats(days: Union[int, None] = None, top_jobs: int = 20, top_questions: int = 50):
+    """
+    Catalog-wide application statistics: submissions per day, completion
+    rate, the jobs with the most applications and the most common questions.
+    """
+    _require_application_stats()
+    stats = await run_blocking(application_stats.catalog_stats, parse_since(days),
+                               max(1, min(top_jobs, 1000)), max(1, min(top_questions, 1000)))
+    return FastJSONResponse(stats)
+
+def _job_application_files(job_id: str) -> Optional[List[Path]]:
+    # None when the job has no applications folder
+    job_folder = Path(APPLICATIONS_FOLDER) / job_id
+    if not job_folder.is_dir():
+        return None
+    return sorted(job_folder.glob("app-*.json"))
+
+def _first_application_files(limit: int) -> Optional[List[Path]]:
+    # None when the applications folder itself is missing
+    base = Path(APPLICATIONS_FOLDER)
+    if not base.exists():
+        return None
+    return [
+        p for job_dir in base.iterdir() if job_dir.is_dir()
+        for p in job_dir.glob("app-*.json")
+    ][:limit]
 
+def _read_application(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
 
 @app.get("/jobs/{job_id}/ratings", response_model=dict)
 async def get_job_rating_distribution(job_id: str):
@@ -146,54 +596,47 @@ async def get_job_rating_distribution(job_id: str):
     Use an AI agent to rate each candidate (1–10) for the given job,
     and return the distribution of those ratings.
     """
-    job_folder = Path(APPLICATIONS_FOLDER) / job_id
-    if not job_folder.exists() or not job_folder.is_dir():
-        raise HTTPException(status_code=404, detail="Job ID not found")
-
     # find all application JSONs
-    app_files = sorted(job_folder.glob("app-*.json"))
+    app_files = await run_blocking(_job_application_files, job_id)
+    if app_files is None:
+        raise HTTPException(status_code=404, detail="Job ID not found")
     if not app_files:
         raise HTTPException(status_code=404, detail="No applications found for this job")
 
     # initialize empty distribution
     dist = {str(i): 0 for i in range(1, 11)}
 
-    # for each application, ask an AI agent to assign a 1–10 rating
-    for app_path in app_files[:3]:
-        with open(app_path) as f:
-            candidate = json.load(f)
-
-        # build a prompt from their Q&A responses
-        qa_lines = "\n".join(
-            f"{item['question']}: {item['response']}"
-            for item in candidate.get("responses", [])
-        )
-        instructions = (
-            "You are a hiring committee member. "
-            "Read the candidate's responses and assign an integer rating from 1 (poor) to 10 (excellent) "
-            "based on their demonstrated skills, clarity, and fit for the role. "
-            "Respond with just the number."
-        )
-        full_prompt = f"{instructions}\n\nCandidate responses:\n{qa_lines}\n\nRating:"
-
-        agent = Agent(
-            name="rating-agent",
-            instructions=instructions,
-            tools=[],
-            output_type=int  # or a custom Pydantic model that parses an int
-        )
-        result = await Runner.run(agent, full_prompt, max_turns=1)
-        raw_rating = result.final_output  # should be an int 1–10
-
-        # clamp & record
-        rating = max(1, min(10, int(raw_rating)))
-        dist[str(rating)] += 1
-
-        print("returning", job_id, dist)
-        return {
-            "job_id": job_id,
-            "rating_distribution": dist
-        }
+    async with ratings_gate.admit():
+        # for each application, ask an AI agent to assign a 1–10 rating
+        for app_path in app_files[:3]:
+            # Ratings are cached across workers, keyed by application file
+            rating = await run_blocking(shared_state.get_rating, job_id, app_path.name)
+            if rating is not None:
+                dist[str(rating)] += 1
+                continue
+
+            candidate = await run_blocking(_read_application, app_path)
+
+            # build a prompt from their Q&A responses
+            qa_lines = "\n".join(
+                f"{item['question']}: {item['response']}"
+                for item in candidate.get("responses", [])
+            )
+            full_prompt = f"{RATING_AGENT_INSTRUCTIONS}\n\nCandidate responses:\n{qa_lines}\n\nRating:"
+
+            result = await run_agent("rating", full_prompt, max_turns=1, priority=INTERACTIVE)
+            raw_rating = result.final_output  # should be an int 1–10
+
+            # clamp & record
+            rating = max(1, min(10, int(raw_rating)))
+            await run_blocking(shared_state.put_rating, job_id, app_path.name, rating)
+            dist[str(rating)] += 1
+
+    print("returning", job_id, dist)
+    return {
+        "job_id": job_id,
+        "rating_distribution": dist
+    }
 
 @app.get("/skills/top", response_model=List[str])
 async def get_top_skills(n_top: int = 5):
@@ -202,51 +645,34 @@ async def get_top_skills(n_top: int = 5):
     ask an AI agent to pull out the candidate’s key skills,
     then return the top `n_top` most‐common skills.
     """
-    base = Path(APPLICATIONS_FOLDER)
-    if not base.exists():
-        raise HTTPException(status_code=500, detail="Applications directory not found")
-
     # gather all app json files
-    app_files = [
-        p for job_dir in base.iterdir() if job_dir.is_dir()
-        for p in job_dir.glob("app-*.json")
-    ][:3]
+    app_files = await run_blocking(_first_application_files, 3)
+    if app_files is None:
+        raise HTTPException(status_code=500, detail="Applications directory not found")
     if not app_files:
         raise HTTPException(status_code=404, detail="No applications found")
 
     counter = Counter()
 
-    # for each application, extract skills via AI
-    for path in app_files:
-        with open(path) as f:
-            candidate = json.load(f)
-
-        # combine all Q&A into one block
-        qa_text = "\n".join(
-            f"{item['question']}: {item['response']}"
-            for item in candidate.get("responses", [])
-        )
-
-        instructions = (
-            "You are a hiring analyst. "
-            "From the following candidate responses, extract the list of distinct skills "
-            "(both technical and soft) that the candidate demonstrates or mentions. "
-            "Respond with a JSON array of skill strings."
-        )
-        prompt = f"{instructions}\n\n{qa_text}\n\nSkills:"
-
-        agent = Agent(
-            name="skills-extractor",
-            instructions=instructions,
-            tools=[],
-            output_type=List[str]  # expects a Python list of strings
-        )
-        run = await Runner.run(agent, prompt, max_turns=1)
-        skills: List[str] = run.final_output
-
-        # update frequency counts
-        for skill in skills:
-            counter[skill.strip()] += 1
+    async with skills_gate.admit():
+        # for each application, extract skills via AI
+        for path in app_files:
+            candidate = await run_blocking(_read_application, path)
+
+            # combine all Q&A into one block
+            qa_text = "\n".join(
+                f"{item['question']}: {item['response']}"
+                for item in candidate.get("responses", [])
+            )
+
+            prompt = f"{SKILLS_AGENT_INSTRUCTIONS}\n\n{qa_text}\n\nSkills:"
+
+            run = await run_agent("skills", prompt, max_turns=1, priority=INTERACTIVE)
+            skills: List[str] = run.final_output
+
+            # update frequency counts
+            for skill in skills:
+                counter[skill.strip()] += 1
 
     # pick the top n_top skills
     top_skills = [skill for skill, _ in counter.most_common(n_top)]
@@ -262,19 +688,141 @@ async def create_new_job(payload: JobCreateRequest):
     Create a new job by saving its description and questions to disk.
     """
     try:
-        job_id = create_job(payload.description, payload.questions)
+        job_id = await run_blocking(create_job, payload.description, payload.questions)
+        # New jobs are written to a folder named after their id
+        await run_blocking(_on_job_changed, job_id, job_id)
         return {"status": "success", "job_id": job_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create job: {str(e)}")
 
+def parse_bulk_line(line: bytes) -> Tuple[str, dict]:
+    payload = JobCreateRequest.model_validate_json(line)
+    JobApplicationQuestions.model_validate(payload.questions)
+    job_id = payload.questions.get("id")
+    if job_id is not None and (not isinstance(job_id, str) or job_id in ("", ".", "..") or os.path.basename(job_id) != job_id):
+        raise ValueError(f"invalid job id {job_id!r}")
+    return payload.description, payload.questions
+
+def _bulk_error(line_number: int, e: ValueError) -> dict:
+    if isinstance(e, ValidationError):
+        message = "; ".join(f"{'.'.join(map(str, error['loc'])) or 'line'}: {error['msg']}" for error in e.errors()[:3])
+    else:
+        message = str(e)
+    return {"line": line_number, "error": message}
+
+def _import_jobs(batch: List[Tuple[str, dict]]) -> int:
+    """
+    Write one bulk batch, then publish it with a single catalog transaction
+    and a single update of each job index.
+    """
+    written = create_jobs(batch, JOBS_FOLDER)
+    shared_state.put_jobs([
+        (job_id, job_id, description, encoded_questions, max(description_mtime, questions_mtime))
+        for (description, _), (job_id, encoded_questions, description_mtime, questions_mtime) in zip(batch, written)
+    ])
+    job_index.upsert_many([
+        (job_id, description, description_mtime)
+        for (description, _), (job_id, _, description_mtime, _) in zip(batch, written)
+    ])
+    job_text_index.upsert_many([
+        (job_id, description, questions, max(description_mtime, questions_mtime))
+        for (description, questions), (job_id, _, description_mtime, questions_mtime) in zip(batch, written)
+    ])
+    return len(written)
+
+@app.post("/jobs/bulk", response_model=dict)
+async def bulk_import_jobs(request: Request):
+    """
+    Create (or overwrite, when `questions.id` matches) jobs from an NDJSON
+    body with one /jobs/create payload per line. The body is parsed as it
+    streams in and written in batches of BULK_BATCH_JOBS, so memory stays flat
+    however large the import. Invalid lines are skipped and reported.
+    """
+    if not (job_index.ready.is_set() and job_text_index.ready.is_set()):
+        raise HTTPException(status_code=503, detail="Job indexes are still building", headers={"Retry-After": "5"})
+
+    report = {"imported": 0, "rejected": 0, "batches": 0, "errors": []}
+    batch: List[Tuple[str, dict]] = []
+    line_number = 0
+    # The previous batch is written while the next one is received and parsed
+    writing = None
+
+    async def add(line: bytes):
+        nonlocal line_number
+        line_number += 1
+        if not line.strip():
+            return
+        try:
+            batch.append(parse_bulk_line(line))
+        except ValueError as e:
+            report["rejected"] += 1
+            if len(report["errors"]) < MAX_BULK_ERRORS:
+                report["errors"].append(_bulk_error(line_number, e))
+            return
+        if len(batch) >= BULK_BATCH_JOBS:
+            await flush()
+
+    async def flush():
+        nonlocal writing
+        await finish_write()
+        writing = asyncio.ensure_future(run_blocking(_import_jobs, list(batch)))
+        batch.clear()
+
+    async def finish_write():
+        nonlocal writing
+        if writing is not None:
+            report["imported"] += await writing
+            report["batches"] += 1
+            writing = None
+
+    pending = b""
+    try:
+        async for chunk in request.stream():
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            if len(pending) > MAX_BULK_LINE_BYTES:
+                raise HTTPException(status_code=413, detail=f"Line {line_number + 1} exceeds {MAX_BULK_LINE_BYTES} bytes")
+            for line in lines:
+                await add(line)
+        await add(pending)
+        if batch:
+            await flush()
+    finally:
+        # Batches already accepted are written even if the upload is cut short
+        await finish_write()
+    return FastJSONResponse(report)
+
+@app.get("/jobs/export")
+async def export_jobs():
+    """
+    Stream every job as NDJSON in the /jobs/bulk format. Pages through the
+    shared catalog by job id, so memory stays flat; jobs changed while the
+    export runs may or may not be included.
+    """
+    if not shared_state.ready.is_set():
+        raise HTTPException(status_code=503, detail="Job catalog is still syncing", headers={"Retry-After": "5"})
+
+    async def lines():
+        after_id = ""
+        while True:
+            page = await run_blocking(shared_state.jobs_page, after_id, EXPORT_PAGE_JOBS)
+            if not page:
+                return
+            yield b"".join(dumps({"description": description, "questions": json.loads(questions)}) + b"\n"
+                           for _, description, questions in page)
+            after_id = page[-1][0]
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @app.delete("/jobs/{job_id}")
 async def remove_job(job_id: str):
     """
     Delete a job and its associated files.
     """
-    success = delete_job(job_id)
+    success = await run_blocking(delete_job, job_id)
     if not success:
         raise HTTPException(status_code=404, detail="Job not found")
+    await run_blocking(_on_job_removed, job_id)
     return {"status": "success", "job_id": job_id}
 
 class JobUpdateRequest(BaseModel):
@@ -289,12 +837,64 @@ async def update_existing_job(job_id: str, payload: JobUpdateRequest):
     if not payload.description and not payload.questions:
         raise HTTPException(status_code=400, detail="No update fields provided")
 
-    updated = update_job(job_id, new_description=payload.description, new_questions=payload.questions)
-    if not updated:
+    folder = await run_blocking(update_job, job_id, new_description=payload.description, new_questions=payload.questions)
+    if folder is None:
         raise HTTPException(status_code=404, detail="Job not found or update failed")
+    await run_blocking(_on_job_changed, job_id, folder)
 
     return {"status": "success", "job_id": job_id}
 
+class JobSearchRequest(BaseModel):
+    query: Union[str, None] = None
+    resume: Union[dict, None] = None
+    k: int = 20
+
+class JobSearchResult(BaseModel):
+    id: str
+    score: float
+
+@app.post("/jobs/search", response_model=List[JobSearchResult])
+async def search_jobs(payload: JobSearchRequest):
+    """
+    Rank jobs by similarity to free text and/or a resume, using the local vector index.
+    """
+    if not payload.query and not payload.resume:
+        raise HTTPException(status_code=400, detail="Provide a query and/or a resume")
+    if not job_index.ready.is_set():
+        raise HTTPException(status_code=503, detail="Job index is still building", headers={"Retry-After": "5"})
+
+    text = " ".join(filter(None, [payload.query, flatten_text(payload.resume) if payload.resume else None]))
+    k = max(1, min(payload.k, MAX_SEARCH_K))
+    results = await run_blocking(job_index.search, text, k)
+    return [JobSearchResult(id=job_id, score=round(score, 4)) for job_id, score in results]
+
+@app.get("/jobs/query", response_model=dict)
+async def query_jobs(q: str, field: str = "all", offset: int = 0, limit: int = 20):
+    """
+    Boolean full-text search over job descriptions and questions, e.g.
+    `rust AND (distributed OR "systems programming") -java`. Newest jobs first.
+    """
+    if field != "all" and field not in TEXT_INDEX_FIELDS:
+        raise HTTPException(status_code=400, detail=f"field must be one of: all, {', '.join(TEXT_INDEX_FIELDS)}")
+    if not job_text_index.ready.is_set():
+        raise HTTPException(status_code=503, detail="Job text index is still building", headers={"Retry-After": "5"})
+
+    fields = TEXT_INDEX_FIELDS if field == "all" else (field,)
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_QUERY_LIMIT))
+    try:
+        total, job_ids = await run_blocking(job_text_index.query, q, fields, offset, limit)
+    except QuerySyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid query: {e}")
+
+    return {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < total else None,
+        "job_ids": job_ids,
+    }
+
 ROUTERS_CONFIG_PATH = "routers_server.json"  # change this if needed
 
 @app.get("/routers", response_model=List[str])
@@ -0,0 +1,422 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# fcntl is POSIX-only; elsewhere every process gets slot 0
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+from job_utils import JOB_FIELDS
+
+# CONSTANTS
+BUSY_TIMEOUT_MS = 10000
+SYNC_BATCH_ROWS = 500
+MAX_WORKER_SLOTS = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    folder TEXT,
+    description TEXT,
+    questions TEXT,
+    mtime REAL NOT NULL,
+    version INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_version ON jobs (version);
+CREATE TABLE IF NOT EXISTS feedback_cache (
+    key TEXT PRIMARY KEY,
+    result TEXT,
+    claimed REAL NOT NULL,
+    created REAL
+);
+CREATE TABLE IF NOT EXISTS ratings (
+    job_id TEXT NOT NULL,
+    application TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (job_id, application)
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def claim_worker_slot(lock_dir: str) -> int:
+    """
+    Claim the lowest free worker slot on this host by holding an exclusive
+    lock on `slot-N.lock` for the life of the process. Restarted workers get
+    the same slots back, so per-worker files (like the job indexes) are reused.
+    """
+    if fcntl is None:
+        return 0
+    os.makedirs(lock_dir, exist_ok=True)
+    for slot in range(MAX_WORKER_SLOTS):
+        handle = open(os.path.join(lock_dir, f"slot-{slot}.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            continue
+        _held_slot_locks.append(handle)  # released by the OS when the process exits
+        return slot
+    raise RuntimeError(f"All {MAX_WORKER_SLOTS} worker slots under {lock_dir} are taken")
+
+
+_held_slot_locks = []
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    An autocommit connection in WAL mode; group writes with `WriteTransaction`.
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def _read_job_folder(job_folder: str) -> Optional[Tuple[str, str, str, float]]:
+    # (job id, description, questions JSON, mtime); the id is the one in questions.json
+    description_path = os.path.join(job_folder, "description.txt")
+    questions_path = os.path.join(job_folder, "questions.json")
+    try:
+        mtime = max(os.stat(description_path).st_mtime, os.stat(questions_path).st_mtime)
+        with open(description_path, "r") as f:
+            description = f.read()
+        with open(questions_path, "r") as f:
+            questions = f.read()
+        job_id = json.loads(questions)["id"]
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Skipping job folder {job_folder} without a valid questions.json id: {e!r}")
+        return None
+    return job_id, description, questions, mtime
+
+
+class SharedState:
+    """
+    State shared by every worker process of a company server on one host,
+    kept in a SQLite database in WAL mode (readers never block the writer):
+
+      * the job catalog, mirrored from the job folders and versioned so each
+        worker can cheaply tell whether its in-memory copy is stale and which
+        jobs changed since it last looked
+      * cached company feedback, claimed before the model call so concurrent
+        identical requests on different workers share one call
+      * cached application ratings and async feedback tickets
+
+    Connections are per thread; SQLite serializes writers across processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ready = threading.Event()
+        self._local = threading.local()
+        self._memo_lock = threading.Lock()
+        self._memo: Dict[Tuple[str, ...], Tuple[int, bytes]] = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if "folder" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                # Databases from before jobs were keyed by their questions.json id; the next sync re-keys them
+                conn.execute("ALTER TABLE jobs ADD COLUMN folder TEXT")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('catalog_version', 0)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('synced_at', 0)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def _write(self):
+        return WriteTransaction(self._connect())
+
+    # Catalog
+    def catalog_version(self) -> int:
+        return self._connect().execute("SELECT value FROM meta WHERE key = 'catalog_version'").fetchone()[0]
+
+    def _bump_version(self, conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalog_version'")
+        return conn.execute("SELECT value FROM meta WHERE key = 'catalog_version'").fetchone()[0]
+
+    def sync_catalog(self, job_folders: str, min_interval_s: float = 0.0) -> int:
+        """
+        Reconcile the catalog with the job folders (new, modified and removed
+        jobs) and return the number of changed rows. Skipped when another
+        worker synced within `min_interval_s`.
+        """
+        conn = self._connect()
+        synced_at = conn.execute("SELECT value FROM meta WHERE key = 'synced_at'").fetchone()[0]
+        if min_interval_s and time.time() - synced_at < min_interval_s:
+            self.ready.set()
+            return 0
+
+        # Rows are keyed by the id in questions.json; `folder` is where that job's files live
+        live = conn.execute("SELECT id, folder, mtime FROM jobs WHERE deleted = 0").fetchall()
+        known = {folder: (job_id, mtime) for job_id, folder, mtime in live if folder is not None}
+        on_disk = set()
+        changed = []
+        if os.path.isdir(job_folders):
+            for entry in os.scandir(job_folders):
+                on_disk.add(entry.name)
+                try:
+                    mtime = max(os.stat(os.path.join(entry.path, name)).st_mtime
+                                for name in ("description.txt", "questions.json"))
+                except OSError:
+                    on_disk.discard(entry.name)
+                    continue
+                if known.get(entry.name, (None, None))[1] != mtime:
+                    changed.append(entry.name)
+
+        n_changed = 0
+        stored = set()
+        replaced = set()
+        for start in range(0, len(changed), SYNC_BATCH_ROWS):
+            rows = []
+            for folder in changed[start:start + SYNC_BATCH_ROWS]:
+                job = _read_job_folder(os.path.join(job_folders, folder))
+                if job is None:
+                    continue
+                rows.append((job[0], folder, *job[1:]))
+                stored.add(job[0])
+                previous = known.get(folder)
+                if previous is not None and previous[0] != job[0]:
+                    replaced.add(previous[0])
+            n_changed += self._put_jobs(rows)
+
+        removed = [job_id for job_id, folder, _ in live if job_id not in stored
+                   and (job_id in replaced or folder is None
+                        or (folder not in on_disk and not os.path.isdir(os.path.join(job_folders, folder))))]
+        if removed:
+            with self._write() as conn:
+                version = self._bump_version(conn)
+                conn.executemany("UPDATE jobs SET deleted = 1, description = NULL, questions = NULL, version = ? WHERE id = ?",
+                                 [(version, job_id) for job_id in removed])
+            n_changed += len(removed)
+
+        with self._write() as conn:
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'synced_at'", (int(time.time()),))
+        self.ready.set()
+        return n_changed
+
+    def _put_jobs(self, rows: List[Tuple[str, str, str, str, float]]) -> int:
+        if not rows:
+            return 0
+        with self._write() as conn:
+            # Re-check inside the write lock: another worker may have stored the same files already
+            current = {
+                job_id: (folder, mtime) for job_id, folder, mtime in conn.execute(
+                    f"SELECT id, folder, mtime FROM jobs WHERE deleted = 0 AND id IN ({','.join('?' * len(rows))})",
+                    [row[0] for row in rows])
+            }
+            rows = [row for row in rows if current.get(row[0]) != (row[1], row[4])]
+            if not rows:
+                return 0
+            version = self._bump_version(conn)
+            conn.executemany(
+                "INSERT INTO jobs (id, folder, description, questions, mtime, version, deleted) VALUES (?, ?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT(id) DO UPDATE SET folder = excluded.folder, description = excluded.description, "
+                "questions = excluded.questions, mtime = excluded.mtime, version = excluded.version, deleted = 0",
+                [(job_id, folder, description, questions, mtime, version)
+                 for job_id, folder, description, questions, mtime in rows],
+            )
+        return len(rows)
+
+    def refresh_job(self, job_folders: str, folder: str) -> bool:
+        """
+        Store the files in `folder` after a create or update; False if the folder is gone.
+        """
+        job = _read_job_folder(os.path.join(job_folders, folder))
+        if job is None:
+            return False
+        self._put_jobs([(job[0], folder, *job[1:])])
+        return True
+
+    def put_jobs(self, rows: List[Tuple[str, str, str, str, float]]) -> int:
+        """
+        Store a batch of freshly written jobs, as (job id, folder, description,
+        questions JSON, mtime) rows, under one catalog version bump.
+        """
+        return self._put_jobs(rows)
+
+    def job_folder(self, job_id: str) -> Optional[str]:
+        """
+        The folder (under the job folders) holding the live job `job_id`, if any.
+        """
+        row = self._connect().execute("SELECT folder FROM jobs WHERE id = ? AND deleted = 0", (job_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def remove_job(self, job_id: str):
+        with self._write() as conn:
+            version = self._bump_version(conn)
+            conn.execute("UPDATE jobs SET deleted = 1, description = NULL, questions = NULL, version = ? WHERE id = ?",
+                         (version, job_id))
+
+    def job_exists(self, job_id: str) -> bool:
+        return self._connect().execute("SELECT 1 FROM jobs WHERE id = ? AND deleted = 0", (job_id,)).fetchone() is not None
+
+    def list_jobs(self, fields: Iterable[str] = JOB_FIELDS) -> List[dict]:
+        fields = set(fields)
+        columns = ["id"] + [field for field in ("description", "questions") if field in fields]
+        jobs = []
+        for row in self._connect().execute(f"SELECT {', '.join(columns)} FROM jobs WHERE deleted = 0 ORDER BY id"):
+            job = {}
+            if "description" in fields:
+                job["description"] = row[1]
+            if "questions" in fields:
+                job["questions"] = json.loads(row[-1])
+            if "id" in fields:
+                job["id"] = row[0]
+            jobs.append(job)
+        return jobs
+
+    def jobs_page(self, after_id: str, limit: int) -> List[Tuple[str, str, str]]:
+        """
+        Up to `limit` live (id, description, questions JSON) rows with ids after
+        `after_id`, in id order: a keyset cursor for walking the whole catalog.
+        """
+        return self._connect().execute(
+            "SELECT id, description, questions FROM jobs WHERE deleted = 0 AND id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)).fetchall()
+
+    def encoded_jobs(self, fields: Tuple[str, ...], encode, name: str = "jobs") -> bytes:
+        """
+        `encode(list_jobs(fields))`, memoized in this process (under `name`)
+        until the catalog version changes.
+        """
+        version = self.catalog_version()
+        with self._memo_lock:
+            cached = self._memo.get((name, *fields))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        body = encode(self.list_jobs(fields))
+        with self._memo_lock:
+            self._memo[(name, *fields)] = (version, body)
+        return body
+
+    def changes_since(self, version: int) -> Tuple[int, List[Tuple[str, bool]]]:
+        """
+        The current catalog version and the (job id, deleted) pairs written after `version`.
+        """
+        conn = self._connect()
+        current = self.catalog_version()
+        if current == version:
+            return current, []
+        rows = conn.execute("SELECT id, deleted FROM jobs WHERE version > ?", (version,)).fetchall()
+        return current, [(job_id, bool(deleted)) for job_id, deleted in rows]
+
+    # Feedback cache
+    def claim_feedback(self, key: str, stale_after_s: float) -> Tuple[str, Optional[dict]]:
+        """
+        ("hit", result) when a finished evaluation is cached, ("claimed", None)
+        when this caller should run it, ("pending", None) while another worker is.
+        A claim older than `stale_after_s` is taken over.
+        """
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute("SELECT result, claimed FROM feedback_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] is not None:
+                return "hit", json.loads(row[0])
+            if row is not None and now - row[1] < stale_after_s:
+                return "pending", None
+            conn.execute("INSERT OR REPLACE INTO feedback_cache (key, result, claimed, created) VALUES (?, NULL, ?, NULL)",
+                         (key, now))
+        return "claimed", None
+
+    def get_feedback(self, key: str) -> Tuple[bool, Optional[dict]]:
+        """
+        (still claimed or cached, result if finished).
+        """
+        row = self._connect().execute("SELECT result FROM feedback_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0]) if row[0] is not None else None
+
+    def put_feedback(self, key: str, result: dict):
+        with self._write() as conn:
+            conn.execute("INSERT OR REPLACE INTO feedback_cache (key, result, claimed, created) VALUES (?, ?, ?, ?)",
+                         (key, json.dumps(result), time.time(), time.time()))
+
+    def release_feedback(self, key: str):
+        with self._write() as conn:
+            conn.execute("DELETE FROM feedback_cache WHERE key = ? AND result IS NULL", (key,))
+
+    def expire_feedback(self, ttl_s: float) -> int:
+        with self._write() as conn:
+            return conn.execute("DELETE FROM feedback_cache WHERE created IS NOT NULL AND created < ?",
+                                (time.time() - ttl_s,)).rowcount
+
+    # Ratings
+    def get_rating(self, job_id: str, application: str) -> Optional[int]:
+        row = self._connect().execute("SELECT rating FROM ratings WHERE job_id = ? AND application = ?",
+                                      (job_id, application)).fetchone()
+        return row[0] if row else None
+
+    def put_rating(self, job_id: str, application: str, rating: int):
+        with self._write() as conn:
+            conn.execute("INSERT OR REPLACE INTO ratings VALUES (?, ?, ?, ?)", (job_id, application, rating, time.time()))
+
+    # Tickets
+    def put_ticket(self, ticket_id: str, version: int, body: dict):
+        # Writes can land out of order from the thread pool; never replace a newer state
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO tickets VALUES (?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET version = excluded.version, "
+                "body = excluded.body, updated = excluded.updated WHERE excluded.version > tickets.version",
+                (ticket_id, version, json.dumps(body), time.time()),
+            )
+
+    def get_ticket(self, ticket_id: str) -> Optional[dict]:
+        row = self._connect().execute("SELECT body FROM tickets WHERE id = ?", (ticket_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def expire_tickets(self, ttl_s: float) -> int:
+        with self._write() as conn:
+            return conn.execute("DELETE FROM tickets WHERE updated < ?", (time.time() - ttl_s,)).rowcount
+
+    def snapshot(self) -> Dict[str, Any]:
+        conn = self._connect()
+        count = lambda sql: conn.execute(sql).fetchone()[0]  # noqa: E731
+        return {
+            "path": self.path,
+            "pid": os.getpid(),
+            "catalog_ready": self.ready.is_set(),
+            "catalog_version": self.catalog_version(),
+            "jobs": count("SELECT COUNT(*) FROM jobs WHERE deleted = 0"),
+            "feedback_cached": count("SELECT COUNT(*) FROM feedback_cache WHERE result IS NOT NULL"),
+            "feedback_in_flight": count("SELECT COUNT(*) FROM feedback_cache WHERE result IS NULL"),
+            "ratings_cached": count("SELECT COUNT(*) FROM ratings"),
+            "tickets": count("SELECT COUNT(*) FROM tickets"),
+        }
+
+
+class WriteTransaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error): takes the database write
+    lock up front so read-then-write sequences cannot interleave across processes.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
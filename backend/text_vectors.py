@@ -0,0 +1,93 @@
+import re
+import zlib
+from functools import lru_cache
+from typing import Any, Iterable, List
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to we will with "
+    "you your who what which how can all any about into us they them he she his her not but if than then".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def flatten_text(obj: Any) -> str:
+    """
+    Concatenate every string inside a (nested) JSON-like object, e.g. a resume.
+    """
+    if isinstance(obj, str):
+        return obj
+    if isinstance(obj, dict):
+        return " ".join(flatten_text(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return " ".join(flatten_text(value) for value in obj)
+    return ""
+
+
+@lru_cache(maxsize=200_000)
+def _bucket(token: str, n_features: int):
+    # crc32 is stable across processes, unlike hash(); the top bit picks the sign
+    h = zlib.crc32(token.encode())
+    return h % n_features, 1.0 if h & 0x80000000 else -1.0
+
+
+class HashingVectorizer:
+    """
+    Signed feature-hashing vectorizer with log term frequencies and L2
+    normalisation, so the dot product of two rows is their cosine similarity.
+    Needs no fitted vocabulary, so job and resume vectors can be built independently.
+    """
+
+    def __init__(self, n_features: int = 2048, dtype=np.float32):
+        self.n_features = n_features
+        self.dtype = dtype
+
+    def transform_one(self, text: str, out: np.ndarray = None) -> np.ndarray:
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for token in tokenize(text):
+            index, sign = _bucket(token, self.n_features)
+            vector[index] += sign
+        # Dampen repeated terms so one keyword-stuffed paragraph cannot dominate
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        if out is not None:
+            out[:] = vector
+            return out
+        return vector.astype(self.dtype, copy=False)
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        texts = list(texts)
+        matrix = np.zeros((len(texts), self.n_features), dtype=self.dtype)
+        for row, text in enumerate(texts):
+            self.transform_one(text, out=matrix[row])
+        return matrix
+
+
+def top_k_per_column(scores: np.ndarray, k: int, min_score: float = float("-inf")) -> List[List[int]]:
+    """
+    For each column of `scores` (rows x columns), the row indices of the `k`
+    best scores at or above `min_score`, best first.
+    """
+    n_rows = scores.shape[0]
+    k = min(k, n_rows)
+    if k <= 0:
+        return [[] for _ in range(scores.shape[1])]
+
+    # argpartition finds the top k per column in O(rows); only those k get sorted
+    if k < n_rows:
+        top = np.argpartition(-scores, k - 1, axis=0)[:k]
+    else:
+        top = np.tile(np.arange(n_rows)[:, None], (1, scores.shape[1]))
+    selected = []
+    for column in range(scores.shape[1]):
+        rows = top[:, column]
+        rows = rows[np.argsort(-scores[rows, column], kind="stable")]
+        selected.append([int(row) for row in rows if scores[row, column] >= min_score])
+    return selected
@@ -0,0 +1,191 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from diagnostics import MAX_SAMPLES, percentiles
+
+# Ticket states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (DONE, FAILED)
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class Ticket:
+    """
+    One unit of queued work. `version` increases on every state change so
+    waiters can tell whether anything happened since they last looked.
+    """
+
+    def __init__(self, job: Callable[[], Awaitable[Any]]):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.version = 0
+        self.created = time.monotonic()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.job = job
+
+    @property
+    def queue_wait_ms(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return round((self.started - self.created) * 1000, 3)
+
+    @property
+    def processing_ms(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return round((self.finished - self.started) * 1000, 3)
+
+    def to_dict(self, result_encoder: Callable[[Any], Any] = lambda result: result) -> Dict[str, Any]:
+        return {
+            "ticket_id": self.id,
+            "status": self.status,
+            "queue_wait_ms": self.queue_wait_ms,
+            "processing_ms": self.processing_ms,
+            "result": result_encoder(self.result) if self.status == DONE else None,
+            "error": self.error,
+        }
+
+
+class TicketQueue:
+    """
+    Bounded work queue drained by a fixed pool of asyncio workers. `submit`
+    returns a ticket immediately (or raises QueueFullError when `max_depth`
+    tickets are already waiting); callers poll, long-poll with `wait`, or
+    follow changes with `wait_for_change`. Finished tickets are kept for
+    `ttl_s` so late pollers can still collect them. `on_change`, if given, is
+    awaited after every state change (e.g. to publish the ticket elsewhere).
+    """
+
+    def __init__(self, workers: int, max_depth: int, ttl_s: float,
+                 on_change: Optional[Callable[[Ticket], Awaitable[None]]] = None):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.ttl_s = ttl_s
+        self.on_change = on_change
+        self.tickets: "OrderedDict[str, Ticket]" = OrderedDict()
+        self.stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0}
+        self.queue_wait_ms = deque(maxlen=MAX_SAMPLES)
+        self.processing_ms = deque(maxlen=MAX_SAMPLES)
+        self._queue: Optional[asyncio.Queue] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._tasks = []
+        self.running = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._changed = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _purge(self):
+        # Tickets are ordered by creation, and none can finish before it was created,
+        # so the scan stops at the first ticket younger than the TTL
+        now = time.monotonic()
+        expired = []
+        for ticket_id, ticket in self.tickets.items():
+            if now - ticket.created < self.ttl_s:
+                break
+            if ticket.finished is not None and now - ticket.finished >= self.ttl_s:
+                expired.append(ticket_id)
+        for ticket_id in expired:
+            del self.tickets[ticket_id]
+
+    async def _notify(self, ticket: Ticket, status: str):
+        ticket.status = status
+        ticket.version += 1
+        async with self._changed:
+            self._changed.notify_all()
+        if self.on_change is not None:
+            try:
+                await self.on_change(ticket)
+            except Exception as e:
+                print(f"Ticket {ticket.id} change hook failed: {e!r}")
+
+    async def _worker(self):
+        while True:
+            ticket = await self._queue.get()
+            ticket.started = time.monotonic()
+            self.running += 1
+            self.queue_wait_ms.append(ticket.queue_wait_ms)
+            await self._notify(ticket, RUNNING)
+            try:
+                ticket.result = await ticket.job()
+                status = DONE
+            except Exception as e:
+                ticket.error = f"{type(e).__name__}: {e}"
+                status = FAILED
+            finally:
+                ticket.finished = time.monotonic()
+                ticket.job = None  # release the payload
+                self.running -= 1
+                self._queue.task_done()
+            self.processing_ms.append(ticket.processing_ms)
+            self.stats[status] += 1
+            await self._notify(ticket, status)
+
+    def submit(self, job: Callable[[], Awaitable[Any]]) -> Ticket:
+        self._purge()
+        ticket = Ticket(job)
+        try:
+            self._queue.put_nowait(ticket)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"Queue is full ({self.max_depth} waiting)")
+        self.tickets[ticket.id] = ticket
+        self.stats["submitted"] += 1
+        return ticket
+
+    def get(self, ticket_id: str) -> Optional[Ticket]:
+        return self.tickets.get(ticket_id)
+
+    async def wait_for_change(self, ticket: Ticket, seen_version: int, timeout: float) -> bool:
+        """
+        Wait until `ticket` moves past `seen_version`; False on timeout.
+        """
+        try:
+            async with self._changed:
+                await asyncio.wait_for(self._changed.wait_for(lambda: ticket.version > seen_version), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait(self, ticket: Ticket, timeout: float):
+        """
+        Long-poll: return once the ticket has finished or `timeout` elapses.
+        """
+        deadline = time.monotonic() + timeout
+        while ticket.status not in FINISHED_STATES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not await self.wait_for_change(ticket, ticket.version, remaining):
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "tracked_tickets": len(self.tickets),
+            **self.stats,
+            "queue_wait_ms": percentiles(self.queue_wait_ms),
+            "processing_ms": percentiles(self.processing_ms),
+        }
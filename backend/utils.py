@@ -1,3 +1,5 @@
+import json
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 def fix_schema_for_openai(schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -36,4 +38,19 @@ def fix_schema_for_openai(schema: Dict[str, Any]) -> Dict[str, Any]:
                 
         return fixed_schema
     else:
-        return schema
\ No newline at end of file
+        return schema
+
+@lru_cache(maxsize=None)
+def strict_json_schema(model: type) -> Dict[str, Any]:
+    """
+    Memoized `fix_schema_for_openai(model.model_json_schema())` for a Pydantic model.
+    The returned schema is shared, so callers must not mutate it.
+    """
+    return fix_schema_for_openai(model.model_json_schema())
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format one server-sent event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
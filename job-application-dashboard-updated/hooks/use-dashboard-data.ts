@@ -1,6 +1,6 @@
 "use client"
 
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import { apiClient, type TotalsResponse, type ReasonPercent } from "../lib/api"
 
 export function useDashboardData() {
@@ -9,6 +9,7 @@ export function useDashboardData() {
   const [cons, setCons] = useState<ReasonPercent[]>([])
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  const etag = useRef<string | null>(null)
 
   useEffect(() => {
     const fetchData = async () => {
@@ -16,31 +17,15 @@ export function useDashboardData() {
         setLoading(true)
         setError(null)
 
-        // Get data for the last 30 days
-        const endTime = new Date()
-        const startTime = new Date()
-        startTime.setDate(startTime.getDate() - 30)
-
-        const timeFrame = {
-          start_time: startTime.toISOString(),
-          end_time: endTime.toISOString(),
-        }
-
-        const topNRequest = {
-          ...timeFrame,
-          n: 5,
+        // Totals, top pros and top cons for the last 30 days in one request;
+        // a 304 means nothing changed since the last refresh
+        const { summary, etag: nextEtag } = await apiClient.getDashboardSummary(30, 5, etag.current)
+        etag.current = nextEtag
+        if (summary) {
+          setTotals(summary.totals)
+          setPros(summary.pros)
+          setCons(summary.cons)
         }
-
-        // Fetch all data in parallel
-        const [totalsData, prosData, consData] = await Promise.all([
-          apiClient.getTotals(timeFrame),
-          apiClient.getTopPros(topNRequest),
-          apiClient.getTopCons(topNRequest),
-        ])
-
-        setTotals(totalsData)
-        setPros(prosData)
-        setCons(consData)
       } catch (err) {
         setError(err instanceof Error ? err.message : "Failed to fetch data")
         console.error("Error fetching dashboard data:", err)
@@ -20,6 +20,22 @@ export interface ReasonPercent {
   percent: string
 }
 
+export interface DashboardSummary {
+  start_time: string
+  end_time: string
+  totals: TotalsResponse
+  pros: ReasonPercent[]
+  cons: ReasonPercent[]
+  records: number
+  errors: Record<string, string>
+}
+
+// `summary` is null when the server answered 304 (nothing changed since `etag`)
+export interface DashboardSummaryResult {
+  summary: DashboardSummary | null
+  etag: string | null
+}
+
 export interface Router {
   name: string
 }
@@ -53,6 +69,23 @@ export class ApiClient {
     return this.request<ReasonPercent[]>("/applications/totals/cons", request)
   }
 
+  async getDashboardSummary(days: number, n: number, etag?: string | null): Promise<DashboardSummaryResult> {
+    const params = new URLSearchParams({ days: String(days), n: String(n) })
+    const response = await fetch(`${API_BASE_URL}/dashboard/summary?${params}`, {
+      method: "GET",
+      headers: etag ? { "If-None-Match": etag } : {},
+    })
+
+    if (response.status === 304) {
+      return { summary: null, etag: etag ?? null }
+    }
+    if (!response.ok) {
+      throw new Error(`API request failed: ${response.statusText}`)
+    }
+
+    return { summary: await response.json(), etag: response.headers.get("ETag") }
+  }
+
   async getRouters(): Promise<string[]> {
     const response = await fetch(`${API_BASE_URL}/routers`, {
       method: "GET",
@@ -14,15 +14,29 @@ export interface Project {
 }
 
 export class ResumeApiClient {
+  // Latest resume ETag seen from the server, sent back as If-Match on writes
+  private etag: string | null = null
+
   private async request<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+    const isWrite = options.method !== undefined && options.method !== "GET"
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
+      ...options,
       headers: {
         "Content-Type": "application/json",
+        ...(isWrite && this.etag ? { "If-Match": this.etag } : {}),
         ...options.headers,
       },
-      ...options,
     })
 
+    const etag = response.headers.get("ETag")
+    if (etag) {
+      this.etag = etag
+    }
+
+    if (response.status === 412) {
+      throw new Error("Resume was changed elsewhere. Reload and try again.")
+    }
+
     if (!response.ok) {
       throw new Error(`API request failed: ${response.statusText}`)
     }